@@ -44,6 +44,8 @@ from .broker import *
 from .lineseries import *
 
 from .dataseries import *
+from .panel import *
+from .latency import *
 from .feed import *
 from .resamplerfilter import *
 
@@ -45,3 +45,4 @@ from .periodstats import *
 from .kelly import *
 from .basictradestats import *
 from .traderecorder import *
+from .latency import *
@@ -3,7 +3,6 @@
 #######################################
 
 import math
-import numpy as np
 
 from backtrader import Analyzer
 from backtrader.utils import AutoOrderedDict, AutoDict
@@ -208,6 +207,10 @@ class BasicTradeStats(Analyzer):
 
 
     def calculate_statistics(self):
+        # keep import local to avoid the cost (or the need) of numpy when the
+        # analyzer is not used
+        import numpy as np
+
         # Calculate various statistics..
         # Applied to three groups;
         #   1) All trades
@@ -0,0 +1,49 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016, 2017 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import backtrader as bt
+
+
+__all__ = ['Latency']
+
+
+class Latency(bt.Analyzer):
+    '''This analyzer delivers the latency report of the bars traced by
+    ``Cerebro`` when run with the parameter ``latency`` active (it is empty
+    otherwise)
+
+    Methods:
+
+      - get_analysis
+
+        Returns a dictionary with the name of the datas as keys and as
+        values a dictionary with the summary (``count``, ``p50``, ``p99``,
+        ``max``, ``mean`` in seconds) of each leg (``load``, ``deliver``,
+        ``sync``, ``next``, ``total``) of the path of the bars. See
+        ``LatencyTracer``
+    '''
+
+    def stop(self):
+        tracer = self.strategy.env._latency
+        if tracer is not None:
+            self.rets.update(tracer.report())
@@ -3,8 +3,6 @@
 #######################################
 
 import math
-import numpy as np
-import pandas as pd
 
 from backtrader import Analyzer
 from backtrader.utils import AutoOrderedDict, AutoDict
@@ -143,6 +141,10 @@ class TradeRecorder(Analyzer):
 
 
     def stop(self):
+        # keep import local to avoid the cost (or the need) of pandas when
+        # the analyzer is not used
+        import pandas as pd
+
         # Create our output list of closed and open trades we have tracked..
         for n in self._tradeDict:
 
@@ -250,6 +252,8 @@ class TradeRecorder(Analyzer):
 
 
     def calc_equity(self, trade):
+        import pandas as pd  # keep import local (see stop)
+
         # Calculate the equity change for each closed trade.
         # Record date & cumulative pnl, so that an equity curve can be plotted.
 
@@ -25,6 +25,8 @@ import datetime
 import collections
 import itertools
 import multiprocessing
+import multiprocessing.pool
+import pickle
 
 # ROR - Rich O'Regan added..
 import copy     # Used to deepcopy a itertools.product class..
@@ -39,7 +41,11 @@ from .brokers import BackBroker
 from .metabase import MetaParams
 from . import observers
 from .writer import WriterFile
+from .panel import DataPanel
+from .feed import livewakeup
+from .latency import LatencyTracer
 from .utils import OrderedDict, tzparse, num2date
+from .lineseries import LineSeriesStub
 from .strategy import Strategy, SignalStrategy
 from .tradingcal import (TradingCalendarBase, TradingCalendar,
                          PandasMarketCalendar)
@@ -55,6 +61,49 @@ class OptReturn(object):
             setattr(self, k, v)
 
 
+def _startdata(data, lookahead, preload=True):
+    # Resets, starts and preloads (if requested) a data
+    data.reset()
+    data.extend(size=lookahead)
+    data._start()
+    if preload:
+        data.preload()
+
+
+def _preloadthread(args):
+    # Preloads a data in a thread. Returns the error if any
+    data, lookahead = args
+    try:
+        _startdata(data, lookahead)
+    except Exception as e:
+        try:
+            data.stop()  # release what may have been acquired
+        except Exception:
+            pass
+
+        return e
+
+    return None
+
+
+def _preloadprocess(args):
+    # Preloads a pickled data in a process. Returns the arrays of the lines
+    # and the error if any
+    pdata, lookahead, tradingcal = args
+    try:
+        data = pickle.loads(pdata)
+        env = Cerebro()
+        env._tradingcal = tradingcal
+        data.setenvironment(env)
+        _startdata(data, lookahead)
+        arrays = [line.array for line in data.lines]
+        data.stop()
+    except Exception as e:
+        return None, e
+
+    return arrays, None
+
+
 class Cerebro(with_metaclass(MetaParams, object)):
     '''Params:
 
@@ -63,6 +112,29 @@ class Cerebro(with_metaclass(MetaParams, object)):
         Whether to preload the different ``data feeds`` passed to cerebro for
         the Strategies
 
+      - ``preloadworkers`` (default: ``1``)
+
+        How many datas are preloaded simultaneously. With ``1`` the datas are
+        preloaded one after the other. ``None`` (or ``0``) uses as many
+        workers as cores are available
+
+      - ``preloadpool`` (default: ``thread``)
+
+        The kind of workers used to preload the datas if ``preloadworkers``
+        is not ``1``
+
+          - ``thread``: a pool of threads, for datas which wait on I/O or
+            which release the GIL while loading (``pandas``/``numpy``
+            readers)
+
+          - ``process``: a pool of processes, for datas which are parsed in
+            Python (CSV files). The datas are pickled to the processes, which
+            preload them and send the values of the lines back
+
+        Clones of other datas are preloaded afterwards in the main thread.
+        If any data fails to preload, a ``DataPreloadError`` carrying the
+        error of each failed data (in the order of the datas) is raised
+
       - ``runonce`` (default: ``True``)
 
         Run ``Indicators`` in vectorized mode to speed up the entire system.
@@ -77,6 +149,40 @@ class Cerebro(with_metaclass(MetaParams, object)):
         This will simultaneously deactivate ``preload`` and ``runonce``. It
         will have no effect on memory saving schemes.
 
+      - ``livewakeup`` (default: ``None``)
+
+        If ``None`` live datas wait in turns on their queues for up to
+        ``qcheck`` seconds for incoming data.
+
+        If set to a number (in seconds) and all live datas can signal the
+        arrival of data (``haslivewakeup``, as the datas of the built-in
+        stores do), the datas do not wait and the system sleeps until any
+        data signals an arrival, a resampled/replayed bar may have to be
+        delivered because time has gone by (see ``nextcheck`` in the
+        resampler) or at most ``livewakeup`` seconds, to deliver store and
+        broker notifications
+
+      - ``latency`` (default: ``False``)
+
+        If ``True`` the bars are traced from the arrival of the messages in
+        the stores until ``next`` of the strategies is called and the time
+        spent in each leg (``load``, ``deliver``, ``sync``, ``next`` and
+        ``total``) is aggregated in a histogram per data. See
+        ``LatencyTracer`` for the details
+
+        If a number, the report (``p50``, ``p99``, ``max``, ... of each leg)
+        is also delivered every that many seconds to ``notify_store`` as
+        ``notify_store('LATENCY', report)``. The ``Latency`` analyzer
+        delivers it at the end
+
+        Only meaningful in ``next`` mode (i.e.: live)
+
+      - ``latencylog`` (default: ``None``)
+
+        If ``latency`` is active, gets the legs of each traced bar: if a
+        callable it is called with ``(data, legs)`` and else a line is
+        written to it (as to a file)
+
         Run ``Indicators`` in vectorized mode to speed up the entire system.
         Strategies and Observers will always be run on an event based basis
 
@@ -158,6 +264,22 @@ class Cerebro(with_metaclass(MetaParams, object)):
 
             - ``runonce`` will be deactivated
 
+      - ``chunkbars`` (default: ``0``)
+
+        If greater than ``0`` and ``exactbars`` is ``True`` or ``1``,
+        ``preload`` and ``runonce`` are not deactivated. Datas are preloaded
+        in windows of ``chunkbars`` bars and indicators are calculated in
+        vectorized mode over each window.
+
+        After each window only the values needed by the automatically
+        calculated minimum periods are kept in memory, like with
+        ``exactbars``.
+
+        Indicators must be synchronized with a single data feed (the
+        usual case) and must not need all previous values (like the unstable
+        functions of TA-Lib) or else the standard ``exactbars`` behavior is
+        used
+
       - ``objcache`` (default: ``False``)
 
         Experimental option to implement a cache of lines objects and reduce
@@ -173,6 +295,55 @@ class Cerebro(with_metaclass(MetaParams, object)):
         Corner cases may happen in which this drives a line object off its
         minimum period and breaks things and it is therefore disabled.
 
+      - ``dedup`` (default: ``False``)
+
+        Indicators created in a strategy (also inside other indicators) with
+        the same class, the same parameters and the same input lines as an
+        already existing indicator are not calculated again. They use the
+        lines of the existing one. For example the ``SMA(self.data, period=20)``
+        created inside ``BollingerBands`` and the one created by the strategy
+        with the same parameters. A data feed and its 1st line (``self.data``
+        and ``self.data.close``) are the same input
+
+        Only the lines are shared. Attributes holding sub-indicators or
+        operations point to those of the existing indicator. Other attributes
+        which an indicator may update during ``next`` are not updated in the
+        duplicates.
+
+        Indicators taking arguments which are not parameters are not
+        considered and it has no effect with negative values of ``exactbars``
+
+        The number of indicators sharing lines is returned by the
+        ``getdedupcount`` method of each strategy
+
+      - ``fuseops`` (default: ``False``)
+
+        Chains of arithmetic/comparison operations on lines, like in::
+
+          signal = (self.data.close - self.sma) / self.atr * 2
+
+        are calculated in a single pass by the last operation and only its
+        values are stored. In ``runonce`` mode ``numpy`` (if available)
+        calculates the complete chain in vectorized form.
+
+        Only the operations created inside a ``with bt.FuseOps():`` block are
+        considered. An intermediate operation is only calculated inline if
+        nothing else (another operation, indicator or an attribute of the
+        strategy or of the indicators) holds it. Inline operations do not
+        deliver values on their own: operations kept somewhere else (a
+        ``deque``, a helper object, a closure ...) must be created outside of
+        the block
+
+      - ``panel`` (default: ``False``)
+
+        If ``True`` and the datas are preloaded, a ``DataPanel`` is built
+        after preloading: a 2-D ``numpy`` array per field (``close``,
+        ``volume``, ...) with one row per bar of the merged timeline of the
+        datas and one column per data. Missing bars are ``NaN``.
+
+        Strategies reach it with ``getpanel`` and get a view (no copy) of the
+        values of all datas for the current bar with ``panelrow``
+
       - ``writer`` (default: ``False``)
 
         If set to ``True`` a default WriterFile will be created which will
@@ -271,6 +442,8 @@ class Cerebro(with_metaclass(MetaParams, object)):
 
     params = (
         ('preload', True),
+        ('preloadworkers', 1),
+        ('preloadpool', 'thread'),
         ('runonce', True),
         ('maxcpus', None),
         ('stdstats', True),
@@ -278,10 +451,17 @@ class Cerebro(with_metaclass(MetaParams, object)):
         ('oldtrades', False),
         ('lookahead', 0),
         ('exactbars', False),
+        ('chunkbars', 0),
         ('optdatas', True),
         ('optreturn', True),
         ('objcache', False),
+        ('dedup', False),
+        ('fuseops', False),
+        ('panel', False),
         ('live', False),
+        ('livewakeup', None),
+        ('latency', False),
+        ('latencylog', None),
         ('writer', False),
         ('tradehistory', False),
         ('oldsync', False),
@@ -324,6 +504,9 @@ class Cerebro(with_metaclass(MetaParams, object)):
         self._pretimers = list()
         self._ohistory = list()
         self._fhistory = None
+        self._panel = None
+        self._latency = None
+        self._wakeup = None
 
     @staticmethod
     def iterize(iterable):
@@ -699,7 +882,11 @@ class Cerebro(with_metaclass(MetaParams, object)):
         pass
 
     def _storenotify(self):
-        for store in self.stores:
+        stores = self.stores
+        if self._latency is not None:  # reports like a store
+            stores = stores + [self._latency]
+
+        for store in stores:
             for notif in store.get_notifications():
                 msg, args, kwargs = notif
 
@@ -1063,6 +1250,11 @@ class Cerebro(with_metaclass(MetaParams, object)):
         self._dopreload = self.p.preload
         self._exactbars = int(self.p.exactbars)
 
+        # preload/runonce over windows of bars if possible
+        self._chunkbars = 0
+        if self._exactbars > 0 and self._dorunonce and self._dopreload:
+            self._chunkbars = max(0, self.p.chunkbars)
+
         if self._exactbars:
             self._dorunonce = False  # something is saving memory, no runonce
             self._dopreload = self._dopreload and self._exactbars < 1
@@ -1072,11 +1264,17 @@ class Cerebro(with_metaclass(MetaParams, object)):
             # preloading is not supported with replay. full timeframe bars
             # are constructed in realtime
             self._dopreload = False
+            self._chunkbars = 0
 
         if self._dolive or self.p.live:
             # in this case both preload and runonce must be off
             self._dorunonce = False
             self._dopreload = False
+            self._chunkbars = 0
+
+        if self._chunkbars:
+            # datas will be loaded in windows by _runonce
+            self._dorunonce = True
 
         self.runwriters = list()
 
@@ -1146,13 +1344,7 @@ class Cerebro(with_metaclass(MetaParams, object)):
             _str = '\r%.1f%% completed.   \tRan %d of %d optimisations.\t\t    '
 
             if self.p.optdatas and self._dopreload and self._dorunonce:
-                for data in self.datas:
-                    data.reset()
-                    if self._exactbars < 1:  # datas can be full length
-                        data.extend(size=self.params.lookahead)
-                    data._start()
-                    if self._dopreload:
-                        data.preload()
+                self._startdatas()
 
             pool = multiprocessing.Pool(self.p.maxcpus or None)
             for r in pool.imap(self, iterstrats):
@@ -1184,6 +1376,76 @@ class Cerebro(with_metaclass(MetaParams, object)):
 
         return self.runstrats
 
+    def _startdatas(self):
+        '''Resets and starts the datas and preloads them if needed, in
+        parallel if so requested with ``preloadworkers``'''
+        # datas can be full length
+        lookahead = self.params.lookahead if self._exactbars < 1 else 0
+
+        workers = self.p.preloadworkers
+        if not workers:
+            workers = multiprocessing.cpu_count()
+
+        pdatas = list()
+        if self._dopreload and workers > 1:
+            pdatas = [data for data in self.datas if not data._clone]
+
+        if len(pdatas) < 2:
+            for data in self.datas:
+                _startdata(data, lookahead, self._dopreload)
+            return
+
+        if self.p.preloadpool == 'process':
+            errors = self._preloadprocesses(pdatas, lookahead, workers)
+        else:
+            pool = multiprocessing.pool.ThreadPool(min(workers, len(pdatas)))
+            args = [(data, lookahead) for data in pdatas]
+            errors = pool.map(_preloadthread, args, chunksize=1)
+            pool.close()
+            pool.join()
+
+        errors = [(d, e) for d, e in zip(pdatas, errors) if e is not None]
+        if errors:
+            raise bt.errors.DataPreloadError(errors)
+
+        for data in self.datas:
+            if data._clone:  # preload once the cloned data is there
+                _startdata(data, lookahead, self._dopreload)
+
+    def _preloadprocesses(self, datas, lookahead, workers):
+        # The datas are pickled without the environment (this) and preloaded
+        # by the processes, which send the arrays of the lines back. The
+        # datas are then started here and take over the arrays
+        results = [None] * len(datas)
+        args, idxs = list(), list()
+        for i, data in enumerate(datas):
+            env, data._env = data._env, None
+            try:
+                args.append((pickle.dumps(data, -1), lookahead,
+                             self._tradingcal))
+                idxs.append(i)
+            except Exception as e:
+                results[i] = (None, e)
+            finally:
+                data._env = env
+
+        if args:
+            pool = multiprocessing.Pool(min(workers, len(args)))
+            for i, result in zip(idxs, pool.imap(_preloadprocess, args)):
+                results[i] = result
+            pool.close()
+            pool.join()
+
+        errors = list()
+        for data, (arrays, error) in zip(datas, results):
+            if error is None:
+                _startdata(data, lookahead, preload=False)
+                data._preloadarrays(arrays)
+
+            errors.append(error)
+
+        return errors
+
     def _init_stcount(self):
         self.stcount = itertools.count(0)
 
@@ -1230,13 +1492,22 @@ class Cerebro(with_metaclass(MetaParams, object)):
         # self._plotfillers2 = [list() for d in self.datas]
 
         if not predata:
+            self._startdatas()
+
+        self._panel = None
+        if self.p.panel and self._dopreload:
+            self._panel = DataPanel(self.datas)
+
+        self._latency = None
+        if self.p.latency:
+            period = self.p.latency
+            if isinstance(period, bool):
+                period = None  # trace only, no periodic notification
+
+            self._latency = LatencyTracer(period=period,
+                                          sink=self.p.latencylog)
             for data in self.datas:
-                data.reset()
-                if self._exactbars < 1:  # datas can be full length
-                    data.extend(size=self.params.lookahead)
-                data._start()
-                if self._dopreload:
-                    data.preload()
+                self._latency.adddata(data)
 
         for stratcls, sargs, skwargs in iterstrat:
             sargs = self.datas + list(sargs)
@@ -1294,7 +1565,24 @@ class Cerebro(with_metaclass(MetaParams, object)):
                     if writer.p.csv:
                         writer.addheaders(strat.getwriterheaders())
 
-            if not predata:
+            if self.p.fuseops:
+                for strat in runstrats:
+                    strat._fuseops()
+
+            # runonce may have been deactivated by an indicator
+            dochunk = self._chunkbars and self._dorunonce and \
+                self._oncechunk_prepare(runstrats)
+
+            if dochunk:
+                for strat in runstrats:
+                    # datas/indicators are windowed. Save only here
+                    for line in strat.lines:
+                        line.qbuffer(savemem=1)
+
+                    for observer in strat.getobservers():
+                        observer.qbuffer(savemem=1)
+
+            elif not predata:
                 for strat in runstrats:
                     strat.qbuffer(self._exactbars, replaying=self._doreplay)
 
@@ -1313,7 +1601,9 @@ class Cerebro(with_metaclass(MetaParams, object)):
                 else:
                     self._timers.append(timer)
 
-            if self._dopreload and self._dorunonce:
+            if dochunk:
+                self._runonce(runstrats, chunked=True)
+            elif self._dopreload and self._dorunonce:
                 if self.p.oldsync:
                     self._runonce_old(runstrats)
                 else:
@@ -1322,7 +1612,13 @@ class Cerebro(with_metaclass(MetaParams, object)):
                 if self.p.oldsync:
                     self._runnext_old(runstrats)
                 else:
-                    self._runnext(runstrats)
+                    self._wakeup = self._armwakeup()
+                    try:
+                        self._runnext(runstrats)
+                    finally:
+                        if self._wakeup is not None:
+                            livewakeup.disarm(self._wakeup)
+                            self._wakeup = None
 
             for strat in runstrats:
                 strat._stop()
@@ -1517,6 +1813,31 @@ class Cerebro(with_metaclass(MetaParams, object)):
         '''API for lineiterators to disable runonce (see HeikinAshi)'''
         self._dorunonce = False
 
+    def _armwakeup(self):
+        # Returns the event to sleep on until live data arrives if requested
+        # and if the live datas can signal the arrival
+        if self.p.livewakeup is None:
+            return None
+
+        lives = [d for d in self.datas if d.islive()]
+        if not lives or not all(d.haslivewakeup() for d in lives):
+            return None
+
+        return livewakeup.arm()
+
+    def _livewait(self, datas):
+        # Sleeps until data arrives or the filters of a data may deliver a
+        # bar (resampling) with at most livewakeup seconds
+        timeout = self.p.livewakeup
+        now = datetime.datetime.utcnow()
+        for d in datas:
+            nextcheck = d._nextcheck()
+            if nextcheck is not None:
+                lapse = (nextcheck - now).total_seconds()
+                timeout = max(0.0, min(timeout, lapse))
+
+        self._wakeup.wait(timeout)
+
     def _runnext(self, runstrats):
         '''
         Actual implementation of run in full next mode. All objects have its
@@ -1558,6 +1879,12 @@ class Cerebro(with_metaclass(MetaParams, object)):
             if self._event_stop:  # stop if requested
                 return
 
+            if self._wakeup is not None:
+                # datas poll without waiting and arrivals from now on will
+                # wake up the wait (if any) after polling
+                self._wakeup.clear()
+                newqcheck = False
+
             # record starting time and tell feeds to discount the elapsed time
             # from the qcheck value
             drets = []
@@ -1618,10 +1945,18 @@ class Cerebro(with_metaclass(MetaParams, object)):
 
                         # self._plotfillers2[i].append(slen)  # mark as fill
 
+                if self._latency is not None:
+                    self._latency.sync(
+                        di for di, dti in zip(datas, dts)
+                        if dti is not None and dti <= dt0)
+
             elif d0ret is None:
                 # meant for things like live feeds which may not produce a bar
                 # at the moment but need the loop to run for notifications and
                 # getting resample and others to produce timely bars
+                if self._wakeup is not None:
+                    self._livewait(datas)
+
                 for data in datas:
                     data._check()
             else:
@@ -1652,6 +1987,9 @@ class Cerebro(with_metaclass(MetaParams, object)):
 
             if d0ret or lastret:  # bars produced by data or filters
                 self._check_timers(runstrats, dt0, cheat=False)
+                if self._latency is not None:
+                    self._latency.dispatch()
+
                 for strat in runstrats:
                     strat._next()
                     if self._event_stop:  # stop if requested
@@ -1667,16 +2005,125 @@ class Cerebro(with_metaclass(MetaParams, object)):
         if self._event_stop:  # stop if requested
             return
 
-    def _runonce(self, runstrats):
+    def _oncechunk_prepare(self, runstrats):
+        '''
+        Finds out the data feed which is the clock of each indicator held by
+        the strategies. Returns ``False`` if the calculation cannot be done
+        over windows of bars (an indicator is not synchronized with a data
+        feed or has ``_chunkable`` set to ``False``)
+        '''
+        datamap = dict()
+        for data in self.datas:
+            datamap[id(data)] = data
+            for line in data.lines:
+                datamap[id(line)] = data
+
+        self._chunkinds = chunkinds = list()
+        self._chunkobjs = chunkobjs = collections.defaultdict(list)
+        self._chunkdone = set()
+        seen = set()
+
+        keep = 1
+        for strat in runstrats:
+            keep = max(keep, strat._minperiod)
+            for ind in strat.getindicators():
+                clk = ind
+                while clk is not None and id(clk) not in datamap:
+                    if isinstance(clk, LineSeriesStub):
+                        clk = clk.lines[0]
+                    else:
+                        clk = getattr(clk, '_clock', None)
+
+                if clk is None:
+                    return False  # not synchronized with a data feed
+
+                data = datamap[id(clk)]
+                chunkinds.append((ind, data))
+
+                # Collect the full tree of objects to shrink in sync
+                objs = [ind]
+                while objs:
+                    obj = objs.pop()
+                    if id(obj) in seen:
+                        continue
+
+                    if not getattr(obj, '_chunkable', True):
+                        return False  # needs all previous values
+
+                    seen.add(id(obj))
+                    chunkobjs[data].append(obj)
+                    keep = max(keep, obj._minperiod)
+                    objs.extend(obj.getindicators())
+
+        self._chunkkeep = keep
+        return True
+
+    def _oncechunk(self, datas, runstrats):
+        '''
+        If a data has delivered all bars in its window, a new window of bars
+        is loaded in the datas and the indicators are calculated over it
+        '''
+        chunkdone = self._chunkdone
+        if all(id(d) in chunkdone or len(d) < d.buflen() for d in datas):
+            return  # all windows still deliver bars or nothing else to load
+
+        keep = self._chunkkeep
+        positions = dict()
+        for data in datas:
+            # buffer position of the last delivered bar
+            pos = len(data) - data.lines[0].lenoffset - 1
+
+            # keep only the values needed for minperiod calculations
+            ndrop = pos + 1 - keep
+            if ndrop > 0:
+                data.shrink(ndrop)
+                for obj in self._chunkobjs[data]:
+                    obj.shrink(ndrop)
+
+                pos -= ndrop
+
+            positions[data] = pos
+
+            if id(data) in chunkdone:
+                continue
+
+            # top up the window to chunkbars undelivered bars. Loading
+            # takes place after the last bar in the buffer
+            nload = self._chunkbars - (data.buflen() - len(data))
+            data.seek(len(data.array) - 1)
+            for i in range(nload):
+                if not data.load():
+                    data._last()
+                    chunkdone.add(id(data))
+                    break
+
+            data.seek(pos)  # loading moved the pointer forward
+
+        for strat in runstrats:
+            for ind in strat.getindicators():
+                ind._oncechunk()
+
+        # calculation moved the pointers. Put them back in sync with datas
+        for data in datas:
+            data.seek(positions[data])
+
+        for ind, data in self._chunkinds:
+            ind.seek(positions[data])
+
+    def _runonce(self, runstrats, chunked=False):
         '''
         Actual implementation of run in vector mode.
 
         Strategies are still invoked on a pseudo-event mode in which ``next``
         is called for each data arrival
+
+        If ``chunked`` is ``True`` the datas have not been preloaded and the
+        loading takes place in windows (see ``chunkbars``)
         '''
-        for strat in runstrats:
-            strat._once()
-            strat.reset()  # strat called next by next - reset lines
+        if not chunked:
+            for strat in runstrats:
+                strat._once()
+                strat.reset()  # strat called next by next - reset lines
 
         # The default once for strategies does nothing and therefore
         # has not moved forward all datas/indicators/observers that
@@ -1686,6 +2133,9 @@ class Cerebro(with_metaclass(MetaParams, object)):
                        key=lambda x: (x._timeframe, x._compression))
 
         while True:
+            if chunked:
+                self._oncechunk(datas, runstrats)
+
             # Check next incoming date in the datas
             dts = [d.advance_peek() for d in datas]
             dt0 = min(dts)
@@ -22,7 +22,7 @@ from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
 
-__all__ = ['BacktraderError', 'StrategySkipError']
+__all__ = ['BacktraderError', 'StrategySkipError', 'DataPreloadError']
 
 
 class BacktraderError(Exception):
@@ -49,3 +49,14 @@ class FromModuleImportError(ModuleImportError):
     be imported'''
     def __init__(self, message, *args):
         super(FromModuleImportError, self).__init__(message, *args)
+
+
+class DataPreloadError(BacktraderError):
+    '''Raised if preloading data feeds in parallel fails. ``errors`` holds
+    a ``(data, exception)`` tuple for each data which failed, in the order of
+    the datas'''
+    def __init__(self, errors):
+        message = '; '.join('%s: %r' % (data._name or data._dataname, exc)
+                            for data, exc in errors)
+        super(DataPreloadError, self).__init__(message)
+        self.errors = errors
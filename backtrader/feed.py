@@ -21,11 +21,14 @@
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
+import array
 import collections
 import datetime
 import inspect
 import io
+import itertools
 import os.path
+import threading
 
 import backtrader as bt
 from backtrader import (date2num, num2date, time2num, TimeFrame, dataseries,
@@ -38,6 +41,39 @@ from .resamplerfilter import Resampler, Replayer
 from .tradingcal import PandasMarketCalendar
 
 
+class LiveWakeup(object):
+    '''Signal of the arrival of live data, on which ``Cerebro`` sleeps
+    (instead of polling the datas with ``qcheck``) if the parameter
+    ``livewakeup`` is set
+
+    Stores call ``set`` when they hand over a message to a data (which
+    ``TickQueue`` does on ``put``). Each waiter has its own ``Event`` (from
+    ``arm``) and ``set`` takes no lock if no one waits
+    '''
+    def __init__(self):
+        self._events = list()  # replaced (not modified) when arming
+        self._lock = threading.Lock()
+
+    def arm(self):
+        '''Returns an ``Event`` which is set by each ``set``'''
+        evt = threading.Event()
+        with self._lock:
+            self._events = self._events + [evt]
+
+        return evt
+
+    def disarm(self, evt):
+        with self._lock:
+            self._events = [x for x in self._events if x is not evt]
+
+    def set(self):
+        for evt in self._events:
+            evt.set()
+
+
+livewakeup = LiveWakeup()
+
+
 class MetaAbstractDataBase(dataseries.OHLCDateTime.__class__):
     _indcol = dict()
 
@@ -152,6 +188,7 @@ class AbstractDataBase(with_metaclass(MetaAbstractDataBase,
     _compensate = None
     _feed = None
     _store = None
+    _latency = None  # LatencyTracer if the bars are traced
 
     _clone = False
     _qcheck = 0.0
@@ -255,6 +292,27 @@ class AbstractDataBase(with_metaclass(MetaAbstractDataBase,
     def haslivedata(self):
         return False  # must be overriden for those that can
 
+    def haslivewakeup(self):
+        '''If this returns ``True`` the data signals the arrival of live data
+        over ``livewakeup`` and ``Cerebro`` can wait for it rather than have
+        the data poll its queue with ``qcheck``'''
+        return False
+
+    def _nextcheck(self):
+        '''Returns the earliest wall clock time (utc) at which the filters may
+        deliver a bar in ``_check`` although nothing arrives, or ``None``'''
+        nextcheck = None
+        for ff, fargs, fkwargs in self._filters:
+            if not hasattr(ff, 'nextcheck'):
+                continue
+
+            fcheck = ff.nextcheck(self, *fargs, **fkwargs)
+            if fcheck is not None and (nextcheck is None or
+                                       fcheck < nextcheck):
+                nextcheck = fcheck
+
+        return nextcheck
+
     def do_qcheck(self, onoff, qlapse):
         # if onoff is True the data will wait p.qcheck for incoming live data
         # on its queue.
@@ -438,6 +496,81 @@ class AbstractDataBase(with_metaclass(MetaAbstractDataBase,
         self._last()
         self.home()
 
+    def _preloadarrays(self, arrays):
+        '''Takes the arrays with the values of the lines, preloaded
+        elsewhere (another process), instead of preloading'''
+        for line, larray in zip(self.lines, arrays):
+            line.array = larray
+
+        self.home()
+
+    def _dtmask(self, dts):
+        '''Applies ``fromdate`` and ``todate`` to the datetimes ``dts`` as
+        ``load`` does: bars before ``fromdate`` are skipped and loading stops
+        with the first bar past ``todate``
+
+        Returns a tuple with the mask of bars to keep (``None`` if all) and
+        whether loading has to stop
+        '''
+        fromdate, todate = self.fromdate, self.todate
+        if not dts or (min(dts) >= fromdate and max(dts) <= todate):
+            return None, False
+
+        mask = list()
+        for dt in dts:
+            if dt < fromdate:
+                mask.append(False)  # discard and carry on
+            elif dt > todate:
+                return mask, True  # discard and stop loading
+            else:
+                mask.append(True)
+
+        return mask, False
+
+    def _cansplice(self, datas):
+        '''Returns ``True`` if the bars of ``datas`` can be preloaded and
+        copied over with ``_splice``, i.e.: no processing of the bars in
+        ``load`` is needed'''
+        if self._filters or self._tzinput:
+            return False
+
+        if self._barstack or self._barstash:
+            return False
+
+        return all(not d.islive() and not d.replaying for d in datas)
+
+    def _splice(self, segments):
+        '''Copies the bars of preloaded datas to the lines (matched by name)
+
+        ``segments`` is an iterable of ``(data, start, end)`` with the
+        positions of the bars in the buffers of the datas. ``fromdate`` and
+        ``todate`` are applied as in ``load``
+        '''
+        aliases = self.getlinealiases()
+        cols = collections.OrderedDict()
+        for alias in aliases:
+            cols[alias] = array.array(str('d'))
+
+        for d, start, end in segments:
+            for alias, col in cols.items():
+                col.extend(getattr(d.lines, alias).array[start:end])
+
+        mask, _ = self._dtmask(cols['datetime'])
+        if mask is not None:
+            for alias, col in list(cols.items()):
+                cols[alias] = array.array(
+                    str('d'), itertools.compress(col, mask))
+
+        size = len(cols['datetime'])
+        if not size:
+            return
+
+        self.forward(size=size)
+        for alias, col in cols.items():
+            line = getattr(self.lines, alias)
+            idx = line.idx + 1
+            line.array[idx - size:idx] = col
+
     def _last(self, datamaster=None):
         # Last chance for filters to deliver something
         ret = 0
@@ -465,11 +598,16 @@ class AbstractDataBase(with_metaclass(MetaAbstractDataBase,
             ff.check(self, _forcedata=forcedata, *fargs, **fkwargs)
 
     def load(self):
+        if self._latency is not None:
+            self._latency.begin(self)
+
         while True:
             # move data pointer forward for new bar
             self.forward()
 
             if self._fromstack():  # bar is available
+                if self._latency is not None:
+                    self._latency.stamp(self, 'deliver')
                 return True
 
             if not self._fromstack(stash=True):
@@ -526,6 +664,8 @@ class AbstractDataBase(with_metaclass(MetaAbstractDataBase,
                 continue  # in the greater loop
 
             # Checks let the bar through ... notify it
+            if self._latency is not None:
+                self._latency.stamp(self, 'deliver')
             return True
 
         # Out of the loop ... no more bars or past todate
@@ -655,11 +795,19 @@ class CSVDataBase(with_metaclass(MetaCSVDataBase, DataBase)):
 
     The return value of ``_loadline`` (True/False) will be the return value
     of ``_load`` which has been overriden by this base class
+
+    Subclasses can additionally implement ``_loadlines(rows)`` to parse many
+    lines (already tokenized) in one go. It is used when preloading if the
+    class overriding ``_loadline`` is also the one implementing
+    ``_loadlines`` (a subclass with a custom ``_loadline`` keeps on being
+    loaded row by row) and the data has no filters
     '''
 
     f = None
     params = (('headers', True), ('separator', ','),)
 
+    BULKSIZE = 1 << 20  # characters read from the file in each block
+
     def start(self):
         super(CSVDataBase, self).start()
 
@@ -682,8 +830,9 @@ class CSVDataBase(with_metaclass(MetaCSVDataBase, DataBase)):
             self.f = None
 
     def preload(self):
-        while self.load():
-            pass
+        if not self._preloadbulk():
+            while self.load():
+                pass
 
         self._last()
         self.home()
@@ -692,6 +841,85 @@ class CSVDataBase(with_metaclass(MetaCSVDataBase, DataBase)):
         self.f.close()
         self.f = None
 
+    def _preloadarrays(self, arrays):
+        super(CSVDataBase, self)._preloadarrays(arrays)
+
+        # preloaded - no need to keep the object around - breaks multip in 3.x
+        self.f.close()
+        self.f = None
+
+    def _canbulk(self):
+        if self.f is None or not self._cansplice([]):
+            return False
+
+        # _loadlines must be as specific as _loadline
+        for cls in type(self).__mro__:
+            if '_loadline' in cls.__dict__:
+                return '_loadlines' in cls.__dict__
+
+        return False
+
+    def _preloadbulk(self):
+        '''Loads the entire file reading blocks of BULKSIZE characters and
+        parsing them with ``_loadlines``. Returns ``False`` if not possible
+
+        The datetime limits ``fromdate`` and ``todate`` are applied as in
+        ``load``: bars before ``fromdate`` are skipped and loading stops with
+        the first bar past ``todate``
+        '''
+        if not self._canbulk():
+            return False
+
+        aliases = self.getlinealiases()
+        lines = [getattr(self.lines, alias) for alias in aliases]
+
+        rest = ''
+        done = False
+        while not done:
+            block = self.f.read(self.BULKSIZE)
+            if block:
+                rows = (rest + block).split('\n')
+                rest = rows.pop()  # may be an incomplete line
+            else:  # end of file
+                rows, rest = [rest], ''
+                done = True
+
+            sep = self.separator
+            rows = [row.split(sep) for row in rows if row]
+            if not rows:
+                continue
+
+            cols = self._loadlines(rows)
+            mask, stop = self._dtmask(cols['datetime'])
+            if mask is not None:
+                done = done or stop
+                for alias, col in list(cols.items()):
+                    cols[alias] = list(itertools.compress(col, mask))
+
+            dts = cols['datetime']
+
+            size = len(dts)
+            if not size:
+                continue
+
+            self.forward(size=size)
+            for alias, line in zip(aliases, lines):
+                col = cols.get(alias)
+                if col is None:
+                    continue  # keep the NaN set by forward
+
+                idx = line.idx + 1
+                line.array[idx - size:idx] = array.array(str('d'), col)
+
+        return True
+
+    def _loadlines(self, rows):
+        '''Parses the tokenized ``rows`` and returns a dict with the line
+        names as keys and the sequence of values of each line as values. The
+        ``datetime`` is mandatory and lines not present in the dict get NaN
+        '''
+        raise NotImplementedError
+
     def _load(self):
         if self.f is None:
             return False
@@ -32,6 +32,7 @@ from .sierrachart import *
 from .mt4csv import *
 from .pandafeed import *
 from .influxfeed import *
+from .busdata import *
 try:
     from .ibdata import *
 except ImportError:
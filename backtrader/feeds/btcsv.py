@@ -58,6 +58,39 @@ class BacktraderCSVData(feed.CSVDataBase):
 
         return True
 
+    def _loadlines(self, rows):
+        # The same dates and times show up in many rows: parse them once
+        dates, times = dict(), dict()
+        dts = list()
+        for row in rows:
+            dttxt = row[0]
+            dt = dates.get(dttxt)
+            if dt is None:
+                dt = date(int(dttxt[0:4]), int(dttxt[5:7]), int(dttxt[8:10]))
+                dates[dttxt] = dt
+
+            if len(row) == 8:
+                tmtxt = row[1]
+                tm = times.get(tmtxt)
+                if tm is None:
+                    tm = time(int(tmtxt[0:2]), int(tmtxt[3:5]),
+                              int(tmtxt[6:8]))
+                    times[tmtxt] = tm
+            else:
+                tm = self.p.sessionend  # end of the session parameter
+
+            dts.append(date2num(datetime.combine(dt, tm)))
+
+        # the values start after the date (and the time if present)
+        starts = [2 if len(row) == 8 else 1 for row in rows]
+        fields = ('open', 'high', 'low', 'close', 'volume', 'openinterest')
+        cols = dict(datetime=dts)
+        for i, field in enumerate(fields):
+            vals = [row[start + i] for row, start in zip(rows, starts)]
+            cols[field] = list(map(float, vals))
+
+        return cols
+
 
 class BacktraderCSV(feed.CSVFeedBase):
     DataCls = BacktraderCSVData
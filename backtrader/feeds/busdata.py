@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016, 2017 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+from backtrader.feed import DataBase
+from backtrader.utils.py3 import queue, with_metaclass
+from backtrader.stores import busstore
+from backtrader.stores.storeio import TickQueue
+
+
+__all__ = ['BusData']
+
+
+class MetaBusData(DataBase.__class__):
+    def __init__(cls, name, bases, dct):
+        '''Class has already been created ... register'''
+        # Initialize the class
+        super(MetaBusData, cls).__init__(name, bases, dct)
+
+        # Register with the store
+        busstore.BusStore.DataCls = cls
+
+
+class BusData(with_metaclass(MetaBusData, DataBase)):
+    '''Data feed receiving the bars a ``BusPublisher`` publishes in another
+    process. It is created with ``getdata`` of a ``BusStore``
+
+    ``dataname`` is the name under which the data is published and the
+    ``timeframe`` and ``compression`` have to be those of the published
+    data. The status notifications of the published data are passed on
+    (a ``DELAYED`` precedes the bars of the backlog of the publisher)
+
+    Bars already seen (sent once again after a reconnection) are skipped
+
+    Params:
+
+      - ``qcheck`` (default: ``0.5``)
+
+        Time in seconds to wake up if no data is received to give a chance to
+        resample/replay packets properly and pass notifications up the chain
+    '''
+    params = (
+        ('qcheck', 0.5),
+    )
+
+    _store = None
+
+    _ST_LIVE, _ST_OVER = range(2)
+
+    def islive(self):
+        '''Returns ``True`` to notify ``Cerebro`` that preloading and runonce
+        should be deactivated'''
+        return True
+
+    def setenvironment(self, env):
+        '''Receives an environment (cerebro) and passes it over to the store it
+        belongs to'''
+        super(BusData, self).setenvironment(env)
+        env.addstore(self._store)
+
+    def start(self):
+        '''Subscribes to the data over the store'''
+        super(BusData, self).start()
+        self.qlive = TickQueue()
+        self._seq = 0
+        self._barlines = [getattr(self.lines, x) for x in busstore.BARLINES]
+        self._state = self._ST_LIVE
+        self._store.start(data=self)
+
+    def haslivedata(self):
+        return not self.qlive.empty()
+
+    def haslivewakeup(self):
+        return True  # the store delivers over a TickQueue
+
+    def _load(self):
+        if self._state == self._ST_OVER:
+            return False
+
+        while True:
+            try:
+                kind, msg = self.qlive.get(timeout=self._qcheck)
+            except queue.Empty:
+                return None  # indicate timeout situation
+
+            if self._latency is not None:
+                self._latency.arrival(self, self.qlive)
+
+            if kind == busstore.BARDATA:
+                if msg[0] <= self._seq:
+                    continue  # already delivered
+
+                self._seq = msg[0]
+                for line, value in zip(self._barlines, msg[1:]):
+                    line[0] = value
+
+                return True
+
+            if kind == busstore.STATUSDATA:
+                self.put_notification(msg)
+                continue
+
+            if kind == busstore.LOST:
+                self.put_notification(self.CONNBROKEN)
+                continue
+
+            if kind == busstore.UNKNOWN:
+                self.put_notification(self.NOTSUBSCRIBED)
+
+            # END or UNKNOWN
+            self.put_notification(self.DISCONNECTED)
+            self._state = self._ST_OVER
+            return False
@@ -47,12 +47,19 @@ class MetaChainer(bt.DataBase.__class__):
 
 
 class Chainer(bt.with_metaclass(MetaChainer, bt.DataBase)):
-    '''Class that chains datas'''
+    '''Class that chains datas
+
+    Bars with a datetime which is not past the last delivered one are skipped
+
+    If the datas can be preloaded (none of them is live), they are preloaded
+    and the bars of each data are copied over in a single go
+    '''
 
     def islive(self):
         '''Returns ``True`` to notify ``Cerebro`` that preloading and runonce
-        should be deactivated'''
-        return True
+        should be deactivated, which is the case if any of the datas is
+        live'''
+        return any(d.islive() for d in self._args)
 
     def __init__(self, *args):
         self._args = args
@@ -83,6 +90,43 @@ class Chainer(bt.with_metaclass(MetaChainer, bt.DataBase)):
             return self._args[0]._gettz()
         return bt.utils.date.Localizer(self.p.tz)
 
+    def preload(self):
+        if not self._preloadchain():
+            while self.load():
+                pass
+
+        self._last()
+        self.home()
+
+    def _preloadchain(self):
+        if not self._cansplice(self._args):
+            return False
+
+        segments = list()
+        lastdt = float('-inf')
+        for d in self._args:
+            d.preload()
+            dts, buflen = d.lines.datetime.array, d.buflen()
+
+            p = 0
+            while p < buflen:
+                if dts[p] <= lastdt:  # not past the last delivered bar
+                    p += 1
+                    continue
+
+                # a run of bars with increasing datetimes goes in one go
+                start, p = p, p + 1
+                while p < buflen and dts[p] > dts[p - 1]:
+                    p += 1
+
+                segments.append((d, start, p))
+                lastdt = dts[p - 1]
+
+            d.home()
+
+        self._splice(segments)
+        return True
+
     def _load(self):
         while self._d is not None:
             if not self._d.next():  # no values from current data source
@@ -23,12 +23,115 @@ from __future__ import (absolute_import, division, print_function,
 
 from datetime import datetime
 import itertools
+import re
 
 from .. import feed, TimeFrame
 from ..utils import date2num
 from ..utils.py3 import integer_types, string_types
 
 
+# Fixed width numeric directives which can be parsed without strptime, in the
+# order of the arguments of datetime, with the default strptime gives them
+_DTDIRECTIVES = 'YmdHMS'
+_DTWIDTHS = dict(Y=4, m=2, d=2, H=2, M=2, S=2)
+_DTDEFAULTS = (1900, 1, 1, 0, 0, 0)
+
+
+def _dtdirectives(fmt):
+    # Returns the directives in fmt (a '%' for a literal '%')
+    return re.findall(r'%(.)', fmt)
+
+
+def _utcint(x):
+    return datetime.utcfromtimestamp(int(x))
+
+
+def _utcfloat(x):
+    return datetime.utcfromtimestamp(float(x))
+
+
+class _DTParser(object):
+    '''Parses strings in format ``fmt`` to ``datetime``
+
+    If ``fmt`` is only made of fixed width numeric fields (``%Y``, ``%m``,
+    ``%d``, ``%H``, ``%M``, ``%S``) and literals, the strings are parsed with
+    a regular expression and only those which do not match exactly (a month
+    with a single digit, for example) are passed over to ``strptime``. Any
+    other format is left to ``strptime`` (and ``fast`` is ``False``)
+
+    Instances (unlike closures) can be pickled along with the data feed
+    '''
+    def __init__(self, fmt):
+        self.fmt = fmt
+        self.fast = False
+
+        pattern, directives = [], []
+        tokens = iter(fmt)
+        for c in tokens:
+            if c != '%':
+                pattern.append(re.escape(c))
+                continue
+
+            d = next(tokens, None)
+            if d == '%':
+                pattern.append('%')
+                continue
+
+            if d not in _DTWIDTHS or d in directives:
+                return  # exotic format, left to strptime
+
+            directives.append(d)
+            pattern.append('([0-9]{%d})' % _DTWIDTHS[d])
+
+        self.fast = True
+        self._regex = re.compile(''.join(pattern) + r'\Z')
+
+        # None if the groups are the leading arguments to datetime
+        self._argidx = [_DTDIRECTIVES.index(d) for d in directives]
+        if len(directives) >= 3 and \
+                ''.join(directives) == _DTDIRECTIVES[:len(directives)]:
+            self._argidx = None
+
+    def __call__(self, dtstr):
+        if not self.fast:
+            return datetime.strptime(dtstr, self.fmt)
+
+        m = self._regex.match(dtstr)
+        if m is None:
+            return datetime.strptime(dtstr, self.fmt)
+
+        if self._argidx is None:
+            return datetime(*map(int, m.groups()))
+
+        args = list(_DTDEFAULTS)
+        for i, val in zip(self._argidx, m.groups()):
+            args[i] = int(val)
+
+        return datetime(*args)
+
+
+class _DTCombiner(object):
+    '''Parses separate date and time strings and combines them. The same
+    date is in many lines (and the same time in many days): each string is
+    parsed only once'''
+    def __init__(self, dtparse, tmparse):
+        self.dtparse, self.tmparse = dtparse, tmparse
+        self.dates, self.times = dict(), dict()
+
+    def __call__(self, dtfield, tmfield):
+        try:
+            d = self.dates[dtfield]
+        except KeyError:
+            d = self.dates[dtfield] = self.dtparse(dtfield).date()
+
+        try:
+            t = self.times[tmfield]
+        except KeyError:
+            t = self.times[tmfield] = self.tmparse(tmfield).time()
+
+        return datetime.combine(d, t)
+
+
 class GenericCSVData(feed.CSVDataBase):
     '''Parses a CSV file according to the order and field presence defined by the
     parameters
@@ -52,6 +155,10 @@ class GenericCSVData(feed.CSVDataBase):
       - ``dtformat``: Format used to parse the datetime CSV field. See the
         python strptime/strftime documentation for the format.
 
+        Formats made only of ``%Y``, ``%m``, ``%d``, ``%H``, ``%M``, ``%S``
+        and literals (like the default) are parsed without resorting to
+        strptime, which is much faster
+
         If a numeric value is specified, it will be interpreted as follows
 
           - ``1``: The value is a Unix timestamp of type ``int`` representing
@@ -87,31 +194,48 @@ class GenericCSVData(feed.CSVDataBase):
     def start(self):
         super(GenericCSVData, self).start()
 
+        self._dtcombine = None
         if isinstance(self.p.dtformat, string_types):
             self._dtstr = True
+            self._dtformat(self.p.dtformat)
         elif isinstance(self.p.dtformat, integer_types):
             self._dtstr = False
             idt = int(self.p.dtformat)
             if idt == 1:
-                self._dtconvert = lambda x: datetime.utcfromtimestamp(int(x))
+                self._dtconvert = _utcint
             elif idt == 2:
-                self._dtconvert = lambda x: datetime.utcfromtimestamp(float(x))
+                self._dtconvert = _utcfloat
 
         else:  # assume callable
             self._dtconvert = self.p.dtformat
 
-    def _loadline(self, linetokens):
-        # Datetime needs special treatment
-        dtfield = linetokens[self.p.datetime]
-        if self._dtstr:
-            dtformat = self.p.dtformat
+    def _dtformat(self, dtformat):
+        # Prepares the conversion of string datetimes, done once and not for
+        # each line. The common formats skip strptime (see _DTParser)
+        if self.p.time >= 0:
+            tmformat = self.p.tmformat
+            dtparse, tmparse = _DTParser(dtformat), _DTParser(tmformat)
+            if dtparse.fast and tmparse.fast and \
+                    set(_dtdirectives(dtformat)) <= set('Ymd%') and \
+                    set(_dtdirectives(tmformat)) <= set('HMS%'):
+                self._dtcombine = _DTCombiner(dtparse, tmparse)
+                return
 
-            if self.p.time >= 0:
-                # add time value and format if it's in a separate field
-                dtfield += 'T' + linetokens[self.p.time]
-                dtformat += 'T' + self.p.tmformat
+            # add time format: the time value is added to the date
+            dtformat += 'T' + tmformat
 
-            dt = datetime.strptime(dtfield, dtformat)
+        self._dtconvert = _DTParser(dtformat)
+
+    def _dtnum(self, linetokens):
+        # Datetime needs special treatment
+        dtfield = linetokens[self.p.datetime]
+        if self._dtstr and self.p.time >= 0:
+            tmfield = linetokens[self.p.time]
+            if self._dtcombine is not None:
+                dt = self._dtcombine(dtfield, tmfield)
+            else:
+                # add time value if it's in a separate field
+                dt = self._dtconvert(dtfield + 'T' + tmfield)
         else:
             dt = self._dtconvert(dtfield)
 
@@ -128,12 +252,15 @@ class GenericCSVData(feed.CSVDataBase):
             dteosnum = self.date2num(dteos)  # utc'ize
 
             if dteosnum > dtnum:
-                self.lines.datetime[0] = dteosnum
-            else:
-                # Avoid reconversion if already converted dtin == dt
-                self.l.datetime[0] = date2num(dt) if self._tzinput else dtnum
-        else:
-            self.lines.datetime[0] = date2num(dt)
+                return dteosnum
+
+            # Avoid reconversion if already converted dtin == dt
+            return date2num(dt) if self._tzinput else dtnum
+
+        return date2num(dt)
+
+    def _loadline(self, linetokens):
+        self.lines.datetime[0] = self._dtnum(linetokens)
 
         # The rest of the fields can be done with the same procedure
         for linefield in (x for x in self.getlinealiases() if x != 'datetime'):
@@ -157,6 +284,26 @@ class GenericCSVData(feed.CSVDataBase):
 
         return True
 
+    def _loadlines(self, rows):
+        cols = dict(datetime=list(map(self._dtnum, rows)))
+
+        nullvalue = float(self.p.nullvalue)
+        for linefield in (x for x in self.getlinealiases() if x != 'datetime'):
+            csvidx = getattr(self.params, linefield)
+
+            if csvidx is None or csvidx < 0:
+                cols[linefield] = [nullvalue] * len(rows)
+                continue
+
+            csvfields = [row[csvidx] for row in rows]
+            try:
+                cols[linefield] = list(map(float, csvfields))
+            except ValueError:  # possibly empty fields, which get nullvalue
+                cols[linefield] = [float(x) if x != '' else nullvalue
+                                   for x in csvfields]
+
+        return cols
+
 
 class GenericCSV(feed.CSVFeedBase):
     DataCls = GenericCSVData
@@ -431,6 +431,9 @@ class IBData(with_metaclass(MetaIBData, DataBase)):
     def haslivedata(self):
         return bool(self._storedmsg or self.qlive)
 
+    def haslivewakeup(self):
+        return True  # the store delivers over a TickQueue
+
     def _load(self):
         if self.contract is None or self._state == self._ST_OVER:
             return False  # nothing can be done
@@ -470,6 +473,9 @@ class IBData(with_metaclass(MetaIBData, DataBase)):
                     self._statelivereconn = False
                     continue  # to reenter the loop and hit st_historback
 
+                if self._latency is not None:
+                    self._latency.arrival(self, self.qlive)
+
                 if msg is None:  # Conn broken during historical/backfilling
                     self.put_notification(self.CONNBROKEN)
                     # Try to reconnect
@@ -21,9 +21,14 @@
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
+import json
+import math
+import threading
+
 import backtrader as bt
 import backtrader.feed as feed
 from ..utils import date2num
+from ..utils.py3 import queue, urlopen, urlquote
 import datetime as dt
 
 TIMEFRAMES = dict(
@@ -37,6 +42,30 @@ TIMEFRAMES = dict(
     )
 )
 
+# Length in microseconds of the intervals of TIMEFRAMES
+_INTERVALS = dict(s=10 ** 6, m=60 * 10 ** 6, d=86400 * 10 ** 6,
+                 w=7 * 86400 * 10 ** 6)
+
+_QUERY = ('SELECT mean("{open_f}") AS "open", mean("{high_f}") AS "high", '
+         'mean("{low_f}") AS "low", mean("{close_f}") AS "close", '
+         'mean("{vol_f}") AS "volume", mean("{oi_f}") AS "openinterest" '
+         'FROM "{dataname}" '
+         'WHERE time {begin} '
+         'GROUP BY time({timeframe}) fill(none)')
+
+
+def _tfstr(p):
+    return '{multiple}{timeframe}'.format(
+        multiple=(p.compression if p.compression else 1),
+        timeframe=TIMEFRAMES.get(p.timeframe, 'd'))
+
+
+def _query(p, begin):
+    return _QUERY.format(open_f=p.open, high_f=p.high,
+                        low_f=p.low, close_f=p.close,
+                        vol_f=p.volume, oi_f=p.ointerest,
+                        timeframe=_tfstr(p), begin=begin, dataname=p.dataname)
+
 
 class InfluxDB(feed.DataBase):
     frompackages = (
@@ -68,10 +97,6 @@ class InfluxDB(feed.DataBase):
         except InfluxDBClientError as err:
             print('Failed to establish connection to InfluxDB: %s' % err)
 
-        tf = '{multiple}{timeframe}'.format(
-            multiple=(self.p.compression if self.p.compression else 1),
-            timeframe=TIMEFRAMES.get(self.p.timeframe, 'd'))
-
         if not self.p.startdate:
             st = '<= now()'
         else:
@@ -79,16 +104,7 @@ class InfluxDB(feed.DataBase):
 
         # The query could already consider parameters like fromdate and todate
         # to have the database skip them and not the internal code
-        qstr = ('SELECT mean("{open_f}") AS "open", mean("{high_f}") AS "high", '
-                'mean("{low_f}") AS "low", mean("{close_f}") AS "close", '
-                'mean("{vol_f}") AS "volume", mean("{oi_f}") AS "openinterest" '
-                'FROM "{dataname}" '
-                'WHERE time {begin} '
-                'GROUP BY time({timeframe}) fill(none)').format(
-                    open_f=self.p.open, high_f=self.p.high,
-                    low_f=self.p.low, close_f=self.p.close,
-                    vol_f=self.p.volume, oi_f=self.p.ointerest,
-                    timeframe=tf, begin=st, dataname=self.p.dataname)
+        qstr = _query(self.p, st)
 
         try:
             dbars = list(self.ndb.query(qstr).get_points())
@@ -113,3 +129,256 @@ class InfluxDB(feed.DataBase):
         self.l.volume[0] = bar['volume']
 
         return True
+
+
+_EPOCHORDINAL = dt.datetime(1970, 1, 1).toordinal()
+_USPERDAY = 86400 * 10 ** 6
+
+# key: second of the day - value: fractions of the day of hours, minutes and
+# seconds. Emptied when it reaches _TODSIZE entries (bars of seconds)
+_tods = dict()
+_TODSIZE = 4096
+
+
+def _us2num(us):
+    # Epoch microseconds to the float date2num gives, with the fractions of
+    # the time of the day of the seconds cached
+    days, usday = divmod(us, _USPERDAY)
+    secs, usecs = divmod(usday, 10 ** 6)
+    try:
+        h, m, s = _tods[secs]
+    except KeyError:
+        if len(_tods) >= _TODSIZE:
+            _tods.clear()
+
+        hh, mmss = divmod(secs, 3600)
+        mm, ss = divmod(mmss, 60)
+        h, m, s = _tods[secs] = (hh / 24.0, mm / 1440.0, ss / 86400.0)
+
+    return math.fsum((float(_EPOCHORDINAL + days), h, m, s, usecs / 86400e6))
+
+
+def _dt2us(dtime):
+    delta = dtime - dt.datetime(1970, 1, 1)
+    return (delta.days * 86400 + delta.seconds) * 10 ** 6 + delta.microseconds
+
+
+class InfluxDBChunked(feed.DataBase):
+    '''Streaming variant of ``InfluxDB`` for histories which do not fit in
+    memory. The same query is executed over consecutive time chunks (pages)
+    and the bars are delivered chunk after chunk, while the next chunk is
+    already being fetched in the background
+
+    The database is queried directly over the HTTP API (``/query``) with
+    epoch timestamps, and each chunk is decoded column by column from the
+    JSON response. The ``influxdb`` package is not needed
+
+    Specific parameters (the others are as in ``InfluxDB``):
+
+      - ``chunksize`` (default: 30 days): time span (``datetime.timedelta``)
+        of each query. It is rounded up to a multiple of the interval of
+        the bars
+
+      - ``prefetch`` (default: ``True``): fetch the next chunk in a
+        background thread while the current one is consumed
+
+      - ``timeout`` (default: ``None``): timeout in seconds for the HTTP
+        requests
+
+    The first and last times are asked to the database (after ``startdate``
+    or ``fromdate`` and before ``todate`` if given) and the chunks cover
+    the time in between. An error in a query is raised as ``IOError``
+    '''
+    params = (
+        ('host', '127.0.0.1'),
+        ('port', '8086'),
+        ('username', None),
+        ('password', None),
+        ('database', None),
+        ('timeframe', bt.TimeFrame.Days),
+        ('startdate', None),
+        ('high', 'high_p'),
+        ('low', 'low_p'),
+        ('open', 'open_p'),
+        ('close', 'close_p'),
+        ('volume', 'volume'),
+        ('ointerest', 'oi'),
+        ('chunksize', dt.timedelta(days=30)),
+        ('prefetch', True),
+        ('timeout', None),
+    )
+
+    _COLUMNS = ('open', 'high', 'low', 'close', 'volume', 'openinterest')
+
+    def start(self):
+        super(InfluxDBChunked, self).start()
+        self._chunks = self._getchunks()
+        self._bars = iter([])
+
+        self._queue = self._thread = None
+        self._stopping = threading.Event()
+        if self.p.prefetch:
+            self._queue = queue.Queue(maxsize=1)  # the next one
+            self._thread = threading.Thread(target=self._t_prefetch)
+            self._thread.daemon = True
+            self._thread.start()
+
+    def stop(self):
+        super(InfluxDBChunked, self).stop()
+        if self._thread is not None:
+            self._stopping.set()
+            self._thread.join()
+            self._thread = None
+
+    def _request(self, qstr):
+        args = [('q', qstr), ('epoch', 'u')]
+        if self.p.database:
+            args.append(('db', self.p.database))
+        if self.p.username is not None:
+            args.append(('u', self.p.username))
+        if self.p.password is not None:
+            args.append(('p', self.p.password))
+
+        url = 'http://%s:%s/query?%s' % (
+            self.p.host, self.p.port,
+            '&'.join('%s=%s' % (k, urlquote(v, safe='')) for k, v in args))
+
+        kwargs = dict()
+        if self.p.timeout is not None:
+            kwargs['timeout'] = self.p.timeout
+
+        resp = urlopen(url, **kwargs)
+        try:
+            result = json.loads(resp.read().decode('utf-8'))
+        finally:
+            resp.close()
+
+        result = result.get('results', [dict(error=result.get('error'))])[0]
+        if result.get('error'):
+            raise IOError('InfluxDB query failed: %s' % result['error'])
+
+        # columns and rows of values
+        series = result.get('series', [dict(columns=[], values=[])])[0]
+        return series['columns'], series['values']
+
+    def _edge(self, selector, where):
+        # Time (epoch us) of the first/last point or None
+        qstr = 'SELECT {sel}("{close_f}") FROM "{dataname}"'.format(
+            sel=selector, close_f=self.p.close, dataname=self.p.dataname)
+        if where:
+            qstr += ' WHERE ' + ' AND '.join(where)
+
+        columns, values = self._request(qstr)
+        return values[0][columns.index('time')] if values else None
+
+    def _getchunks(self):
+        # Returns the list of (begin, end) times (epoch us) to query
+        first = list()
+        if self.p.startdate:
+            first.append('time >= \'%s\'' % self.p.startdate)
+        if self.p.fromdate is not None:
+            first.append('time >= %du' % _dt2us(self.p.fromdate))
+
+        last = list()
+        if self.p.todate is not None:
+            last.append('time <= %du' % _dt2us(self.p.todate))
+
+        begin, end = self._edge('first', first), self._edge('last', last)
+        if begin is None or end is None or begin > end:
+            return []
+
+        # Chunks aligned with the bars: the aggregation of a bar (in the
+        # database) does not span two chunks
+        interval = _INTERVALS.get(TIMEFRAMES.get(self.p.timeframe, 'd'), 1)
+        interval *= self.p.compression if self.p.compression else 1
+        chunksize = self.p.chunksize
+        if not isinstance(chunksize, (int, float)):
+            chunksize = _dt2us(dt.datetime(1970, 1, 1) + chunksize)
+        chunksize = max(1, -(-int(chunksize) // interval)) * interval
+
+        begin -= begin % interval
+        return [(t, t + chunksize) for t in range(begin, end + 1, chunksize)]
+
+    def _fetch(self, chunk):
+        # Returns the bars of chunk as columns in the order of _COLUMNS, with
+        # the datetime first
+        begin = 'time >= %du AND time < %du' % chunk
+        columns, values = self._request(_query(self.p, begin))
+        if not values:
+            return None
+
+        nan = float('NaN')
+        cols = list(zip(*values))
+        bars = [list(map(_us2num, cols[columns.index('time')]))]
+        for name in self._COLUMNS:
+            if name not in columns:
+                bars.append([nan] * len(values))
+                continue
+
+            col = cols[columns.index(name)]
+            if None in col:
+                col = [nan if x is None else x for x in col]
+            bars.append(col)
+
+        return bars
+
+    def _t_put(self, item):
+        # Puts item in the queue unless stopping. Returns if it was put
+        while not self._stopping.is_set():
+            try:
+                self._queue.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                pass
+
+        return False
+
+    def _t_prefetch(self):
+        for chunk in self._chunks:
+            try:
+                bars = self._fetch(chunk)
+            except Exception as e:
+                self._t_put(e)
+                return
+
+            if bars is not None and not self._t_put(bars):
+                return
+
+        self._t_put(None)  # done
+
+    def _nextchunk(self):
+        # Returns the next chunk of bars or None if no more are available
+        if self._queue is None:
+            while self._chunks:
+                bars = self._fetch(self._chunks.pop(0))
+                if bars is not None:
+                    return bars
+
+            return None
+
+        bars = self._queue.get()
+        if bars is None or isinstance(bars, Exception):
+            # the thread is gone: nothing else will be queued
+            self._queue = None
+            self._chunks = []
+            if bars is not None:
+                raise bars
+
+        return bars
+
+    def _load(self):
+        try:
+            bar = next(self._bars)
+        except StopIteration:
+            bars = self._nextchunk()
+            if bars is None:
+                return False
+
+            self._bars = zip(*bars)
+            bar = next(self._bars)
+
+        lines = self.lines
+        (lines.datetime[0], lines.open[0], lines.high[0], lines.low[0],
+         lines.close[0], lines.volume[0], lines.openinterest[0]) = bar
+
+        return True
@@ -160,7 +160,7 @@ class OandaData(with_metaclass(MetaOandaData, DataBase)):
 
     def _timeoffset(self):
         # Effective way to overcome the non-notification?
-        return self._TOFFSET
+        return self._TOFFSET + self.o.timeoffset()
 
     def islive(self):
         '''Returns ``True`` to notify ``Cerebro`` that preloading and runonce
@@ -257,6 +257,9 @@ class OandaData(with_metaclass(MetaOandaData, DataBase)):
     def haslivedata(self):
         return bool(self._storedmsg or self.qlive)  # do not return the objs
 
+    def haslivewakeup(self):
+        return True  # the store delivers over a TickQueue
+
     def _load(self):
         if self._state == self._ST_OVER:
             return False
@@ -269,6 +272,9 @@ class OandaData(with_metaclass(MetaOandaData, DataBase)):
                 except queue.Empty:
                     return None  # indicate timeout situation
 
+                if self._latency is not None:
+                    self._latency.arrival(self, self.qlive)
+
                 if msg is None:  # Conn broken during historical/backfilling
                     self.put_notification(self.CONNBROKEN)
                     # Try to reconnect
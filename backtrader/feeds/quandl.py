@@ -127,6 +127,35 @@ class QuandlCSV(feed.CSVDataBase):
 
         return True
 
+    def _loadlines(self, rows):
+        # The same dates show up in many rows: parse them once
+        dates = dict()
+        dts = list()
+        sessionend = self.p.sessionend
+        for row in rows:
+            dttxt = row[0]  # YYYY-MM-DD
+            dtnum = dates.get(dttxt)
+            if dtnum is None:
+                dt = date(int(dttxt[0:4]), int(dttxt[5:7]), int(dttxt[8:10]))
+                dtnum = date2num(datetime.combine(dt, sessionend))
+                dates[dttxt] = dtnum
+
+            dts.append(dtnum)
+
+        # skip ohlcv, ex-dividend, split ratio for the adjusted values
+        start = 8 if self.p.adjclose else 1
+        fields = ('open', 'high', 'low', 'close', 'volume')
+        cols = dict(datetime=dts, openinterest=[0.0] * len(rows))
+        for i, field in enumerate(fields, start=start):
+            col = [float(row[i]) for row in rows]
+            if self.p.round:
+                decimals = self.p.decimals
+                col = [round(x, decimals) for x in col]
+
+            cols[field] = col
+
+        return cols
+
 
 class Quandl(QuandlCSV):
     '''
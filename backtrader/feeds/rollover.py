@@ -22,9 +22,11 @@ from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
 
+from bisect import bisect_left
 from datetime import datetime
 
 import backtrader as bt
+from backtrader.utils.py3 import string_types
 
 
 class MetaRollOver(bt.DataBase.__class__):
@@ -98,6 +100,16 @@ class RollOver(bt.with_metaclass(MetaRollOver, bt.DataBase)):
         than the volume from ``d1``
 
             - ``False``: the expiration cannot take place
+
+          It can also be the name of a line (``volume``, ``openinterest``)
+          and the roll-over takes place if the value of ``d1`` is larger than
+          the value of ``d0``
+
+    If the futures can be preloaded (none of them is live), they are
+    preloaded and the roll-over points are found on the preloaded values,
+    copying then the bars of each future in a single go. ``checkdate`` (and
+    ``checkcondition``) are only evaluated while the active future can still
+    be rolled over
     '''
 
     params = (
@@ -108,8 +120,9 @@ class RollOver(bt.with_metaclass(MetaRollOver, bt.DataBase)):
 
     def islive(self):
         '''Returns ``True`` to notify ``Cerebro`` that preloading and runonce
-        should be deactivated'''
-        return True
+        should be deactivated, which is the case if any of the futures is
+        live'''
+        return any(d.islive() for d in self._rolls)
 
     def __init__(self, *args):
         self._rolls = args
@@ -145,9 +158,77 @@ class RollOver(bt.with_metaclass(MetaRollOver, bt.DataBase)):
         return False
 
     def _checkcondition(self, d0, d1):
-        if self.p.checkcondition is not None:
-            return self.p.checkcondition(d0, d1)
+        checkcondition = self.p.checkcondition
+        if isinstance(checkcondition, string_types):
+            line0 = getattr(d0.lines, checkcondition)
+            line1 = getattr(d1.lines, checkcondition)
+            return line1[0] > line0[0]
+
+        if checkcondition is not None:
+            return checkcondition(d0, d1)
+
+        return True
+
+    def preload(self):
+        if not self._preloadrolls():
+            while self.load():
+                pass
+
+        self._last()
+        self.home()
+
+    def _preloadrolls(self):
+        # Preloads the futures and looks for the roll-over points on the
+        # preloaded values. The futures are synchronized on demand with the
+        # datetime of the active future as _load does: the current bar of a
+        # future is the 1st one which is not before the active bar
+        if not self._cansplice(self._rolls):
+            return False
+
+        for d in self._rolls:
+            d.preload()
+
+        segments = list()
+        datas = list(self._rolls)
+        dt0 = None  # datetime of the last active bar
+        start = scan = 0  # 1st bar to deliver and to check for a roll-over
+        while datas:
+            d = datas.pop(0)
+            dts, buflen = d.lines.datetime.array, d.buflen()
+
+            p, end = scan, buflen
+            while p < buflen and datas and self.p.checkdate is not None:
+                d.seek(p)
+                dt0 = dts[p]
+                if self._checkdate(d.datetime.datetime(), d):
+                    d1 = datas[0]
+                    p1 = bisect_left(d1.lines.datetime.array, dt0,
+                                     0, d1.buflen())
+                    if p1 < d1.buflen():
+                        d1.seek(p1)
+                        if self._checkcondition(d, d1):
+                            end = p
+                            break
+                p += 1
+
+            segments.append((d, start, end))
+            if end < buflen:  # rolled over: bar p1 of the next is delivered
+                start, scan = p1, p1 + 1
+                continue
+
+            if scan < buflen:
+                dt0 = dts[buflen - 1]
+
+            start = scan = 0
+            if datas and dt0 is not None:  # next bar after synchronized one
+                d1 = datas[0]
+                start = scan = bisect_left(d1.lines.datetime.array, dt0,
+                                           0, d1.buflen()) + 1
+
+        for d in self._rolls:
+            d.home()
 
+        self._splice(segments)
         return True
 
     def _load(self):
@@ -372,6 +372,9 @@ class VCData(with_metaclass(MetaVCData, DataBase)):
     def haslivedata(self):
         return self._laststatus == self.LIVE and self.q
 
+    def haslivewakeup(self):
+        return True  # the store delivers over a TickQueue
+
     def _load(self):
         if self._state == self._ST_NOTFOUND:
             return False  # nothing can be done
@@ -384,6 +387,9 @@ class VCData(with_metaclass(MetaVCData, DataBase)):
             except queue.Empty:
                 return None
 
+            if self._latency is not None:
+                self._latency.arrival(self, self.q)
+
             if msg is None:
                 return False  # end of stream
 
@@ -81,6 +81,44 @@ class VChartCSVData(feed.CSVDataBase):
 
         return True
 
+    def _loadlines(self, rows):
+        if not self._name:
+            self._name = rows[0][0]  # ticker
+
+        # as with _loadline the timeframe is that of the last row
+        self._timeframe = self.vctframes[rows[-1][1]]
+
+        # The same dates and times show up in many rows: parse them once
+        sessionend = self.p.sessionend
+        eos = (sessionend.hour, sessionend.minute, sessionend.second)
+        dates, times = dict(), dict()
+        dts = list()
+        for row in rows:
+            dttxt = row[2]
+            ymd = dates.get(dttxt)
+            if ymd is None:
+                ymd = int(dttxt[0:4]), int(dttxt[4:6]), int(dttxt[6:8])
+                dates[dttxt] = ymd
+
+            if row[1] == 'I':  # use the provided time
+                tmtxt = row[3]
+                hms = times.get(tmtxt)
+                if hms is None:
+                    hh, mmss = divmod(int(tmtxt), 10000)
+                    hms = (hh,) + divmod(mmss, 100)
+                    times[tmtxt] = hms
+            else:  # put it at the end of the session parameter
+                hms = eos
+
+            dts.append(date2num(datetime.datetime(*(ymd + hms))))
+
+        fields = ('open', 'high', 'low', 'close', 'volume', 'openinterest')
+        cols = dict(datetime=dts)
+        for i, field in enumerate(fields, start=4):
+            cols[field] = [float(row[i]) for row in rows]
+
+        return cols
+
 
 class VChartCSV(feed.CSVFeedBase):
     DataCls = VChartCSVData
@@ -122,18 +122,54 @@ class YahooFinanceCSVData(feed.CSVDataBase):
             if not nullseen:
                 break  # can proceed
 
-        i = itertools.count(0)
-
-        dttxt = linetokens[next(i)]
+        dttxt = linetokens[0]
         dt = date(int(dttxt[0:4]), int(dttxt[5:7]), int(dttxt[8:10]))
         dtnum = date2num(datetime.combine(dt, self.p.sessionend))
 
         self.lines.datetime[0] = dtnum
+        self.lines.openinterest[0] = 0.0
+
+        o, h, l, c, v = self._ohlcv(linetokens)
+        self.lines.open[0] = o
+        self.lines.high[0] = h
+        self.lines.low[0] = l
+        self.lines.close[0] = c
+        self.lines.volume[0] = v
+
+        return True
+
+    def _loadlines(self, rows):
+        rows = [row for row in rows if 'null' not in row[1:]]
+
+        # The same dates show up in many rows: parse them once
+        dates = dict()
+        dts = list()
+        sessionend = self.p.sessionend
+        for row in rows:
+            dttxt = row[0]
+            dtnum = dates.get(dttxt)
+            if dtnum is None:
+                dt = date(int(dttxt[0:4]), int(dttxt[5:7]), int(dttxt[8:10]))
+                dtnum = date2num(datetime.combine(dt, sessionend))
+                dates[dttxt] = dtnum
+
+            dts.append(dtnum)
+
+        cols = dict(datetime=dts, openinterest=[0.0] * len(rows))
+        fields = ('open', 'high', 'low', 'close', 'volume')
+        for field, col in zip(fields, zip(*map(self._ohlcv, rows))):
+            cols[field] = col
+
+        return cols
+
+    def _ohlcv(self, linetokens):
+        # The open, high, low, close and volume of the tokens of a line
+        i = itertools.count(1)
+
         o = float(linetokens[next(i)])
         h = float(linetokens[next(i)])
         l = float(linetokens[next(i)])
         c = float(linetokens[next(i)])
-        self.lines.openinterest[0] = 0.0
 
         if self.p.version == 'v7':  # in v7 ohlc,adc,v, get real volume
             # In v7, the final seq is "adj close", close, volume
@@ -179,13 +215,7 @@ class YahooFinanceCSVData(feed.CSVDataBase):
             c = round(c, decimals)
             v = round(v, decimals)
 
-        self.lines.open[0] = o
-        self.lines.high[0] = h
-        self.lines.low[0] = l
-        self.lines.close[0] = c
-        self.lines.volume[0] = v
-
-        return True
+        return o, h, l, c, v
 
 
 class YahooLegacyCSV(YahooFinanceCSVData):
@@ -21,11 +21,13 @@
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
+import array
 import functools
+import itertools
 import math
 
-from .linebuffer import LineActions
-from .utils.py3 import cmp, range
+from .linebuffer import LineActions, PseudoArray, _getnumpy
+from .utils.py3 import cmp, integer_types, range
 
 
 # Generate a List equivalent which uses "is" for contains
@@ -35,10 +37,64 @@ class List(list):
 
 
 class Logic(LineActions):
+    '''
+    Base class of the functions. The ``once`` methods work on the arrays of
+    the lines with numpy (if available) in a single vectorized pass and
+    implement the exact semantics of the python loops (which are used if
+    numpy is not available or the arguments cannot be vectorized)
+    '''
     def __init__(self, *args):
         super(Logic, self).__init__()
         self.args = [self.arrayize(arg) for arg in args]
 
+    @staticmethod
+    def _npvals(np, arg, start, end):
+        '''
+        Returns a numpy view of the values of a lines object from start to
+        end, the value held by a constant or ``None`` if not possible
+        '''
+        arr = arg.array
+        if isinstance(arr, PseudoArray):
+            val = arr.wrapped
+            if isinstance(val, (float,) + integer_types) and \
+                    abs(val) < 2 ** 53:  # exact conversion to float
+                return float(val)
+
+            return None
+
+        if not isinstance(arr, array.array):
+            return None
+
+        return np.frombuffer(arr)[start:end]
+
+    def _npset(self, np, start, end, vals):
+        dst = np.frombuffer(self.array)
+        dst[start:end] = vals
+        del dst  # release the buffer of the array, which may have to grow
+
+    def _oncenp(self, start, end):
+        '''
+        Calculates the values from start to end with numpy. Returns ``False``
+        if it was not possible
+        '''
+        np = _getnumpy()
+        if not np:
+            return False
+
+        # python is silent with nan comparisons and inf results
+        with np.errstate(all='ignore'):
+            vals = self._npcalc(np, start, end)
+
+        if vals is None:
+            return False
+
+        self._npset(np, start, end, vals)
+        return True
+
+    def _npcalc(self, np, start, end):
+        '''Returns the values from start to end or ``None``'''
+        return None
+
 
 class DivByZero(Logic):
     '''This operation is a Lines object and fills it values by executing a
@@ -61,7 +117,22 @@ class DivByZero(Logic):
         b = self.b[0]
         self[0] = self.a[0] / b if b else self.zero
 
+    def _npcalc(self, np, start, end):
+        a = self._npvals(np, self.a, start, end)
+        b = self._npvals(np, self.b, start, end)
+        zero = self.zero
+        if a is None or b is None or \
+                not isinstance(zero, (float,) + integer_types):
+            return None
+
+        vals = np.full(end - start, zero, dtype=np.float64)
+        np.true_divide(a, b, out=vals, where=np.not_equal(b, 0.0))
+        return vals
+
     def once(self, start, end):
+        if self._oncenp(start, end):
+            return
+
         # cache python dictionary lookups
         dst = self.array
         srca = self.a.array
@@ -100,7 +171,24 @@ class DivZeroByZero(Logic):
         else:
             self[0] = self.a[0] / b
 
+    def _npcalc(self, np, start, end):
+        a = self._npvals(np, self.a, start, end)
+        b = self._npvals(np, self.b, start, end)
+        single, dual = self.single, self.dual
+        if a is None or b is None or \
+                not isinstance(single, (float,) + integer_types) or \
+                not isinstance(dual, (float,) + integer_types):
+            return None
+
+        vals = np.empty(end - start, dtype=np.float64)
+        vals[:] = np.where(np.equal(a, 0.0), dual, single)
+        np.true_divide(a, b, out=vals, where=np.not_equal(b, 0.0))
+        return vals
+
     def once(self, start, end):
+        if self._oncenp(start, end):
+            return
+
         # cache python dictionary lookups
         dst = self.array
         srca = self.a.array
@@ -126,7 +214,19 @@ class Cmp(Logic):
     def next(self):
         self[0] = cmp(self.a[0], self.b[0])
 
+    def _npcalc(self, np, start, end):
+        a = self._npvals(np, self.a, start, end)
+        b = self._npvals(np, self.b, start, end)
+        if a is None or b is None:
+            return None
+
+        # cmp is (a > b) - (a < b)
+        return np.subtract(np.greater(a, b), np.less(a, b), dtype=np.float64)
+
     def once(self, start, end):
+        if self._oncenp(start, end):
+            return
+
         # cache python dictionary lookups
         dst = self.array
         srca = self.a.array
@@ -148,7 +248,18 @@ class CmpEx(Logic):
     def next(self):
         self[0] = cmp(self.a[0], self.b[0])
 
+    def _npcalc(self, np, start, end):
+        vals = [self._npvals(np, x, start, end) for x in self.args]
+        if any(x is None for x in vals):
+            return None
+
+        a, b, r1, r2, r3 = vals
+        return np.where(np.less(a, b), r1, np.where(np.greater(a, b), r3, r2))
+
     def once(self, start, end):
+        if self._oncenp(start, end):
+            return
+
         # cache python dictionary lookups
         dst = self.array
         srca = self.a.array
@@ -179,7 +290,19 @@ class If(Logic):
     def next(self):
         self[0] = self.a[0] if self.cond[0] else self.b[0]
 
+    def _npcalc(self, np, start, end):
+        a = self._npvals(np, self.a, start, end)
+        b = self._npvals(np, self.b, start, end)
+        cond = self._npvals(np, self.cond, start, end)
+        if a is None or b is None or cond is None:
+            return None
+
+        return np.where(np.not_equal(cond, 0.0), a, b)  # nan is also True
+
     def once(self, start, end):
+        if self._oncenp(start, end):
+            return
+
         # cache python dictionary lookups
         dst = self.array
         srca = self.a.array
@@ -194,7 +317,42 @@ class MultiLogic(Logic):
     def next(self):
         self[0] = self.flogic([arg[0] for arg in self.args])
 
+    def _getvlogic(self):
+        '''Returns the numpy implementation of flogic or ``None``'''
+        return _VLOGICS.get(self.flogic)
+
+    def _npcalc(self, np, start, end):
+        vlogic = self._getvlogic()
+        if vlogic is None:
+            return None
+
+        vals = [self._npvals(np, arg, start, end) for arg in self.args]
+        if not vals or any(x is None for x in vals):
+            return None
+
+        return vlogic(np, vals)
+
     def once(self, start, end):
+        if self._oncenp(start, end):
+            return
+
+        # flogic receives the values in a list as in next, but the iteration
+        # takes place in C with zip/map
+        iters = []
+        for arg in self.args:
+            arr = arg.array
+            if isinstance(arr, PseudoArray):
+                iters.append(itertools.repeat(arr.wrapped))
+            else:
+                iters.append(arr[start:end])
+
+        if len(iters) > sum(isinstance(x, itertools.repeat) for x in iters):
+            vals = array.array(str('d'),
+                               map(self.flogic, map(list, zip(*iters))))
+            if len(vals) == end - start:
+                self.array[start:end] = vals
+                return
+
         # cache python dictionary lookups
         dst = self.array
         arrays = [arg.array for arg in self.args]
@@ -208,12 +366,19 @@ class MultiLogicReduce(MultiLogic):
     def __init__(self, *args, **kwargs):
         super(MultiLogicReduce, self).__init__(*args)
         if 'initializer' not in kwargs:
+            self._rlogic = self.flogic  # the reduced function
             self.flogic = functools.partial(functools.reduce, self.flogic)
         else:
             self.flogic = functools.partial(functools.reduce, self.flogic,
                                             initializer=kwargs['initializer'])
 
 
+    _rlogic = None
+
+    def _getvlogic(self):
+        return _VREDUCES.get(self._rlogic)
+
+
 class Reduce(MultiLogicReduce):
     def __init__(self, flogic, *args, **kwargs):
         self.flogic = flogic
@@ -256,3 +421,50 @@ class Any(MultiLogic):
 
 class All(MultiLogic):
     flogic = all
+
+
+# numpy implementations of the logic functions. They take a list of numpy
+# arrays (or floats) and return the values of the same python functions
+def _vmax(np, vals):
+    # max keeps the 1st of equal values and the current value with nan
+    cur = vals[0]
+    for val in vals[1:]:
+        cur = np.where(np.greater(val, cur), val, cur)
+
+    return cur
+
+
+def _vmin(np, vals):
+    cur = vals[0]
+    for val in vals[1:]:
+        cur = np.where(np.less(val, cur), val, cur)
+
+    return cur
+
+
+def _vany(np, vals):
+    return functools.reduce(np.logical_or,
+                            [np.not_equal(val, 0.0) for val in vals])
+
+
+def _vall(np, vals):
+    return functools.reduce(np.logical_and,
+                            [np.not_equal(val, 0.0) for val in vals])
+
+
+def _vand(np, vals):
+    if len(vals) == 1:
+        return vals[0]  # reduce returns a single value untouched
+
+    return _vall(np, vals)
+
+
+def _vor(np, vals):
+    if len(vals) == 1:
+        return vals[0]  # reduce returns a single value untouched
+
+    return _vany(np, vals)
+
+
+_VLOGICS = {max: _vmax, min: _vmin, any: _vany, all: _vall}
+_VREDUCES = {_andlogic: _vand, _orlogic: _vor}
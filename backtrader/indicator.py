@@ -161,4 +161,4 @@ class MtLinePlotterIndicator(Indicator.__class__):
 
 
 class LinePlotterIndicator(with_metaclass(MtLinePlotterIndicator, Indicator)):
-    pass
+    _dedup = False  # the lines are defined at instance level
@@ -21,15 +21,68 @@
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
+import array
 import functools
 import math
 import operator
 
 from ..utils.py3 import map, range
 
+from ..linebuffer import _getnumpy
 from . import Indicator
 
 
+# The recursion of ExponentialSmoothing is a 1st order linear filter which
+# scipy.signal.lfilter can run in compiled code. It is only used if scipy is
+# available and if it delivers exactly the same values as the pure Python loop
+# (the platform could for example fuse the multiply/add operations). Short
+# ranges are left to the Python loop because of the conversion overhead
+LFILTER_MINSIZE = 256
+
+_lfilter = None  # None: not checked yet / False: not available
+
+
+def _expsmooth_lfilter(lfilter, np, src, dst, start, end, alpha, alpha1):
+    # src/dst are array.array('d'), prev the seed at start - 1
+    xs = np.frombuffer(src, dtype=np.float64)[start:end]
+    ys, _ = lfilter([alpha], [1.0, -alpha1], xs, zi=[dst[start - 1] * alpha1])
+    del xs  # release the buffer of src, which could have to grow
+    dst[start:end] = array.array(str('d'), ys.tobytes())
+
+
+def _getlfilter():
+    global _lfilter
+    if _lfilter is not None:
+        return _lfilter
+
+    _lfilter = False
+    np = _getnumpy()
+    if not np:
+        return _lfilter
+
+    try:
+        from scipy.signal import lfilter
+    except ImportError:
+        return _lfilter
+
+    # Check that the results are the same as those of the pure Python loop
+    src = array.array(str('d'), (100.0 + 10.0 * math.sin(i) + 0.1 * i
+                                 for i in range(LFILTER_MINSIZE)))
+    for alpha in [2.0 / 31.0, 1.0 / 14.0, 0.5]:
+        alpha1 = 1.0 - alpha
+        dst = array.array(str('d'), src)
+        _expsmooth_lfilter(lfilter, np, src, dst, 1, len(src), alpha, alpha1)
+
+        prev = src[0]
+        for i in range(1, len(src)):
+            prev = prev * alpha1 + src[i] * alpha
+            if dst[i] != prev:
+                return _lfilter
+
+    _lfilter = functools.partial(_expsmooth_lfilter, lfilter, np)
+    return _lfilter
+
+
 class PeriodN(Indicator):
     '''
     Base class for indicators which take a period (__init__ has to be called
@@ -406,6 +459,12 @@ class ExponentialSmoothing(Average):
         alpha = self.alpha
         alpha1 = self.alpha1
 
+        if end - start >= LFILTER_MINSIZE:
+            lfilter = _getlfilter()
+            if lfilter:
+                lfilter(darray, larray, start, end, alpha, alpha1)
+                return
+
         # Seed value from SMA calculated with the call to oncestart
         prev = larray[start - 1]
         for i in range(start, end):
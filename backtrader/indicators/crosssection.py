@@ -0,0 +1,292 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016, 2017 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import array
+import sys
+
+import backtrader as bt
+from backtrader.utils.py3 import range, with_metaclass
+from . import Indicator
+
+
+__all__ = ['CrossSection', 'CrossSectionRank', 'XSRank',
+           'CrossSectionPercentile', 'XSPercentile',
+           'CrossSectionQuantile', 'XSQuantile', 'XSDecile',
+           'CrossSectionZScore', 'XSZScore']
+
+
+def _dtline(obj):
+    # Returns the datetime line of the data feed which delivers the timeline
+    # of obj, following the clocks (and the owners of single lines)
+    seen = set()
+    while obj is not None and id(obj) not in seen:
+        if isinstance(obj, bt.DataSeries):
+            return obj.lines.datetime
+
+        seen.add(id(obj))
+        clock = getattr(obj, '_clock', None)
+        obj = clock if clock is not None else getattr(obj, 'owner', None)
+
+    return None
+
+
+class MetaCrossSection(Indicator.__class__):
+    def doprenew(cls, *args, **kwargs):
+        # The universe is made of the leading datas/lines in args, or else of
+        # the datas of the owner. One line per member of the universe is
+        # needed and a subclass with that number of lines is used
+        ndatas = 0
+        for arg in args:
+            if not isinstance(arg, bt.LineRoot):
+                break
+            ndatas += 1
+
+        if not ndatas:
+            ownercls = cls._OwnerCls or bt.LineMultiple
+            owner = bt.metabase.findowner(None, ownercls)
+            args = tuple(owner.datas) + args
+            ndatas = len(owner.datas)
+
+        return cls._universe(ndatas), args, kwargs
+
+    def _universe(cls, ndatas):
+        if cls._xsdatas == ndatas:
+            return cls
+
+        basecls = cls._xsbase or cls
+        xsclasses = basecls.__dict__.get('_xsclasses')
+        if xsclasses is None:
+            xsclasses = dict()
+            setattr(basecls, '_xsclasses', xsclasses)
+
+        newcls = xsclasses.get(ndatas)
+        if newcls is None:
+            name = str('%s_%d' % (basecls.__name__, ndatas))
+            clsdict = {
+                '__module__': basecls.__module__,
+                '__doc__': basecls.__doc__,
+                '_xsbase': basecls,
+                '_xsdatas': ndatas,
+                'lines': tuple('xs%d' % i for i in range(ndatas)),
+                'plotinfo': dict(
+                    plotname=basecls.plotinfo.plotname or basecls.__name__),
+            }
+            newcls = type(basecls)(name, (basecls,), clsdict)
+            setattr(sys.modules[basecls.__module__], name, newcls)
+            xsclasses[ndatas] = newcls
+
+        return newcls
+
+
+class CrossSection(with_metaclass(MetaCrossSection, Indicator)):
+    '''
+    Base class for indicators which calculate at each bar a value for each of
+    the members of a universe of datas, with respect to the values delivered
+    by all members of the universe in the same bar
+
+    The universe is made of the datas (or lines) passed to the indicator or
+    else of all the datas of the owner (the strategy). The indicator has one
+    line per member of the universe, in the same order (``xs0``, ``xs1``,
+    ...). ``NaN`` values (a data which has not yet delivered or an input in
+    its minimum period) take no part in the calculations and deliver ``NaN``
+
+    The datas need not share a calendar. In ``runonce`` mode the inputs are
+    aligned to the timeline of the 1st data: each member contributes the
+    last value it had delivered at the time of each bar
+
+    Subclasses implement ``xscalc(m)`` which receives a 2-D numpy array with
+    one row per bar and one column per member of the universe and returns
+    an array of the same shape
+    '''
+    frompackages = (
+        ('numpy', ('arange', 'asarray', 'empty', 'errstate', 'floor',
+                   'maximum', 'minimum', 'nan', 'put_along_axis',
+                   'searchsorted', 'sqrt', 'take_along_axis', 'where')),
+    )
+
+    _mindatas = 0  # the universe is collected by the metaclass
+    _xsbase = None  # class defining the calculation
+    _xsdatas = 0  # members of the universe
+
+    plotinfo = dict(plotlinelabels=True)
+
+    def __init__(self):
+        super(CrossSection, self).__init__()
+        self._xsdts = [_dtline(data) for data in self.datas]
+
+    def xscalc(self, m):
+        raise NotImplementedError
+
+    def _xscalc(self, m):
+        with errstate(divide='ignore', invalid='ignore'):
+            return self.xscalc(m)
+
+    def next(self):
+        m = asarray([[data.lines[0][0] for data in self.datas]])
+        for line, val in zip(self.lines, self._xscalc(m)[0].tolist()):
+            line[0] = val
+
+    def once(self, start, end):
+        out = self._xscalc(self._xsmatrix(start, end)).T.copy()
+        for line, vals in zip(self.lines, out):
+            line.array[start:end] = array.array(str('d'), vals.tobytes())
+
+    def _xsmatrix(self, start, end):
+        # The values of the universe for the bars of the clock in start:end
+        # Positions in the buffers are made absolute with the offset of what
+        # may have been already discarded from them
+        lo = self.lines[0].lenoffset
+        m = empty((end - start, len(self.datas)))
+
+        cdt = self._xsdts[0]
+        if cdt is not None:
+            coff = lo - cdt.lenoffset
+            ctimes = asarray(cdt.array[start + coff:end + coff])
+
+        for i, (data, dt) in enumerate(zip(self.datas, self._xsdts)):
+            line = data.lines[0]
+            off = lo - line.lenoffset
+            if cdt is None or dt is None or dt is cdt:  # same timeline
+                m[:, i] = asarray(line.array[start + off:end + off])
+                continue
+
+            vals = asarray(line.array)
+            doff = line.lenoffset - dt.lenoffset
+            if doff < 0:  # the values of unknown time are not usable
+                vals, doff = vals[-doff:], 0
+
+            times = asarray(dt.array[doff:doff + len(vals)])
+            vals = vals[:len(times)]
+            if not len(vals):
+                m[:, i] = nan
+                continue
+
+            # the last value which was delivered at the time of each bar
+            pos = searchsorted(times, ctimes, side='right') - 1
+            m[:, i] = where(pos >= 0, vals[pos], nan)
+
+        return m
+
+    @staticmethod
+    def _xsranks(m):
+        # Average rank (1 based) of the values in each row: equal values get
+        # the mean of the ranks they span and nan values a nan
+        cols = m.shape[1]
+        order = m.argsort(axis=1, kind='mergesort')  # nan values go last
+        s = take_along_axis(m, order, axis=1)
+
+        idx = empty(m.shape)
+        idx[:] = arange(cols)
+
+        # flag the 1st and the last position of each group of equal values
+        first = empty(m.shape, dtype=bool)
+        first[:, 0] = True
+        first[:, 1:] = s[:, 1:] != s[:, :-1]
+        last = empty(m.shape, dtype=bool)
+        last[:, -1] = True
+        last[:, :-1] = first[:, 1:]
+
+        gfirst = maximum.accumulate(where(first, idx, 0.0), axis=1)
+        glast = where(last, idx, cols - 1.0)[:, ::-1]
+        glast = minimum.accumulate(glast, axis=1)[:, ::-1]
+
+        ranks = empty(m.shape)
+        put_along_axis(ranks, order, (gfirst + glast) / 2.0 + 1.0, axis=1)
+        ranks[m != m] = nan
+        return ranks
+
+    @staticmethod
+    def _xscount(m):
+        # number of non nan values in each row, as a column
+        return (m == m).sum(axis=1, keepdims=True)
+
+
+class CrossSectionRank(CrossSection):
+    '''
+    Ranks the members of the universe at each bar. The lowest value has rank
+    ``1``. Equal values share the average of the ranks they span
+
+    Formula:
+      - xs = rank(data) across the universe
+    '''
+    alias = ('XSRank',)
+
+    def xscalc(self, m):
+        return self._xsranks(m)
+
+
+class CrossSectionPercentile(CrossSection):
+    '''
+    Percentile rank of the members of the universe at each bar, i.e.: the
+    rank divided by the number of members with a value, in the range
+    ``(0, 1]``
+
+    Formula:
+      - xs = rank(data) / count(data) across the universe
+    '''
+    alias = ('XSPercentile',)
+
+    def xscalc(self, m):
+        return self._xsranks(m) / self._xscount(m)
+
+
+class CrossSectionQuantile(CrossSection):
+    '''
+    Splits the members of the universe at each bar in ``buckets`` groups of
+    (as far as possible) equal size by rank and delivers the group (``1``
+    for the lowest values to ``buckets``). The default are deciles
+
+    Formula:
+      - xs = floor((rank(data) - 1) * buckets / count(data)) + 1
+    '''
+    alias = ('XSQuantile', 'XSDecile',)
+    params = (('buckets', 10),)
+
+    def _plotlabel(self):
+        return [self.p.buckets]
+
+    def xscalc(self, m):
+        ranks = self._xsranks(m) - 1.0
+        return floor(ranks * self.p.buckets / self._xscount(m)) + 1.0
+
+
+class CrossSectionZScore(CrossSection):
+    '''
+    Number of standard deviations of each member of the universe from the
+    mean of the universe at each bar. The standard deviation is that of the
+    population (as in ``StandardDeviation``)
+
+    Formula:
+      - mean = sum(data) / count(data) across the universe
+      - stddev = sqrt(sum((data - mean) ^ 2) / count(data))
+      - xs = (data - mean) / stddev
+    '''
+    alias = ('XSZScore',)
+
+    def xscalc(self, m):
+        valid = m == m
+        count = self._xscount(m)
+        mean = where(valid, m, 0.0).sum(axis=1, keepdims=True) / count
+        dev = where(valid, m - mean, 0.0)
+        stddev = sqrt((dev * dev).sum(axis=1, keepdims=True) / count)
+        return (m - mean) / stddev
@@ -57,7 +57,8 @@ class HurstExponent(PeriodN):
 
     '''
     frompackages = (
-        ('numpy', ('asarray', 'log10', 'polyfit', 'sqrt', 'std', 'subtract')),
+        ('numpy', ('asarray', 'cumsum', 'dot', 'log10', 'mean', 'sqrt',
+                   'std', 'subtract', 'zeros')),
     )
 
     alias = ('Hurst',)
@@ -82,6 +83,11 @@ class HurstExponent(PeriodN):
         self.lags = asarray(range(lag_start, lag_end))
         self.log10lags = log10(self.lags)
 
+        # The slope of the linear fit of y on log10lags is a weighted sum of
+        # the y values. The weights can be calculated once
+        xdev = self.log10lags - mean(self.log10lags)
+        self.fitweights = xdev / dot(xdev, xdev)
+
     def next(self):
         # Fetch the data
         ts = asarray(self.data.get(size=self.p.period))
@@ -89,8 +95,35 @@ class HurstExponent(PeriodN):
         # Calculate the array of the variances of the lagged differences
         tau = [sqrt(std(subtract(ts[lag:], ts[:-lag]))) for lag in self.lags]
 
-        # Use a linear fit to estimate the Hurst Exponent
-        poly = polyfit(self.log10lags, log10(tau), 1)
+        # Use a linear fit to estimate the Hurst Exponent (its slope)
+        self.lines.hurst[0] = dot(self.fitweights, log10(tau)) * 2.0
+
+    def once(self, start, end):
+        period = self.p.period
+        ts = asarray(self.data.array[start - period + 1:end])
+
+        # For each lag the sum of the lagged differences and of its squares
+        # over each window are taken from cumulative sums, which delivers
+        # the std of the differences for all windows in one go
+        hurst = zeros(end - start)
+        for lag, weight in zip(self.lags, self.fitweights):
+            diffs = subtract(ts[lag:], ts[:-lag])
+            diffs -= mean(diffs)  # centered to minimize rounding errors
+
+            n = period - lag  # number of lagged differences in a window
+            csum = zeros(len(diffs) + 1)
+            cumsum(diffs, out=csum[1:])
+            csum2 = zeros(len(diffs) + 1)
+            cumsum(diffs * diffs, out=csum2[1:])
+
+            wmean = (csum[n:] - csum[:-n]) / n
+            wvar = (csum2[n:] - csum2[:-n]) / n - wmean * wmean
+            wvar[wvar < 0.0] = 0.0  # rounding may deliver tiny negatives
+
+            hurst += weight * log10(sqrt(sqrt(wvar)))
+
+        hurst *= 2.0
 
-        # Return the Hurst exponent from the polyfit output
-        self.lines.hurst[0] = poly[0] * 2.0
+        dst = self.lines.hurst.array
+        for i, h in enumerate(hurst.tolist(), start=start):
+            dst[i] = h
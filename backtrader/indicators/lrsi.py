@@ -84,6 +84,46 @@ class LaguerreRSI(PeriodN):
         den = cu + cd
         self.lines.lrsi[0] = 1.0 if not den else cu / den
 
+    def once(self, start, end):
+        # Same calculation as next keeping the intermediate values in locals
+        darray = self.data.array
+        larray = self.lines.lrsi.array
+        g = self.p.gamma
+        l0, l1, l2, l3 = self.l0, self.l1, self.l2, self.l3
+
+        for i in range(start, end):
+            l0_1 = l0  # cache previous intermediate values
+            l1_1 = l1
+            l2_1 = l2
+
+            l0 = (1.0 - g) * darray[i] + g * l0_1
+            l1 = -g * l0 + l0_1 + g * l1_1
+            l2 = -g * l1 + l1_1 + g * l2_1
+            l3 = -g * l2 + l2_1 + g * l3
+
+            cu = 0.0
+            cd = 0.0
+            if l0 >= l1:
+                cu = l0 - l1
+            else:
+                cd = l1 - l0
+
+            if l1 >= l2:
+                cu += l1 - l2
+            else:
+                cd += l2 - l1
+
+            if l2 >= l3:
+                cu += l2 - l3
+            else:
+                cd += l3 - l2
+
+            den = cu + cd
+            larray[i] = 1.0 if not den else cu / den
+
+        # keep them for a later call (once over windows of data)
+        self.l0, self.l1, self.l2, self.l3 = l0, l1, l2, l3
+
 
 class LaguerreFilter(PeriodN):
     '''
@@ -111,3 +151,24 @@ class LaguerreFilter(PeriodN):
         self.l2 = l2 = -g * l1 + l1_1 + g * l2_1
         self.l3 = l3 = -g * l2 + l2_1 + g * self.l3
         self.lines.lfilter[0] = (l0 + (2 * l1) + (2 * l2) + l3) / 6
+
+    def once(self, start, end):
+        # Same calculation as next keeping the intermediate values in locals
+        darray = self.data.array
+        larray = self.lines.lfilter.array
+        g = self.p.gamma
+        l0, l1, l2, l3 = self.l0, self.l1, self.l2, self.l3
+
+        for i in range(start, end):
+            l0_1 = l0  # cache previous intermediate values
+            l1_1 = l1
+            l2_1 = l2
+
+            l0 = (1.0 - g) * darray[i] + g * l0_1
+            l1 = -g * l0 + l0_1 + g * l1_1
+            l2 = -g * l1 + l1_1 + g * l2_1
+            l3 = -g * l2 + l2_1 + g * l3
+            larray[i] = (l0 + (2 * l1) + (2 * l2) + l3) / 6
+
+        # keep them for a later call (once over windows of data)
+        self.l0, self.l1, self.l2, self.l3 = l0, l1, l2, l3
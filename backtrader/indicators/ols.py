@@ -21,7 +21,11 @@
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
+import array
+import math
+
 import backtrader as bt
+from ..linebuffer import _getnumpy
 from . import PeriodN
 
 
@@ -31,48 +35,151 @@ __all__ = ['OLS_Slope_InterceptN', 'OLS_TransformationN', 'OLS_BetaN',
 
 class OLS_Slope_InterceptN(PeriodN):
     '''
-    Calculates a linear regression using ``statsmodel.OLS`` (Ordinary least
-    squares) of data1 on data0
-
-    Uses ``pandas`` and ``statsmodels``
-
-    Use ``prepend_constant`` to influence the paramter ``prepend`` of
-    sm.add_constant
+    Calculates a linear regression (Ordinary least squares) of data0 on data1
+    over the last ``period`` values
+
+    In ``next`` the means of x and y and the sums of the products of their
+    deviations from the means are kept up to date with the values entering
+    and leaving the window (Welford-style), which makes each calculation O(1)
+    and avoids the loss of precision of raw sums of squares with high prices.
+    They are calculated again from the window every ``RESEED`` bars to stop
+    the rounding errors from adding up.
+    ``once`` calculates all windows in vectorized form with ``numpy`` (if
+    available, else the values are calculated as in ``next``). No external
+    packages are needed
+
+    The parameter ``prepend_constant`` (which influenced the position of the
+    constant with ``statsmodels``) is kept for backwards compatibility and
+    has no effect
     '''
     _mindatas = 2  # ensure at least 2 data feeds are passed
 
-    packages = (
-        ('pandas', 'pd'),
-        ('statsmodels.api', 'sm'),
-    )
     lines = ('slope', 'intercept',)
     params = (
         ('period', 10),
         ('prepend_constant', True),
     )
 
-    def next(self):
-        p0 = pd.Series(self.data0.get(size=self.p.period))
-        p1 = pd.Series(self.data1.get(size=self.p.period))
-        p1 = sm.add_constant(p1, prepend=prepend_constant)
-        slope, intercept = sm.OLS(p0, p1).fit().params
+    ONCEBLOCK = 4096  # windows calculated at once in vectorized form
+    RESEED = 1024  # bars between calculations of the statistics from scratch
+
+    def qbuffer(self, savemem=0):
+        super(OLS_Slope_InterceptN, self).qbuffer(savemem=savemem)
+        # next needs the value which is leaving the window
+        for data in self.datas:
+            data.minbuffer(self._minperiod + 1)
+
+    @staticmethod
+    def _fit(mx, my, cxx, cxy):
+        if not cxx:  # constant x: no regression is possible
+            return float('NaN'), float('NaN')
+
+        slope = cxy / cxx
+        return slope, my - slope * mx
+
+    def _seed(self, xs, ys):
+        # means and sums of the products of the deviations (2 passes)
+        period = self.p.period
+        mx, my = math.fsum(xs) / period, math.fsum(ys) / period
+        cxx = math.fsum((x - mx) * (x - mx) for x in xs)
+        cxy = math.fsum((x - mx) * (y - my) for x, y in zip(xs, ys))
+        return [mx, my, cxx, cxy]
+
+    def _update(self, stats, x, y, x0, y0):
+        # x, y enter and x0, y0 leave the window
+        period = self.p.period
+        mx, my, cxx, cxy = stats
+        mx1 = mx + (x - x0) / period
+        my1 = my + (y - y0) / period
+        stats[0], stats[1] = mx1, my1
+        stats[2] = cxx + (x - mx) * (x - mx1) - (x0 - mx) * (x0 - mx1)
+        stats[3] = cxy + (x - mx) * (y - my1) - (x0 - mx) * (y0 - my1)
+
+    def nextstart(self):
+        # Seed the statistics with the entire window
+        xs = self.data1.get(size=self.p.period)
+        ys = self.data0.get(size=self.p.period)
+        self._stats = stats = self._seed(xs, ys)
+        self._reseed = self.RESEED
+        self.lines.slope[0], self.lines.intercept[0] = self._fit(*stats)
 
-        self.lines.slope[0] = slope
-        self.lines.intercept[0] = intercept
+    def next(self):
+        self._reseed -= 1
+        if not self._reseed:
+            return self.nextstart()
+
+        x0, y0 = self.data1[-self.p.period], self.data0[-self.p.period]
+        stats = self._stats
+        self._update(stats, self.data1[0], self.data0[0], x0, y0)
+        self.lines.slope[0], self.lines.intercept[0] = self._fit(*stats)
+
+    def once(self, start, end):
+        np = _getnumpy()
+        if not np:
+            return self._onceloop(start, end)
+
+        period = self.p.period
+        xs = np.frombuffer(self.data1.array, dtype=np.float64)
+        ys = np.frombuffer(self.data0.array, dtype=np.float64)
+        slope = self.lines.slope.array
+        intercept = self.lines.intercept.array
+        window = np.lib.stride_tricks.sliding_window_view
+
+        for bstart in range(start, end, self.ONCEBLOCK):
+            bend = min(bstart + self.ONCEBLOCK, end)
+            # the windows ending at bstart ... bend - 1 (one per row)
+            wx = window(xs[bstart - period + 1:bend], period)
+            wy = window(ys[bstart - period + 1:bend], period)
+            mx, my = wx.mean(axis=1), wy.mean(axis=1)
+            dx = wx - mx[:, None]
+            cxx = np.einsum('ij,ij->i', dx, dx)
+            cxy = np.einsum('ij,ij->i', dx, wy - my[:, None])
+
+            with np.errstate(divide='ignore', invalid='ignore'):
+                bslope = np.where(cxx != 0.0, cxy / cxx, np.nan)
+
+            bintercept = my - bslope * mx
+            slope[bstart:bend] = array.array(str('d'), bslope.tobytes())
+            intercept[bstart:bend] = array.array(str('d'),
+                                                 bintercept.tobytes())
+            del wx, wy
+
+        del xs, ys  # release the buffers, which could have to grow
+
+    def _onceloop(self, start, end):
+        xarray = self.data1.array
+        yarray = self.data0.array
+        slope = self.lines.slope.array
+        intercept = self.lines.intercept.array
+        period = self.p.period
+
+        # Seed the statistics with the window ending at start
+        w0, w1 = start - period + 1, start + 1
+        stats = self._seed(xarray[w0:w1], yarray[w0:w1])
+        slope[start], intercept[start] = self._fit(*stats)
+
+        for i in range(start + 1, end):
+            if not (i - start) % self.RESEED:
+                w0, w1 = i - period + 1, i + 1
+                stats = self._seed(xarray[w0:w1], yarray[w0:w1])
+            else:
+                self._update(stats, xarray[i], yarray[i],
+                             xarray[i - period], yarray[i - period])
+
+            slope[i], intercept[i] = self._fit(*stats)
 
 
 class OLS_TransformationN(PeriodN):
     '''
-    Calculates the ``zscore`` for data0 and data1. Although it doesn't directly
-    uses any external package it relies on ``OLS_SlopeInterceptN`` which uses
-    ``pandas`` and ``statsmodels``
+    Calculates the ``zscore`` for data0 and data1. It relies on
+    ``OLS_SlopeInterceptN`` to calculate the spread
     '''
     _mindatas = 2  # ensure at least 2 data feeds are passed
     lines = ('spread', 'spread_mean', 'spread_std', 'zscore',)
     params = (('period', 10),)
 
     def __init__(self):
-        slint = OLS_Slope_InterceptN(*self.datas)
+        slint = OLS_Slope_InterceptN(*self.datas, period=self.p.period)
 
         spread = self.data0 - (slint.slope * self.data1 + slint.intercept)
         self.l.spread = spread
@@ -84,23 +191,17 @@ class OLS_TransformationN(PeriodN):
 
 class OLS_BetaN(PeriodN):
     '''
-    Calculates a regression of data1 on data0 using ``pandas.ols``
-
-    Uses ``pandas``
+    Calculates the beta of a regression of data0 on data1 (the slope
+    calculated by ``OLS_Slope_InterceptN``)
     '''
     _mindatas = 2  # ensure at least 2 data feeds are passed
 
-    packages = (
-        ('pandas', 'pd'),
-    )
-
     lines = ('beta',)
     params = (('period', 10),)
 
-    def next(self):
-        y, x = (pd.Series(d.get(size=self.p.period)) for d in self.datas)
-        r_beta = pd.ols(y=y, x=x, window_type='full_sample')
-        self.lines.beta[0] = r_beta.beta['x']
+    def __init__(self):
+        slint = OLS_Slope_InterceptN(*self.datas, period=self.p.period)
+        self.lines.beta = slint.slope
 
 
 class CointN(PeriodN):
@@ -108,13 +209,13 @@ class CointN(PeriodN):
     Calculates the score (coint_t) and pvalue for a given ``period`` for the
     data feeds
 
-    Uses ``pandas`` and ``statsmodels`` (for ``coint``)
+    Uses ``statsmodels`` (for ``coint``), which is handed the buffers of the
+    data feeds directly in ``next`` and ``once``. The test is still run once
+    for the window of each bar in both modes: ``coint`` cannot calculate
+    several windows at once
     '''
     _mindatas = 2  # ensure at least 2 data feeds are passed
 
-    packages = (
-        ('pandas', 'pd'),  # import pandas as pd
-    )
     frompackages = (
         ('statsmodels.tsa.stattools', 'coint'),  # from st... import coint
     )
@@ -125,8 +226,29 @@ class CointN(PeriodN):
         ('regression', 'c'),  # see statsmodel.tsa.statttools
     )
 
+    def __init__(self):
+        # the argument was renamed to trend in newer versions of statsmodels
+        code = coint.__code__
+        argnames = code.co_varnames[:code.co_argcount]
+        argname = 'trend' if 'trend' in argnames else 'regression'
+        self._cointkwargs = {argname: self.p.regression}
+
+        super(CointN, self).__init__()
+
     def next(self):
-        x, y = (pd.Series(d.get(size=self.p.period)) for d in self.datas)
-        score, pvalue, _ = coint(x, y, regression=self.p.regression)
+        x, y = (d.get(size=self.p.period) for d in self.datas)
+        score, pvalue, _ = coint(x, y, **self._cointkwargs)
         self.lines.score[0] = score
         self.lines.pvalue[0] = pvalue
+
+    def once(self, start, end):
+        xarray, yarray = (d.array for d in self.datas)
+        score = self.lines.score.array
+        pvalue = self.lines.pvalue.array
+        period = self.p.period
+        kwargs = self._cointkwargs
+
+        for i in range(start, end):
+            w0, w1 = i - period + 1, i + 1
+            score[i], pvalue[i], _ = coint(xarray[w0:w1], yarray[w0:w1],
+                                           **kwargs)
@@ -170,3 +170,76 @@ class ParabolicSAR(PeriodN):
         newstatus.sar = sar
         newstatus.ep = ep
         newstatus.af = af
+
+    def preonce(self, start, end):
+        self.once(start, end)  # the status is already calculated in prenext
+
+        psar = self.lines.psar.array
+        for i in range(start, end):
+            psar[i] = float('NaN')  # no return yet still prenext
+
+    def once(self, start, end):
+        # Same calculation as prenext/nextstart/next in a single loop keeping
+        # the status (of the previous bar) in local variables
+        harray = self.data.high.array
+        larray = self.data.low.array
+        carray = self.data.close.array
+        psar = self.lines.psar.array
+        afstep, afmax = self.p.af, self.p.afmax
+
+        # logical index of the bars if the buffers have been shrunk
+        offset = self.lines.psar.lenoffset
+
+        tr, sar, ep, af = getattr(self, '_oncestatus', (None,) * 4)
+        for i in range(start, end):
+            if i + offset < 1:
+                continue  # not enough data to do anything
+
+            hi = harray[i]
+            lo = larray[i]
+
+            if i + offset == 1:  # kickstart calculation as in nextstart
+                sar = (hi + lo) / 2.0
+                af = afstep
+                if carray[i] >= carray[i - 1]:  # uptrend
+                    tr = not True  # uptrend when reversed
+                    ep = larray[i - 1]  # ep from prev trend
+                else:
+                    tr = not False  # downtrend when reversed
+                    ep = harray[i - 1]  # ep from prev trend
+
+            # Check if the sar penetrated the price to switch the trend
+            if (tr and sar >= lo) or (not tr and sar <= hi):
+                tr = not tr  # reverse the trend
+                sar = ep  # new sar is prev SIP (Significant price)
+                ep = hi if tr else lo  # select new SIP / Extreme Price
+                af = afstep  # reset acceleration factor
+
+            # Update sar value for today
+            psar[i] = sar
+
+            # Update ep and af if needed
+            if tr:  # long trade
+                if hi > ep:
+                    ep = hi
+                    af = max(af + afstep, afmax)
+
+            else:  # downtrend
+                if lo < ep:
+                    ep = lo
+                    af = max(af + afstep, afmax)
+
+            sar = sar + af * (ep - sar)  # calculate the sar for tomorrow
+
+            # make sure sar doesn't go into hi/lows
+            if tr:  # long trade
+                lo1 = larray[i - 1]
+                if sar > lo or sar > lo1:
+                    sar = min(lo, lo1)  # sar not above last 2 lows -> lower
+            else:
+                hi1 = harray[i - 1]
+                if sar < hi or sar < hi1:
+                    sar = max(hi, hi1)  # sar not below last 2 highs -> highest
+
+        # keep the status for a later call (once over windows of data)
+        self._oncestatus = tr, sar, ep, af
@@ -0,0 +1,226 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016, 2017 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+from collections import OrderedDict
+import math
+import time
+
+
+__all__ = ['LatencyHistogram', 'LatencyTracer']
+
+
+# Clock for the timestamps of all stages. It has to be the same across
+# threads: stores stamp the arrival of messages in their own threads
+clock = getattr(time, 'perf_counter', time.time)
+
+
+class LatencyHistogram(object):
+    '''Histogram of latencies (in seconds) with buckets growing
+    geometrically, which keeps a constant size however many values are added
+
+    The percentiles are accurate to ``precision`` (relative) and are
+    reported as the upper limit of the bucket. Values below ``resolution``
+    share a single bucket. ``count``, ``max`` and the mean are exact
+    '''
+    resolution = 1e-6
+    precision = 0.01
+
+    def __init__(self):
+        self.buckets = dict()
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._logbase = math.log(1.0 + self.precision)
+
+    def add(self, value):
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+        if value <= self.resolution:
+            idx = 0
+        else:
+            idx = int(math.log(value / self.resolution) / self._logbase) + 1
+
+        self.buckets[idx] = self.buckets.get(idx, 0) + 1
+
+    def percentile(self, q):
+        '''Returns the value below which ``q`` (``0.0`` - ``1.0``) of the
+        values lie'''
+        if not self.count:
+            return float('NaN')
+
+        rank = max(1, int(math.ceil(q * self.count)))
+        seen = 0
+        for idx in sorted(self.buckets):
+            seen += self.buckets[idx]
+            if seen >= rank:
+                break
+
+        upper = self.resolution * (1.0 + self.precision) ** idx
+        return min(upper, self.max)
+
+    def mean(self):
+        return self.total / self.count if self.count else float('NaN')
+
+    def summary(self):
+        return OrderedDict([
+            ('count', self.count),
+            ('p50', self.percentile(0.50)),
+            ('p99', self.percentile(0.99)),
+            ('max', self.max if self.count else float('NaN')),
+            ('mean', self.mean()),
+        ])
+
+
+class LatencyTracer(object):
+    '''Timestamps the path of the bars of each data from the arrival of the
+    message in the store until the strategy sees the bar and aggregates the
+    time spent in each leg in a ``LatencyHistogram`` per data
+
+    The stages are:
+
+      - ``arrival``: the message is received by the store (the time it was
+        put in the queue of the data)
+      - ``load``: the data takes the message from the queue
+      - ``deliver``: ``load`` delivers the bar (after the filters)
+      - ``sync``: the bar has gone through the synchronization of the datas
+        in ``Cerebro`` (including the waits on ``qcheck``)
+      - ``next``: ``next`` of the strategies is about to be called
+
+    and the legs (named after the stage they end, except ``total``) are
+    ``load`` (time in the queue), ``deliver``, ``sync``, ``next`` and
+    ``total`` (``arrival`` to ``next``)
+
+    The ``arrival`` and ``load`` stages are only stamped by datas which take
+    messages from the queues of a store, and only for the ``load`` in which
+    the bar is delivered: a bar of a resampled data is traced from the
+    message which completed it. If the bar was delivered because time
+    went by (or from a stack) only the later legs are traced
+
+    Params:
+
+      - ``period``: if not ``None``, seconds between reports issued as store
+        notifications (``notify_store('LATENCY', report)``)
+
+      - ``sink``: if not ``None`` gets the legs of each traced bar. A
+        callable is called with ``(data, legs)`` (``legs`` being a dict) and
+        else a line is written to it (as to a file)
+    '''
+    STAGES = ('arrival', 'load', 'deliver', 'sync', 'next')
+    LEGS = (
+        ('load', 'arrival', 'load'),
+        ('deliver', 'load', 'deliver'),
+        ('sync', 'deliver', 'sync'),
+        ('next', 'sync', 'next'),
+        ('total', 'arrival', 'next'),
+    )
+
+    def __init__(self, period=None, sink=None):
+        self.period = period
+        self.sink = sink
+        self.hists = OrderedDict()  # key: data - value: dict of histograms
+        self._stamps = dict()  # key: data - value: dict stage -> time
+        self._lastreport = clock()
+
+    def adddata(self, data):
+        '''Prepares the histograms for ``data`` and makes it stamp itself'''
+        self.hists[data] = OrderedDict(
+            (leg, LatencyHistogram()) for leg, _, _ in self.LEGS)
+        self._stamps[data] = dict()
+        data._latency = self
+
+    def begin(self, data):
+        '''A new ``load`` starts. Previous stamps are not of the next bar'''
+        self._stamps[data] = dict()
+
+    def arrival(self, data, q=None):
+        '''``data`` has taken a message from queue ``q``, which tells when
+        the message was put in it (``lastts``) if it is a ``TickQueue``'''
+        stamps = self._stamps[data]
+        stamps['load'] = now = clock()
+        stamps['arrival'] = getattr(q, 'lastts', None) or now
+
+    def stamp(self, data, stage):
+        self._stamps[data][stage] = clock()
+
+    def sync(self, datas):
+        '''The bars of ``datas`` have passed the synchronization'''
+        now = clock()
+        for data in datas:
+            stamps = self._stamps.get(data)
+            if stamps is not None and 'deliver' in stamps:
+                stamps['sync'] = now
+
+    def dispatch(self):
+        '''The strategies are about to be called. Closes the traces of the
+        datas which have been synchronized'''
+        now = clock()
+        sink = self.sink
+        for data, stamps in self._stamps.items():
+            if 'sync' not in stamps:
+                continue
+
+            stamps['next'] = now
+            hists = self.hists[data]
+            legs = OrderedDict()
+            for leg, begin, end in self.LEGS:
+                if begin in stamps:
+                    legs[leg] = lapse = stamps[end] - stamps[begin]
+                    hists[leg].add(lapse)
+
+            self._stamps[data] = dict()
+
+            if sink is not None:
+                if callable(sink):
+                    sink(data, legs)
+                else:
+                    sink.write('%s %s\n' % (
+                        data._name,
+                        ' '.join('%s=%.1fus' % (leg, lapse * 1e6)
+                                 for leg, lapse in legs.items())))
+
+    def report(self):
+        '''Returns an ``OrderedDict`` with the name of the datas as keys and
+        as values an ``OrderedDict`` with the summary (``count``, ``p50``,
+        ``p99``, ``max``, ``mean``) of each leg'''
+        report = OrderedDict()
+        for i, (data, hists) in enumerate(self.hists.items()):
+            report[data._name or 'data%d' % i] = OrderedDict(
+                (leg, hist.summary()) for leg, hist in hists.items())
+
+        return report
+
+    def get_notifications(self):
+        '''Store interface for ``Cerebro``: the report is delivered every
+        ``period`` seconds'''
+        if self.period is None:
+            return []
+
+        now = clock()
+        if now - self._lastreport < self.period:
+            return []
+
+        self._lastreport = now
+        return [('LATENCY', (self.report(),), {})]
@@ -32,12 +32,12 @@ from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
 import array
-import collections
 import datetime
-from itertools import islice
+import itertools
 import math
+import operator
 
-from .utils.py3 import range, with_metaclass, string_types
+from .utils.py3 import integer_types, range, with_metaclass, string_types
 
 from .lineroot import LineRoot, LineSingle, LineMultiple
 from . import metabase
@@ -47,6 +47,40 @@ from .utils import num2date, time2num
 NAN = float('NaN')
 
 
+# numpy ufuncs delivering for floats exactly the same results as the python
+# operators (the comparisons deliver bools, stored as 1.0/0.0 as the python
+# ones) for the vectorized evaluation of fused operations
+_NPOPS = {
+    operator.__add__: ('add', False),
+    operator.__sub__: ('subtract', False),
+    operator.__mul__: ('multiply', False),
+    operator.__truediv__: ('true_divide', False),
+    operator.__lt__: ('less', True),
+    operator.__gt__: ('greater', True),
+    operator.__le__: ('less_equal', True),
+    operator.__ge__: ('greater_equal', True),
+    operator.__eq__: ('equal', True),
+    operator.__ne__: ('not_equal', True),
+    operator.__neg__: ('negative', False),
+    operator.__abs__: ('absolute', False),
+}
+
+_numpy = None  # None: not imported yet / False: not available
+
+
+def _getnumpy():
+    global _numpy
+    if _numpy is None:
+        try:
+            import numpy
+        except ImportError:
+            _numpy = False
+        else:
+            _numpy = numpy
+
+    return _numpy
+
+
 class LineBuffer(LineSingle):
     '''
     LineBuffer defines an interface to an "array.array" (or list) in which
@@ -71,6 +105,7 @@ class LineBuffer(LineSingle):
     '''
 
     UnBounded, QBuffer = (0, 1)
+    QSpare = 128  # minimum extra room in QBuffer mode before compacting
 
     def __init__(self):
         self.lines = [self]
@@ -79,42 +114,23 @@ class LineBuffer(LineSingle):
         self.reset()
         self._tz = None
 
+    # idx is a plain attribute (it is read for each and every [ago] access).
+    # The methods are kept for backwards compatibility
     def get_idx(self):
-        return self._idx
+        return self.idx
 
     def set_idx(self, idx, force=False):
-        # if QBuffer and the last position of the buffer was reached, keep
-        # it (unless force) as index 0. This allows resampling
-        #  - forward adds a position, but the 1st one is discarded, the 0 is
-        #  invariant
-        # force supports replaying, which needs the extra bar to float
-        # forward/backwards, because the last input is read, and after a
-        # "backwards" is used to update the previous data. Unless the position
-        # 0 was moved to the previous index, it would fail
-        if self.mode == self.QBuffer:
-            if force or self._idx < self.lenmark:
-                self._idx = idx
-        else:  # default: UnBounded
-            self._idx = idx
-
-    idx = property(get_idx, set_idx)
+        # force is kept for backwards compatibility. The QBuffer mode no longer
+        # pins the index at the end of a fixed size buffer: the buffer is
+        # compacted (see forward) and the index is always a physical position
+        self.idx = idx
 
     def reset(self):
         ''' Resets the internal buffer structure and the indices
         '''
-        if self.mode == self.QBuffer:
-            # add extrasize to ensure resample/replay work because they will
-            # use backwards to erase the last bar/tick before delivering a new
-            # bar The previous forward would have discarded the bar "period"
-            # times ago and it will not come back. Having + 1 in the size
-            # allows the forward without removing that bar
-            self.array = collections.deque(maxlen=self.maxlen + self.extrasize)
-            self.useislice = True
-        else:
-            self.array = array.array(str('d'))
-            self.useislice = False
-
+        self.array = array.array(str('d'))
         self.lencount = 0
+        self.lenoffset = 0
         self.idx = -1
         self.extension = 0
 
@@ -122,9 +138,21 @@ class LineBuffer(LineSingle):
         self.mode = self.QBuffer
         self.maxlen = self._minperiod
         self.extrasize = extrasize
-        self.lenmark = self.maxlen - (not self.extrasize)
+        self._qsizes()
         self.reset()
 
+    def _qsizes(self):
+        # The QBuffer keeps maxlen values and adds extrasize to ensure
+        # resample/replay work because they will use backwards to erase the
+        # last bar/tick before delivering a new bar.
+        #
+        # The buffer is a plain array which is allowed to grow up to qcapacity
+        # before the oldest values are discarded in a single operation. Access
+        # by index and slicing work exactly as in UnBounded mode and the cost
+        # of the compaction is spread over qcapacity - qsize forwards
+        self.qsize = self.maxlen + self.extrasize
+        self.qcapacity = self.qsize + max(self.qsize, self.QSpare)
+
     def getindicators(self):
         return []
 
@@ -143,7 +171,7 @@ class LineBuffer(LineSingle):
             return
 
         self.maxlen = size
-        self.lenmark = self.maxlen - (not self.extrasize)
+        self._qsizes()
         self.reset()
 
     def __len__(self):
@@ -156,8 +184,10 @@ class LineBuffer(LineSingle):
         allow for "lookahead" operations. The real amount of data that is
         held/can be held in the buffer
         is returned
+
+        Values discarded with ``shrink`` are still accounted for
         '''
-        return len(self.array) - self.extension
+        return len(self.array) - self.extension + self.lenoffset
 
     def __getitem__(self, ago):
         return self.array[self.idx + ago]
@@ -176,11 +206,6 @@ class LineBuffer(LineSingle):
         Returns:
             A slice of the underlying buffer
         '''
-        if self.useislice:
-            start = self.idx + ago - size + 1
-            end = self.idx + ago + 1
-            return list(islice(self.array, start, end))
-
         return self.array[self.idx + ago - size + 1:self.idx + ago + 1]
 
     def getzeroval(self, idx=0):
@@ -206,9 +231,6 @@ class LineBuffer(LineSingle):
         Returns:
             A slice of the underlying buffer
         '''
-        if self.useislice:
-            return list(islice(self.array, idx, idx + size))
-
         return self.array[idx:idx + size]
 
     def __setitem__(self, ago, value):
@@ -242,7 +264,34 @@ class LineBuffer(LineSingle):
         out with buflen
         '''
         self.idx = -1
-        self.lencount = 0
+        self.lencount = self.lenoffset
+
+    def seek(self, idx):
+        ''' Places the logical index at position ``idx`` of the underlying
+        buffer, as if home and an advance of ``idx + 1`` had been executed
+
+        Keyword Args:
+            idx (int): position in the underlying buffer
+        '''
+        self.idx = idx
+        self.lencount = self.lenoffset + idx + 1
+
+    def shrink(self, size):
+        ''' Discards the oldest ``size`` values of the underlying buffer
+
+        The logical length is kept (and so is the value pointed to by the
+        logical index). This allows running in "once" mode over consecutive
+        windows of data keeping memory bounded
+
+        Keyword Args:
+            size (int): How many positions to remove from the buffer start
+        '''
+        if size <= 0:
+            return
+
+        del self.array[0:size]
+        self.lenoffset += size
+        self.idx -= size
 
     def forward(self, value=NAN, size=1):
         ''' Moves the logical index foward and enlarges the buffer as much as needed
@@ -254,8 +303,13 @@ class LineBuffer(LineSingle):
         self.idx += size
         self.lencount += size
 
-        for i in range(size):
+        if size == 1:
             self.array.append(value)
+        else:  # in a single go
+            self.array.extend(itertools.repeat(value, size))
+
+        if self.mode == self.QBuffer and len(self.array) > self.qcapacity:
+            self.shrink(len(self.array) - self.qsize - self.extension)
 
     def backwards(self, size=1, force=False):
         ''' Moves the logical index backwards and reduces the buffer as much as needed
@@ -264,8 +318,7 @@ class LineBuffer(LineSingle):
             size (int): How many extra positions to rewind and reduce the
             buffer
         '''
-        # Go directly to property setter to support force
-        self.set_idx(self._idx - size, force=force)
+        self.idx -= size
         self.lencount -= size
         for i in range(size):
             self.array.pop()
@@ -326,9 +379,6 @@ class LineBuffer(LineSingle):
         return self.getzero(idx, size or len(self))
 
     def plotrange(self, start, end):
-        if self.useislice:
-            return list(islice(self.array, start, end))
-
         return self.array[start:end]
 
     def oncebinding(self):
@@ -336,7 +386,7 @@ class LineBuffer(LineSingle):
         Executes the bindings when running in "once" mode
         '''
         larray = self.array
-        blen = self.buflen()
+        blen = len(larray) - self.extension
         for binding in self.bindings:
             binding.array[0:blen] = larray[0:blen]
 
@@ -592,6 +642,9 @@ class LineActions(with_metaclass(MetaLineActions, LineBuffer)):
 
     _ltype = LineBuffer.IndType
 
+    _fusable = False  # can be calculated inline by another operation
+    _fusing = 0  # number of open FuseOps blocks
+
     def getindicators(self):
         return []
 
@@ -633,6 +686,156 @@ class LineActions(with_metaclass(MetaLineActions, LineBuffer)):
 
         self.oncebinding()
 
+    def _oncechunk(self):
+        # calculate the values added to the clock since the last window
+        start = len(self.array)
+        self.forward(size=len(self._clock.array) - start)
+        self.seek(start - 1)
+
+        self._oncewindow(start, len(self.array), self.lenoffset)
+
+        self.oncebinding()
+
+    def _fuseargs(self):
+        '''
+        Returns the operands of ``self.operation`` (lines or values) for
+        fusable operations
+        '''
+        raise NotImplementedError
+
+    def _fuse(self, fused):
+        '''
+        The operations with an ``id`` in ``fused`` (the operands of this one
+        or of other operations in ``fused``) will no longer be calculated on
+        their own. This operation calculates them inline and only the final
+        values are stored
+        '''
+        self._fused = fused
+
+        clock = self._clock
+        while id(clock) in fused:
+            clock = clock._clock
+        self._clock = clock
+
+        self._datas = datas = []
+        args = list(self._fuseargs())
+        while args:
+            arg = args.pop()
+            if id(arg) in fused:
+                args.extend(arg._fuseargs())
+            elif isinstance(arg, LineRoot):
+                datas.append(arg)
+
+        self._fnext = self._fusefunc(fused, lambda line: line.__getitem__)
+        self.next = self._fusednext
+        self.once = self._fusedonce
+
+    def _fusefunc(self, fused, getter):
+        '''
+        Returns a function calculating the value of the operation for the
+        argument passed to the function returned by ``getter`` for the lines
+        '''
+        funcs = []
+        for arg in self._fuseargs():
+            if id(arg) in fused:
+                funcs.append(arg._fusefunc(fused, getter))
+            elif isinstance(arg, LineBuffer):
+                funcs.append(getter(arg))
+            else:
+                funcs.append(arg)
+
+        op = self.operation
+        if len(funcs) == 1:
+            fa, = funcs
+            return lambda x: op(fa(x))
+
+        fa, fb = funcs
+        if not callable(fa):
+            return lambda x: op(fa, fb(x))
+        elif not callable(fb):
+            return lambda x: op(fa(x), fb)
+
+        return lambda x: op(fa(x), fb(x))
+
+    def _fusevec(self, fused, np):
+        '''
+        Returns a function calculating with numpy the values of the operation
+        between start and end or ``None`` if not possible
+        '''
+        try:
+            name, tofloat = _NPOPS[self.operation]
+        except KeyError:
+            return None
+
+        ufunc = getattr(np, name)
+        frombuffer = np.frombuffer
+
+        funcs = []
+        for arg in self._fuseargs():
+            if id(arg) in fused:
+                func = arg._fusevec(fused, np)
+                if func is None:
+                    return None
+            elif isinstance(arg, LineBuffer):
+                def func(start, end, line=arg):
+                    return frombuffer(line.array)[start:end]
+            elif isinstance(arg, (float,) + integer_types) and \
+                    abs(arg) < 2 ** 53:  # exact conversion to float
+                func = float(arg)
+            else:
+                return None
+
+            funcs.append(func)
+
+        if len(funcs) == 1:
+            fa, = funcs
+
+            def vec(start, end):
+                return ufunc(fa(start, end))
+
+        else:
+            fa, fb = funcs
+            if not callable(fa):
+                def vec(start, end):
+                    return ufunc(fa, fb(start, end))
+            elif not callable(fb):
+                def vec(start, end):
+                    return ufunc(fa(start, end), fb)
+            else:
+                def vec(start, end):
+                    return ufunc(fa(start, end), fb(start, end))
+
+        if not tofloat:
+            return vec
+
+        return lambda start, end: vec(start, end).astype(np.float64)
+
+    def _fusednext(self):
+        self[0] = self._fnext(0)
+
+    def _fusedonce(self, start, end):
+        np = _getnumpy()
+        fvec = np and self._fusevec(self._fused, np)
+        if fvec:
+            try:
+                # Anything which is not silent in python (ZeroDivisionError,
+                # OverflowError, complex results) or which may be different
+                # is left to the python operators below
+                with np.errstate(all='raise'):
+                    vals = fvec(start, end)
+            except FloatingPointError:
+                pass
+            else:
+                dst = np.frombuffer(self.array)
+                dst[start:end] = vals
+                del dst  # release the buffer of the array, which must grow
+                return
+
+        func = self._fusefunc(self._fused, lambda line: line.array.__getitem__)
+        dst = self.array
+        for i in range(start, end):
+            dst[i] = func(i)
+
 
 def LineDelay(a, ago=0, **kwargs):
     if ago <= 0:
@@ -736,6 +939,7 @@ class LinesOperation(LineActions):
         self.bline = isinstance(b, LineBuffer)
         self.btime = isinstance(b, datetime.time)
         self.bfloat = not self.bline and not self.btime
+        self._fusable = LineActions._fusing > 0 and not self.btime
 
         if r:
             self.a, self.b = b, a
@@ -803,6 +1007,9 @@ class LinesOperation(LineActions):
         for i in range(start, end):
             dst[i] = op(srca, srcb[i])
 
+    def _fuseargs(self):
+        return self.a, self.b
+
 
 class LineOwnOperation(LineActions):
     '''
@@ -811,9 +1018,12 @@ class LineOwnOperation(LineActions):
     It will "next"/traverse the array applying the operation and storing
     the result in self
     '''
+
     def __init__(self, a, operation):
         super(LineOwnOperation, self).__init__()
 
+        self._fusable = LineActions._fusing > 0
+
         self.operation = operation
         self.a = a
 
@@ -828,3 +1038,29 @@ class LineOwnOperation(LineActions):
 
         for i in range(start, end):
             dst[i] = op(srca[i])
+
+    def _fuseargs(self):
+        return self.a,
+
+
+class FuseOps(object):
+    '''
+    Context manager to let the operations on lines created inside the block be
+    calculated inline by other operations when ``fuseops`` is active in
+    cerebro. Example::
+
+      with bt.FuseOps():
+          self.signal = (self.data.close - self.sma) / self.atr * 2
+
+    Only intermediate operations held by nothing but other operations or the
+    attributes of the strategy and of the indicators (and the lists, tuples,
+    dicts and sets in them) may be created in the block. An operation kept
+    somewhere else (a ``deque``, a helper object, a closure ...) has no
+    values of its own once calculated inline
+    '''
+    def __enter__(self):
+        LineActions._fusing += 1
+        return self
+
+    def __exit__(self, *args):
+        LineActions._fusing -= 1
@@ -67,6 +67,10 @@ class MetaLineIterator(LineSeries.__class__):
 
         newargs = args[lastarg:]
 
+        # Arguments which are not params cannot be told apart structurally
+        if newargs or kwargs:
+            _obj._dedup = False
+
         # If no datas have been passed to an indicator ... use the
         # main datas of the owner, easing up adding "self.data" ...
         if not _obj.datas and isinstance(_obj, (IndicatorBase, ObserverBase)):
@@ -77,20 +81,16 @@ class MetaLineIterator(LineSeries.__class__):
         if _obj.datas:
             _obj.data = data = _obj.datas[0]
 
-            for l, line in enumerate(data.lines):
-                linealias = data._getlinealias(l)
-                if linealias:
-                    setattr(_obj, 'data_%s' % linealias, line)
-                setattr(_obj, 'data_%d' % l, line)
+            lines = data.lines
+            for lineattr, l in lines._getlineattrs('data_'):
+                setattr(_obj, lineattr, lines[l])
 
             for d, data in enumerate(_obj.datas):
                 setattr(_obj, 'data%d' % d, data)
 
-                for l, line in enumerate(data.lines):
-                    linealias = data._getlinealias(l)
-                    if linealias:
-                        setattr(_obj, 'data%d_%s' % (d, linealias), line)
-                    setattr(_obj, 'data%d_%d' % (d, l), line)
+                lines = data.lines
+                for lineattr, l in lines._getlineattrs('data%d_' % d):
+                    setattr(_obj, lineattr, lines[l])
 
         # Parameter values have now been set before __init__
         _obj.dnames = DotDict([(d._name, d)
@@ -143,6 +143,10 @@ class MetaLineIterator(LineSeries.__class__):
 class LineIterator(with_metaclass(MetaLineIterator, LineSeries)):
     _nextforce = False  # force cerebro to run in next mode (runonce=False)
 
+    _dedup = True  # may share the lines of a structurally equal indicator
+    _dedupof = None  # indicator whose lines are shared
+    _dedups = 0  # number of indicators sharing the lines of this one
+
     _mindatas = 1
     _ltype = LineSeries.IndType
 
@@ -204,6 +208,9 @@ class LineIterator(with_metaclass(MetaLineIterator, LineSeries)):
         # store in right queue
         self._lineiterators[indicator._ltype].append(indicator)
 
+        if isinstance(indicator, IndicatorBase) and indicator._dedup:
+            self._dedupindicator(indicator)
+
         # use getattr because line buffers don't have this attribute
         if getattr(indicator, '_nextforce', False):
             # the indicator needs runonce=False
@@ -215,6 +222,140 @@ class LineIterator(with_metaclass(MetaLineIterator, LineSeries)):
 
                 o = o._owner  # move up the hierarchy
 
+    def _dedupindicator(self, indicator):
+        '''
+        Looks for an indicator with the same class, params and input lines
+        in the tree of the strategy. If found, ``indicator`` uses its lines
+        and is no longer calculated
+        '''
+        # Only the indicators directly below a strategy take part. Observers
+        # (and anything below them) are calculated after the strategy
+        o = self
+        while o is not None and o._ltype == LineIterator.IndType:
+            o = o._owner
+
+        registry = getattr(o, '_dedupreg', None)
+        if registry is None:
+            return  # not activated or not under a strategy
+
+        try:
+            key = indicator._getdedupkey()
+            canonical = registry.get(key)
+        except TypeError:  # something not hashable
+            return
+
+        if canonical is None:
+            registry[key] = indicator
+            indicator._dedupk = key
+            return
+
+        if canonical._minperiod != indicator._minperiod:
+            return  # something was changed after creation. Don't touch it
+
+        # The key only has the 1st line of each data: data and data.close are
+        # the same input if one of them has a single line (an indicator
+        # created with it can only use that line). Else all must match
+        for data, cdata in zip(indicator.datas, canonical.datas):
+            dlines, clines = data.lines, cdata.lines
+            if len(dlines) > 1 and len(clines) > 1:
+                if any(x is not y for x, y in zip(dlines, clines)):
+                    return
+
+        # The subtree of indicator is discarded. It cannot be done if others
+        # already use the lines of an indicator in it
+        subtree = []
+        objs = list(indicator.getindicators())
+        while objs:
+            obj = objs.pop()
+            if getattr(obj, '_dedups', 0):
+                return
+
+            subtree.append(obj)
+            objs.extend(obj.getindicators())
+
+        # Attributes holding something of the subtree (a sub-indicator, an
+        # operation, their lines) would no longer be updated. They get the
+        # ones with the same name in canonical, which are calculated
+        subids = set()
+        for obj in subtree:
+            subids.add(id(obj))
+            subids.update(id(line) for line in obj.lines)
+
+        redirects = dict()
+        for name, val in indicator.__dict__.items():
+            if name == '_lineiterators':
+                continue
+
+            if id(val) in subids:
+                cval = canonical.__dict__.get(name)
+                if type(cval) is not type(val):
+                    return  # nothing to redirect it to
+
+                redirects[name] = cval
+            elif isinstance(val, (list, tuple, set, frozenset, dict)):
+                vals = val.values() if isinstance(val, dict) else val
+                if any(id(x) in subids for x in vals):
+                    return  # not redirected inside containers
+
+        for obj in subtree:
+            key = getattr(obj, '_dedupk', None)
+            if key is not None and registry.get(key) is obj:
+                del registry[key]
+
+        for name, val in redirects.items():
+            setattr(indicator, name, val)
+
+        indicator._dedupshare(canonical)
+        canonical._dedups += 1
+        o._dedupcount += 1
+
+    def _getdedupkey(self):
+        '''
+        Returns the structural key of the object: class, params and the 1st
+        line of each input (by identity)
+        '''
+        pvals = tuple(id(x) if isinstance(x, LineRoot) else x
+                      for x in self.params._getvalues())
+
+        dlines = tuple(id(data.lines[0]) for data in self.datas)
+
+        cls = self.__class__
+        while cls.aliased:  # declared aliases are unmodified subclasses
+            cls = cls.__bases__[0]
+
+        key = (cls, pvals, dlines)
+        hash(key)  # raise TypeError early if something is not hashable
+        return key
+
+    def _dedupshare(self, other):
+        '''
+        Uses the lines of ``other`` which must be structurally equal. Nothing
+        is calculated, buffered or shrunk, but pointer movements (home,
+        advance, seek) work on the shared lines as the owner expects
+        '''
+        self._dedupof = other
+        self._lineiterators.clear()  # own calculations are discarded
+
+        self.lines = self.l = other.lines
+        if self.lines.fullsize():
+            self.line = self.lines[0]
+
+        for l, line in enumerate(self.lines):
+            setattr(self, 'line_%d' % l, line)
+            setattr(self, 'line%d' % l, line)
+
+        cls = self.__class__
+        for linealias, l in self.lines._getlinealiases():
+            if not hasattr(cls, linealias):
+                setattr(self, linealias, self.lines[l])
+
+        # The lines are calculated and managed by the owner of other
+        for name in ('_next', '_once', '_oncechunk', 'qbuffer', 'shrink'):
+            setattr(self, name, self._dedupnop)
+
+    def _dedupnop(self, *args, **kwargs):
+        pass
+
     def bindlines(self, owner=None, own=None):
         if not owner:
             owner = 0
@@ -315,6 +456,29 @@ class LineIterator(with_metaclass(MetaLineIterator, LineSeries)):
         for line in self.lines:
             line.oncebinding()
 
+    def _oncechunk(self):
+        # Like _once but only for the values added to the clock since the
+        # last window. Buffers may have been shrunk: positions are relative
+        # to what the buffers still hold
+        start = len(self.array)
+        self.forward(size=len(self._clock.array) - start)
+
+        for indicator in self._lineiterators[LineIterator.IndType]:
+            indicator._oncechunk()
+
+        for data in self.datas:
+            data.seek(start - 1)
+
+        for indicator in self._lineiterators[LineIterator.IndType]:
+            indicator.seek(start - 1)
+
+        self.seek(start - 1)
+
+        self._oncewindow(start, len(self.array), self.lines[0].lenoffset)
+
+        for line in self.lines:
+            line.oncebinding()
+
     def preonce(self, start, end):
         pass
 
@@ -170,6 +170,23 @@ class LineRoot(with_metaclass(MetaLineRoot, object)):
         '''
         pass
 
+    def _oncewindow(self, start, end, offset=0):
+        '''
+        Calls preonce/oncestart/once for the buffer positions from start to
+        end, where ``offset`` is the number of positions which have already
+        been discarded from the buffer (and which count for the minperiod)
+        '''
+        mpidx = self._minperiod - 1 - offset  # 1st full value in the buffer
+        if start < mpidx:
+            self.preonce(start, min(mpidx, end))
+
+        if start <= mpidx < end:
+            self.oncestart(mpidx, mpidx + 1)
+
+        ostart = max(start, mpidx + 1)
+        if ostart < end:
+            self.once(ostart, end)
+
     # Arithmetic operators
     def _makeoperation(self, other, operation, r=False, _ownerskip=None):
         raise NotImplementedError
@@ -31,6 +31,7 @@ lines at once.
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
+from collections import OrderedDict
 import sys
 
 from .utils.py3 import map, range, string_types, with_metaclass
@@ -95,6 +96,7 @@ class Lines(object):
     _getlines = classmethod(lambda cls: ())
     _getlinesextra = classmethod(lambda cls: 0)
     _getlinesextrabase = classmethod(lambda cls: 0)
+    _getlinealiases = classmethod(lambda cls: ())
 
     @classmethod
     def _derive(cls, name, lines, extralines, otherbases, linesoverride=False,
@@ -131,21 +133,17 @@ class Lines(object):
         clsextralines = baseextralines + extralines
         lines2add = obaseslines + lines
 
-        # str for Python 2/3 compatibility
         basecls = cls if not linesoverride else Lines
 
-        newcls = type(str(cls.__name__ + '_' + name), (basecls,), {})
-        clsmodule = sys.modules[cls.__module__]
-        newcls.__module__ = cls.__module__
-        setattr(clsmodule, str(cls.__name__ + '_' + name), newcls)
-
-        setattr(newcls, '_getlinesbase', classmethod(lambda cls: baselines))
-        setattr(newcls, '_getlines', classmethod(lambda cls: clslines))
-
-        setattr(newcls, '_getlinesextrabase',
-                classmethod(lambda cls: baseextralines))
-        setattr(newcls, '_getlinesextra',
-                classmethod(lambda cls: clsextralines))
+        # Gather the class attributes first and create the class in one go,
+        # which is much cheaper than setting them one by one afterwards
+        clsdct = dict(
+            __module__=cls.__module__,
+            _getlinesbase=classmethod(lambda cls: baselines),
+            _getlines=classmethod(lambda cls: clslines),
+            _getlinesextrabase=classmethod(lambda cls: baseextralines),
+            _getlinesextra=classmethod(lambda cls: clsextralines),
+        )
 
         l2start = len(cls._getlines()) if not linesoverride else 0
         l2add = enumerate(lines2add, start=l2start)
@@ -156,13 +154,13 @@ class Lines(object):
                 linealias = linealias[0]
 
             desc = LineAlias(line)  # keep a reference below
-            setattr(newcls, linealias, desc)
+            clsdct[linealias] = desc
 
         # Create extra aliases for the given name, checking if the names is in
         # l2alias (which is from the argument lalias and comes from the
         # directive 'linealias', hence the confusion here (the LineAlias come
         # from the directive 'lines')
-        for line, linealias in enumerate(newcls._getlines()):
+        for line, linealias in enumerate(clslines):
             if not isinstance(linealias, string_types):
                 # a tuple or list was passed, 1st is name
                 linealias = linealias[0]
@@ -174,7 +172,22 @@ class Lines(object):
                     extranames = [extranames]
 
                 for ename in extranames:
-                    setattr(newcls, ename, desc)
+                    clsdct[ename] = desc
+
+        # Collect the (name, line index) of all aliases, also the inherited
+        # ones, to let the owner reference the lines directly by name
+        linealiases = OrderedDict(basecls._getlinealiases())
+        for aname, attr in clsdct.items():
+            if isinstance(attr, LineAlias):
+                linealiases[aname] = attr.line
+
+        linealiases = tuple(linealiases.items())
+        clsdct['_getlinealiases'] = classmethod(lambda cls: linealiases)
+
+        # str for Python 2/3 compatibility
+        newcls = type(str(cls.__name__ + '_' + name), (basecls,), clsdct)
+        clsmodule = sys.modules[cls.__module__]
+        setattr(clsmodule, str(cls.__name__ + '_' + name), newcls)
 
         return newcls
 
@@ -193,6 +206,33 @@ class Lines(object):
     def getlinealiases(cls):
         return cls._getlines()
 
+    @classmethod
+    def _getlineattrs(cls, prefix):
+        '''
+        Return (name, line index) pairs with the names under which the lines
+        are made available by objects using the owner of the lines as a data:
+        prefix + alias and prefix + index (ex: data0_close, data0_3)
+
+        The result is cached in the class
+        '''
+        lineattrs = cls.__dict__.get('_lineattrs')
+        if lineattrs is None:
+            lineattrs = dict()
+            setattr(cls, '_lineattrs', lineattrs)
+
+        attrs = lineattrs.get(prefix)
+        if attrs is None:
+            attrs = list()
+            for l in range(len(cls._getlines()) + cls._getlinesextra()):
+                linealias = cls._getlinealias(l)
+                if linealias:
+                    attrs.append(('%s%s' % (prefix, linealias), l))
+                attrs.append(('%s%d' % (prefix, l), l))
+
+            lineattrs[prefix] = attrs = tuple(attrs)
+
+        return attrs
+
     def itersize(self):
         return iter(self.lines[0:self.size()])
 
@@ -295,6 +335,20 @@ class Lines(object):
         for line in self.lines:
             line.advance(size)
 
+    def seek(self, idx):
+        '''
+        Proxy line operation
+        '''
+        for line in self.lines:
+            line.seek(idx)
+
+    def shrink(self, size):
+        '''
+        Proxy line operation
+        '''
+        for line in self.lines:
+            line.shrink(size)
+
     def buflen(self, line=0):
         '''
         Proxy line operation
@@ -433,10 +487,16 @@ class MetaLineSeries(LineMultiple.__class__):
             _obj.line = _obj.lines[0]
 
         for l, line in enumerate(_obj.lines):
-            setattr(_obj, 'line_%s' % l, _obj._getlinealias(l))
             setattr(_obj, 'line_%d' % l, line)
             setattr(_obj, 'line%d' % l, line)
 
+        # add the lines by name to spare the __getattr__ and descriptor round
+        # trip to reach them (data.close[0]) unless the class already defines
+        # the name, which takes precedence
+        for linealias, l in _obj.lines._getlinealiases():
+            if not hasattr(cls, linealias):
+                setattr(_obj, linealias, _obj.lines[l])
+
         # Parameter values have now been set before __init__
         return _obj, args, kwargs
 
@@ -571,6 +631,12 @@ class LineSeries(with_metaclass(MetaLineSeries, LineMultiple)):
     def advance(self, size=1):
         self.lines.advance(size)
 
+    def seek(self, idx):
+        self.lines.seek(idx)
+
+    def shrink(self, size):
+        self.lines.shrink(size)
+
 
 class LineSeriesStub(LineSeries):
     '''Simulates a LineMultiple object based on LineSeries from a single line
@@ -628,6 +694,14 @@ class LineSeriesStub(LineSeries):
         if not self.slave:
             super(LineSeriesStub, self).advance(size)
 
+    def seek(self, idx):
+        if not self.slave:
+            super(LineSeriesStub, self).seek(idx)
+
+    def shrink(self, size):
+        if not self.slave:
+            super(LineSeriesStub, self).shrink(size)
+
     def qbuffer(self):
         if not self.slave:
             super(LineSeriesStub, self).qbuffer()
@@ -24,6 +24,7 @@ from __future__ import (absolute_import, division, print_function,
 from collections import OrderedDict
 import itertools
 import sys
+import threading
 
 import backtrader as bt
 from .utils.py3 import zip, string_types, with_metaclass
@@ -39,8 +40,27 @@ def findbases(kls, topclass):
     return retval
 
 
+class _Constructing(threading.local):
+    '''Holds per thread the objects which are being created by MetaBase,
+    innermost last, i.e.: the ones which can own an object being created'''
+    def __init__(self):
+        self.objs = list()
+
+
+_constructing = _Constructing()
+
+
 def findowner(owned, cls, startlevel=2, skip=None):
-    # skip this frame and the caller's -> start at 2
+    # The objects being created are the usual owners (an indicator created
+    # during the __init__ of a strategy or of another indicator). Look first
+    # in the explicit context, innermost first.
+    for obj_ in reversed(_constructing.objs):
+        if obj_ is not owned and obj_ is not skip and isinstance(obj_, cls):
+            return obj_
+
+    # Else the owner may be running a regular method (an observer added
+    # during strategy setup, a strategy created by cerebro): look in the
+    # frames. skip this frame and the caller's -> start at 2
     for framelevel in itertools.count(startlevel):
         try:
             frame = sys._getframe(framelevel)
@@ -69,6 +89,8 @@ class MetaBase(type):
 
     def donew(cls, *args, **kwargs):
         _obj = cls.__new__(cls, *args, **kwargs)
+        # The object can own others from now on (even during donew)
+        _constructing.objs.append(_obj)
         return _obj, args, kwargs
 
     def dopreinit(cls, _obj, *args, **kwargs):
@@ -82,11 +104,17 @@ class MetaBase(type):
         return _obj, args, kwargs
 
     def __call__(cls, *args, **kwargs):
-        cls, args, kwargs = cls.doprenew(*args, **kwargs)
-        _obj, args, kwargs = cls.donew(*args, **kwargs)
-        _obj, args, kwargs = cls.dopreinit(_obj, *args, **kwargs)
-        _obj, args, kwargs = cls.doinit(_obj, *args, **kwargs)
-        _obj, args, kwargs = cls.dopostinit(_obj, *args, **kwargs)
+        objs = _constructing.objs
+        level = len(objs)
+        try:
+            cls, args, kwargs = cls.doprenew(*args, **kwargs)
+            _obj, args, kwargs = cls.donew(*args, **kwargs)
+            _obj, args, kwargs = cls.dopreinit(_obj, *args, **kwargs)
+            _obj, args, kwargs = cls.doinit(_obj, *args, **kwargs)
+            _obj, args, kwargs = cls.dopostinit(_obj, *args, **kwargs)
+        finally:
+            del objs[level:]  # creation is over, even if failed
+
         return _obj
 
 
@@ -132,22 +160,25 @@ class AutoInfoClass(object):
             newclsname += str(namecounter)
             namecounter += 1
 
-        newcls = type(newclsname, (cls,), {})
-        setattr(clsmodule, newclsname, newcls)
-
-        setattr(newcls, '_getpairsbase',
-                classmethod(lambda cls: baseinfo.copy()))
-        setattr(newcls, '_getpairs', classmethod(lambda cls: clsinfo.copy()))
-        setattr(newcls, '_getrecurse', classmethod(lambda cls: recurse))
+        # Gather the class attributes first and create the class in one go,
+        # which is much cheaper than setting them one by one afterwards
+        clsdct = dict(
+            _getpairsbase=classmethod(lambda cls: baseinfo.copy()),
+            _getpairs=classmethod(lambda cls: clsinfo.copy()),
+            _getrecurse=classmethod(lambda cls: recurse),
+        )
 
         for infoname, infoval in info2add.items():
             if recurse:
-                recursecls = getattr(newcls, infoname, AutoInfoClass)
+                recursecls = getattr(cls, infoname, AutoInfoClass)
                 infoval = recursecls._derive(name + '_' + infoname,
                                              infoval,
                                              [])
 
-            setattr(newcls, infoname, infoval)
+            clsdct[infoname] = infoval
+
+        newcls = type(newclsname, (cls,), clsdct)
+        setattr(clsmodule, newclsname, newcls)
 
         return newcls
 
@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016, 2017 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+from collections import OrderedDict
+
+
+__all__ = ['DataPanel']
+
+
+class DataPanel(object):
+    '''
+    Aligned view of preloaded datas, with one 2-D ``numpy`` array per field
+    (``close``, ``volume``, ...) of shape ``(bars, datas)``
+
+    The rows are the merged timeline of the datas, i.e.: the sorted union of
+    their datetimes, which is the timeline followed by ``Cerebro`` when
+    delivering the bars. A data which has no bar at a given datetime has a
+    ``NaN`` in that row
+
+    Attributes:
+
+      - ``datas``: the datas in column order
+      - ``datetime``: 1-D array with the datetime (float) of each row
+      - ``fields``: names of the fields (lines of the datas but datetime)
+
+    A field is reached with ``panel[field]`` or ``panel.field``
+    '''
+    def __init__(self, datas):
+        import numpy as np
+
+        self.datas = datas = list(datas)
+
+        # The values actually delivered (preloading may have extended the
+        # buffers for lookahead)
+        dtarrays = [np.asarray(d.lines.datetime.array[:d.buflen()])
+                    for d in datas]
+        self.datetime = timeline = np.unique(np.concatenate(dtarrays or [[]]))
+
+        self.fields = list()
+        for d in datas:
+            for name in d.lines.getlinealiases():
+                if name != 'datetime' and name not in self.fields:
+                    self.fields.append(name)
+
+        self._arrays = arrays = OrderedDict()
+        for field in self.fields:
+            arrays[field] = np.full((len(timeline), len(datas)), np.nan)
+
+        for col, (d, dts) in enumerate(zip(datas, dtarrays)):
+            rows = np.searchsorted(timeline, dts)
+            for field in d.lines.getlinealiases():
+                if field != 'datetime':
+                    line = getattr(d.lines, field)
+                    arrays[field][rows, col] = line.array[:len(dts)]
+
+    def __len__(self):
+        return len(self.datetime)
+
+    def __getitem__(self, field):
+        return self._arrays[field]
+
+    def __getattr__(self, name):
+        try:
+            return self.__dict__['_arrays'][name]
+        except KeyError:
+            raise AttributeError(name)
+
+    def getcolumn(self, data):
+        '''Returns the column of ``data`` in the arrays'''
+        for col, d in enumerate(self.datas):
+            if d is data:
+                return col
+
+        raise ValueError('data is not in the panel')
+
+    def row(self, idx, field='close'):
+        '''Returns a view (no copy is made) of the values of ``field`` for
+        all datas in row ``idx``'''
+        return self._arrays[field][idx]
+
+    def rows(self, idx, size, field='close'):
+        '''Returns a view of ``size`` rows of ``field`` ending at row
+        ``idx`` (included)'''
+        return self._arrays[field][max(0, idx - size + 1):idx + 1]
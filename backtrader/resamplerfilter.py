@@ -315,6 +315,41 @@ class _BaseResampler(with_metaclass(metabase.MetaParams, object)):
 
         return self(data, fromcheck=True, forcedata=_forcedata)
 
+    # Intraday time units, in microseconds
+    _TFUNITS = {
+        TimeFrame.MicroSeconds: 1,
+        TimeFrame.Seconds: 10 ** 6,
+        TimeFrame.Minutes: 60 * 10 ** 6,
+    }
+
+    def nextcheck(self, data):
+        '''Returns the wall clock time (utc) at which ``check`` may next
+        deliver the open bar or ``None`` if no bar is open or the time cannot
+        be known
+
+        The comparisons in ``check`` use whole intraday units (seconds for a
+        timeframe of seconds for example) and the end of the session, hence
+        the next unit boundary or the end of session (if earlier)
+        '''
+        if not self.bar.isopen() or self.p.timeframe == TimeFrame.Ticks:
+            return None
+
+        tmoffset = data._timeoffset()
+        now = datetime.utcnow() + tmoffset  # what check uses
+        nextcheck = None
+        if self.subdays:
+            unit = self._TFUNITS[self.p.timeframe]
+            tm = now.time()
+            us = ((tm.hour * 60 + tm.minute) * 60 + tm.second) * 10 ** 6
+            us += tm.microsecond
+            nextcheck = now + timedelta(microseconds=unit - us % unit)
+
+        nexteos, _ = data._getnexteos()
+        if nexteos > now and (nextcheck is None or nexteos < nextcheck):
+            nextcheck = nexteos
+
+        return None if nextcheck is None else nextcheck - tmoffset
+
     def _dataonedge(self, data):
         if not self.subweeks:
             if data._calendar is None:
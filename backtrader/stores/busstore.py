@@ -0,0 +1,582 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016, 2017 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import collections
+import functools
+import os
+import struct
+
+from backtrader.feed import DataBase
+from backtrader.metabase import MetaParams
+from backtrader.utils.py3 import (ConnectionRefusedError, string_types,
+                                   with_metaclass)
+from .storeio import StoreLoop, _Protocol
+
+
+__all__ = ['BusHub', 'BusStore']
+
+
+# A frame is a header and a body. The header carries the length of the body,
+# the kind of frame and the channel (a published data) it refers to
+_HEAD = struct.Struct(str('!IcH'))
+_BAR = struct.Struct(str('!Q7d'))  # seq, datetime, ohlc, volume, openinterest
+_STATUS = struct.Struct(str('!B'))
+
+# Kinds of frames
+SUBSCRIBE = b'S'  # client -> hub: body is the name of a data
+CHANNEL = b'C'  # hub -> client: channel of the name in the body
+UNKNOWN = b'X'  # hub -> client: the name in the body is not published
+BARDATA = b'B'  # a bar (_BAR)
+STATUSDATA = b'N'  # a status notification of the data (_STATUS)
+END = b'E'  # the data will not deliver anything else
+REPLAYED = b'R'  # hub -> client: end of the frames sent on a subscription
+LOST = b'L'  # (not on the wire) the connection to the hub is broken
+
+# Lines of a bar, in the order of _BAR
+BARLINES = ('datetime', 'open', 'high', 'low', 'close', 'volume',
+            'openinterest')
+
+
+_loopbacks = dict()  # key: address - value: BusHub (only used in the loop)
+
+
+def _frame(kind, chan=0, body=b''):
+    return _HEAD.pack(len(body), kind, chan) + body
+
+
+class _FrameReader(object):
+    # Splits the bytes received into the frames (kind, chan, body)
+    def __init__(self):
+        self._buf = bytearray()
+
+    def feed(self, data):
+        buf = self._buf
+        buf.extend(data)
+        frames = []
+        while len(buf) >= _HEAD.size:
+            size, kind, chan = _HEAD.unpack_from(buf)
+            end = _HEAD.size + size
+            if len(buf) < end:
+                break
+
+            frames.append((kind, chan, bytes(buf[_HEAD.size:end])))
+            del buf[:end]
+
+        return frames
+
+
+class _LoopbackTransport(object):
+    # Transport connecting two protocols in the loop: writes are delivered
+    # to the peer in the next iteration of the loop, keeping the order
+    def __init__(self, loop):
+        self.loop = loop
+        self.peer = None
+        self._closing = False
+
+    def write(self, data):
+        if not self._closing:
+            self.loop.call_soon(self.peer._deliver, bytes(data))
+
+    def _deliver(self, data):
+        if not self._closing:
+            self.protocol.data_received(data)
+
+    def get_write_buffer_size(self):
+        return 0
+
+    def is_closing(self):
+        return self._closing
+
+    def close(self):
+        if not self._closing:
+            # what has been written is delivered before the end
+            self.loop.call_soon(self.peer._lost)
+            self.loop.call_soon(self._lost)
+            self._closing = True
+
+    abort = close
+
+    def _lost(self):
+        self._closing = True
+        protocol, self.protocol = self.protocol, None
+        if protocol is not None:
+            protocol.connection_lost(None)
+
+
+def _loopback_connect(loop, factory, address):
+    # Counterpart of loop.create_connection for the loopback transport
+    hub = _loopbacks.get(address)
+    if hub is None:
+        raise ConnectionRefusedError('No loopback hub at %s' % (address,))
+
+    client, server = _LoopbackTransport(loop), _LoopbackTransport(loop)
+    client.peer, server.peer = server, client
+    client.protocol, server.protocol = factory(), hub._factory()
+    server.protocol.connection_made(server)
+    client.protocol.connection_made(client)
+    return client, client.protocol
+
+
+class _Subscriber(_Protocol):
+    # Connection of a client to the hub
+    def __init__(self, hub):
+        self.hub = hub
+        self.transport = None
+        self.chans = set()
+        self._reader = _FrameReader()
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self.hub._subs.add(self)
+
+    def connection_lost(self, exc):
+        self.hub._subs.discard(self)
+        self.transport = None
+
+    def data_received(self, data):
+        for kind, chan, body in self._reader.feed(data):
+            if kind == SUBSCRIBE:
+                self.hub._subscribe(self, body.decode('utf-8'))
+
+
+class _Channel(object):
+    # Published data. Only used in the loop
+    def __init__(self, chan, name, backlog):
+        self.chan = chan
+        self.name = name
+        self.status = None
+        self.ended = False
+        self.backlog = collections.deque(maxlen=backlog)
+
+
+class BusHub(object):
+    '''Publisher side of the bus: serves the bars and status notifications
+    of named channels to the clients (``BusStore``) which subscribe to them
+
+    The methods can be called from any thread. The frames are sent from the
+    ``StoreLoop``
+
+    Params:
+
+      - ``address``: for the ``socket`` transport a path (*Unix* socket) or
+        a ``(host, port)`` tuple (*TCP*). Any hashable for ``loopback``
+
+      - ``transport`` (default: ``socket``): ``socket`` or ``loopback``.
+        The latter connects the hub and the clients within the process (the
+        frames go through the same encoding) and is meant for testing
+
+      - ``backlog`` (default: ``0``): bars kept per channel and sent to
+        clients when they subscribe (after a reconnection for example)
+
+      - ``maxbuffer`` (default: ``16777216``): bytes pending to be sent to a
+        client after which it is disconnected because it does not keep up.
+        The client reconnects and gets the ``backlog``
+    '''
+    def __init__(self, address, transport='socket', backlog=0,
+                 maxbuffer=1 << 24):
+        self.sl = StoreLoop.instance()
+        self.address = address
+        self.transport = transport
+        self.backlog = backlog
+        self.maxbuffer = maxbuffer
+
+        self._channels = collections.OrderedDict()  # key: name
+        self._pending = list()  # frames to send in the next flush
+        self._subs = set()
+        self._server = None
+
+    def addchannel(self, name):
+        '''Adds a channel and returns its id. Must be called before
+        ``start``'''
+        chan = len(self._channels)
+        self._channels[name] = _Channel(chan, name, self.backlog)
+        return chan
+
+    def _factory(self):
+        return _Subscriber(self)
+
+    def start(self):
+        '''Starts serving. Raises the exception if the address cannot be
+        bound'''
+        loop = self.sl.loop
+        if self.transport == 'loopback':
+            self.sl.call(_loopbacks.__setitem__, self.address, self)
+            return
+
+        if isinstance(self.address, string_types):
+            coro = loop.create_unix_server(self._factory, self.address)
+        else:
+            host, port = self.address
+            coro = loop.create_server(self._factory, host, port)
+
+        import asyncio
+        self._server = asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+    def stop(self):
+        '''Sends what is pending and stops serving. The connections are
+        closed once the frames sent to them have been written'''
+        self.flush()
+        self.sl.call(self._stop)
+
+    def _stop(self):
+        if self.transport == 'loopback':
+            if _loopbacks.get(self.address) is self:
+                del _loopbacks[self.address]
+
+        elif self._server is not None:
+            self._server.close()
+            self._server = None
+            if isinstance(self.address, string_types):
+                try:
+                    os.remove(self.address)
+                except OSError:
+                    pass
+
+        for sub in list(self._subs):
+            sub.transport.close()
+
+    def bar(self, chan, seq, values):
+        '''Queues a bar of channel ``chan``. ``seq`` has to grow with each
+        bar and ``values`` are those of ``BARLINES``'''
+        self._pending.append(
+            (chan, BARDATA, _frame(BARDATA, chan, _BAR.pack(seq, *values))))
+
+    def status(self, chan, status):
+        '''Queues a status notification of channel ``chan``'''
+        self._pending.append(
+            (chan, status, _frame(STATUSDATA, chan, _STATUS.pack(status))))
+
+    def end(self, chan):
+        '''Queues the end of channel ``chan``'''
+        self._pending.append((chan, END, _frame(END, chan)))
+
+    def flush(self):
+        '''Sends what has been queued'''
+        if self._pending:
+            pending, self._pending = self._pending, list()
+            self.sl.call(self._send, pending)
+
+    def _send(self, pending):
+        channels = list(self._channels.values())
+        for chan, what, frame in pending:
+            channel = channels[chan]
+            if what == BARDATA:
+                channel.backlog.append(frame)
+            elif what == END:
+                channel.ended = True
+            else:
+                channel.status = what
+
+        for sub in list(self._subs):
+            chans = sub.chans
+            data = b''.join(frame for chan, _, frame in pending
+                            if chan in chans)
+            if not data:
+                continue
+
+            transport = sub.transport
+            if transport.get_write_buffer_size() > self.maxbuffer:
+                transport.abort()  # too slow: the client will reconnect
+            else:
+                transport.write(data)
+
+    def _subscribe(self, sub, name):
+        channel = self._channels.get(name)
+        if channel is None:
+            sub.transport.write(_frame(UNKNOWN, body=name.encode('utf-8')))
+            return
+
+        chan = channel.chan
+        sub.chans.add(chan)
+
+        frames = [_frame(CHANNEL, chan, name.encode('utf-8'))]
+        if channel.backlog:
+            delayed = _STATUS.pack(DataBase.DELAYED)
+            frames.append(_frame(STATUSDATA, chan, delayed))
+            frames.extend(channel.backlog)
+
+        if channel.status is not None:
+            frames.append(
+                _frame(STATUSDATA, chan, _STATUS.pack(channel.status)))
+
+        if channel.ended:
+            frames.append(_frame(END, chan))
+
+        frames.append(_frame(REPLAYED, chan))
+        sub.transport.write(b''.join(frames))
+
+
+class _Client(_Protocol):
+    # Connection of the store to a hub
+    def __init__(self, store):
+        self.store = store
+        self.transport = None
+        self._reader = _FrameReader()
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self.store._made(self)
+
+    def connection_lost(self, exc):
+        self.transport = None
+        self.store._lost(self)
+
+    def data_received(self, data):
+        for frame in self._reader.feed(data):
+            self.store._frame(*frame)
+
+
+class BusStore(with_metaclass(MetaParams, object)):
+    '''Client side of the bus: subscribes to the datas published by a
+    ``BusHub`` (see the ``BusPublisher`` strategy) in another process and
+    delivers them to ``BusData`` feeds, created with ``getdata``
+
+    A single connection carries all the datas of the store. Unlike the
+    stores of brokers it is not a singleton: a store per hub (feed process)
+    can be used
+
+    Several datas can have the same ``dataname``: all of them receive the
+    frames of the published data. A data started once the frames are already
+    arriving subscribes again to get the backlog and the status
+
+    Params:
+
+      - ``address``: that of the ``BusHub``
+
+      - ``transport`` (default: ``socket``): that of the ``BusHub``
+
+      - ``reconnect`` (default: ``True``): reconnect when the connection to
+        the hub fails or is broken
+
+      - ``reconnections`` (default: ``-1``): number of consecutive attempts
+        to reconnect. ``-1`` means forever
+
+      - ``reconntimeout`` (default: ``1.0``): seconds between attempts
+    '''
+    params = (
+        ('address', None),
+        ('transport', 'socket'),
+        ('reconnect', True),
+        ('reconnections', -1),
+        ('reconntimeout', 1.0),
+    )
+
+    BrokerCls = None  # no broker
+    DataCls = None  # data class will auto register
+
+    def __init__(self):
+        self.notifs = collections.deque()
+        self.datas = list()
+        self.sl = None
+
+        # Only used in the loop
+        self._names = dict()  # key: name - value: list of datas
+        self._chans = dict()  # key: channel - value: name
+        self._joining = dict()  # key: name - value: datas subscribing again
+        self._replaying = dict()  # key: channel - value: (name, datas)
+        self._unknown = set()  # names not published
+        self._ended = set()  # ids of the datas which have had the END
+        self._client = None
+        self._connecting = False
+        self._stopped = False
+        self._reconns = self.p.reconnections
+
+    def getdata(self, *args, **kwargs):
+        '''Returns ``DataCls`` with args, kwargs'''
+        data = self.DataCls(*args, **kwargs)
+        data._store = self
+        return data
+
+    def start(self, data=None):
+        if data is None:
+            return
+
+        self.datas.append(data)
+        if self.sl is None:
+            self.sl = StoreLoop.instance()
+
+        self.sl.call(self._subscribe, data)
+
+    def stop(self):
+        if self.sl is not None:
+            self.sl.call(self._stop)
+
+    def put_notification(self, msg, *args, **kwargs):
+        self.notifs.append((msg, args, kwargs))
+
+    def get_notifications(self):
+        '''Return the pending "store" notifications'''
+        self.notifs.append(None)  # put a mark / threads could still append
+        return [x for x in iter(self.notifs.popleft, None)]
+
+    def _subscribe(self, data):
+        name = data.p.dataname
+        datas = self._names.setdefault(name, [])
+        if name in self._unknown:
+            datas.append(data)
+            self._ended.add(id(data))
+            data.qlive.put((UNKNOWN, None))
+            return
+
+        if name in self._chans.values():
+            # The frames already delivered to the others are sent again
+            self._joining.setdefault(name, []).append(data)
+        else:
+            datas.append(data)
+            pending = self._client is not None or self._connecting
+            if len(datas) > 1 and pending:
+                return  # it gets the frames of the pending subscription
+
+        if self._client is not None:
+            self._client.transport.write(
+                _frame(SUBSCRIBE, body=name.encode('utf-8')))
+        elif not self._connecting:
+            self._connect()
+
+    def _connect(self):
+        if self._stopped:
+            return
+
+        self._connecting = True
+        loop = self.sl.loop
+        factory = functools.partial(_Client, self)
+        if self.p.transport == 'loopback':
+            try:
+                _loopback_connect(loop, factory, self.p.address)
+            except ConnectionRefusedError as e:
+                self._failed(e)
+            return
+
+        if isinstance(self.p.address, string_types):
+            coro = loop.create_unix_connection(factory, self.p.address)
+        else:
+            host, port = self.p.address
+            coro = loop.create_connection(factory, host, port)
+
+        loop.create_task(coro).add_done_callback(self._connected)
+
+    def _connected(self, task):
+        if task.cancelled():
+            return
+
+        exc = task.exception()
+        if exc is not None:
+            self._failed(exc)
+            return
+
+        if self._stopped:
+            task.result()[0].close()
+
+    def _made(self, client):
+        # The connection is up: (re)subscribe to the datas
+        self._client = client
+        self._connecting = False
+        self._reconns = self.p.reconnections
+        self.put_notification('CONNECTED', self.p.address)
+        client.transport.write(b''.join(
+            _frame(SUBSCRIBE, body=name.encode('utf-8'))
+            for name in self._names))
+
+    def _lost(self, client):
+        if self._client is client:
+            self._client = None
+            self._chans.clear()
+            # everything is sent again on subscription after reconnecting
+            for name, datas in self._joining.items():
+                self._names[name].extend(datas)
+
+            for name, datas in self._replaying.values():
+                self._names[name].extend(datas)
+
+            self._joining.clear()
+            self._replaying.clear()
+            self._failed(None)
+
+    def _failed(self, exc):
+        self._connecting = False
+        if self._stopped:
+            return
+
+        pending = [data for datas in self._names.values() for data in datas
+                   if id(data) not in self._ended]
+        if not pending:
+            return  # nothing else is expected
+
+        if exc is not None:
+            self.put_notification(exc)
+
+        for data in pending:
+            data.qlive.put((LOST, None))
+
+        if not self.p.reconnect or self._reconns == 0:
+            for data in pending:
+                data.qlive.put((END, None))
+            return
+
+        self._reconns -= 1
+        self._connecting = True
+        self.sl.loop.call_later(self.p.reconntimeout, self._connect)
+
+    def _frame(self, kind, chan, body):
+        if kind == CHANNEL:
+            name = body.decode('utf-8')
+            if chan in self._chans:  # the others have had these frames
+                self._replaying[chan] = (name, self._joining.pop(name, []))
+            else:
+                self._chans[chan] = name
+            return
+
+        if kind == UNKNOWN:
+            name = body.decode('utf-8')
+            self._unknown.add(name)
+            for data in self._names[name]:
+                self._ended.add(id(data))
+                data.qlive.put((kind, None))
+            return
+
+        name = self._chans[chan]
+        if kind == REPLAYED:
+            if chan in self._replaying:
+                self._names[name].extend(self._replaying.pop(chan)[1])
+            return
+
+        if chan in self._replaying:
+            datas = self._replaying[chan][1]
+        else:
+            datas = self._names[name]
+
+        if kind == BARDATA:
+            msg = _BAR.unpack(body)
+        elif kind == STATUSDATA:
+            msg = _STATUS.unpack(body)[0]
+        else:  # END
+            msg = None
+            self._ended.update(id(data) for data in datas)
+
+        for data in datas:
+            data.qlive.put((kind, msg))
+
+    def _stop(self):
+        self._stopped = True
+        if self._client is not None:
+            self._client.transport.close()
@@ -37,6 +37,7 @@ from backtrader import TimeFrame, Position
 from backtrader.metabase import MetaParams
 from backtrader.utils.py3 import bytes, bstr, queue, with_metaclass, long
 from backtrader.utils import AutoDict, UTC
+from .storeio import TickQueue, runall
 
 bytes = bstr  # py2/3 need for ibpy
 
@@ -395,26 +396,13 @@ class IBStore(with_metaclass(MetaSingleton, object)):
 
     def startdatas(self):
         # kickstrat datas, not returning until all of them have been done
-        ts = list()
-        for data in self.datas:
-            t = threading.Thread(target=data.reqdata)
-            t.start()
-            ts.append(t)
-
-        for t in ts:
-            t.join()
+        # (with a bounded number of threads and not with one per data)
+        runall([data.reqdata for data in self.datas])
 
     def stopdatas(self):
         # stop subs and force datas out of the loop (in LIFO order)
         qs = list(self.qs.values())
-        ts = list()
-        for data in self.datas:
-            t = threading.Thread(target=data.canceldata)
-            t.start()
-            ts.append(t)
-
-        for t in ts:
-            t.join()
+        runall([data.canceldata for data in self.datas])
 
         for q in reversed(qs):  # datamaster the last one to get a None
             q.put(None)
@@ -587,7 +575,7 @@ class IBStore(with_metaclass(MetaSingleton, object)):
 
     def getTickerQueue(self, start=False):
         '''Creates ticker/Queue for data delivery to a data feed'''
-        q = queue.Queue()
+        q = TickQueue()
         if start:
             q.put(None)
             return q
@@ -23,17 +23,18 @@ from __future__ import (absolute_import, division, print_function,
 
 import collections
 from datetime import datetime, timedelta
-import time as _time
+import functools
 import json
 import threading
 
 import oandapy
-import requests  # oandapy depdendency
 
 import backtrader as bt
 from backtrader.metabase import MetaParams
 from backtrader.utils.py3 import queue, with_metaclass
 from backtrader.utils import AutoDict
+from .storeio import (HTTPPool, HTTPReplayPool, ReplayEnd, StoreRecorder,
+                      TickQueue)
 
 
 # Extend the exceptions to support extra cases
@@ -62,102 +63,56 @@ class OandaNetworkError(oandapy.OandaError):
         super(self.__class__, self).__init__(er)
 
 
+class OandaReplayEndError(oandapy.OandaError):
+    def __init__(self):
+        er = dict(code=595, message='End of Replay', description='')
+        super(self.__class__, self).__init__(er)
+
+
 class API(oandapy.API):
-    def request(self, endpoint, method='GET', params=None):
-        # Overriden to make something sensible out of a
-        # request.RequestException rather than simply issuing a print(str(e))
+    '''Sends the requests over the (shared and kept alive) connections of
+    ``pool`` rather than with the synchronous session of ``oandapy``'''
+    def __init__(self, pool, environment='practice', access_token=None,
+                 headers=None):
+        super(API, self).__init__(environment=environment,
+                                  access_token=access_token, headers=headers)
+        self.pool = pool
+        self.headers = dict(headers or {})
+        if access_token:
+            self.headers['Authorization'] = 'Bearer ' + access_token
+
+    def request_async(self, endpoint, method='GET', params=None):
+        '''Returns a future for the response to be passed to ``response``'''
         url = '%s/%s' % (self.api_url, endpoint)
 
-        method = method.lower()
+        method = method.upper()
         params = params or {}
+        if method == 'GET':
+            return self.pool.request(method, url, params=params,
+                                     headers=self.headers)
 
-        func = getattr(self.client, method)
-
-        request_args = {}
-        if method == 'get':
-            request_args['params'] = params
-        else:
-            request_args['data'] = params
+        return self.pool.request(method, url, data=params,
+                                 headers=self.headers)
 
-        # Added the try block
+    @staticmethod
+    def response(future):
+        # Make something sensible out of network errors rather than raising
+        # and return (rather than raise) the error messages
         try:
-            response = func(url, **request_args)
-        except requests.RequestException as e:
+            response = future.result()
+            content = response.json()
+        except ReplayEnd:
+            return OandaReplayEndError().error_response
+        except (IOError, ValueError):
             return OandaRequestError().error_response
 
-        content = response.content.decode('utf-8')
-        content = json.loads(content)
-
-        # error message
-        if response.status_code >= 400:
-            # changed from raise to return
+        if response.status >= 400:
             return oandapy.OandaError(content).error_response
 
         return content
 
-
-class Streamer(oandapy.Streamer):
-    def __init__(self, q, headers=None, *args, **kwargs):
-        # Override to provide headers, which is in the standard API interface
-        super(Streamer, self).__init__(*args, **kwargs)
-
-        if headers:
-            self.client.headers.update(headers)
-
-        self.q = q
-
-    def run(self, endpoint, params=None):
-        # Override to better manage exceptions.
-        # Kept as much as possible close to the original
-        self.connected = True
-
-        params = params or {}
-
-        ignore_heartbeat = None
-        if 'ignore_heartbeat' in params:
-            ignore_heartbeat = params['ignore_heartbeat']
-
-        request_args = {}
-        request_args['params'] = params
-
-        url = '%s/%s' % (self.api_url, endpoint)
-
-        while self.connected:
-            # Added exception control here
-            try:
-                response = self.client.get(url, **request_args)
-            except requests.RequestException as e:
-                self.q.put(OandaRequestError().error_response)
-                break
-
-            if response.status_code != 200:
-                self.on_error(response.content)
-                break  # added break here
-
-            # Changed chunk_size 90 -> None
-            try:
-                for line in response.iter_lines(chunk_size=None):
-                    if not self.connected:
-                        break
-
-                    if line:
-                        data = json.loads(line.decode('utf-8'))
-                        if not (ignore_heartbeat and 'heartbeat' in data):
-                            self.on_success(data)
-
-            except:  # socket.error has been seen
-                self.q.put(OandaStreamError().error_response)
-                break
-
-    def on_success(self, data):
-        if 'tick' in data:
-            self.q.put(data['tick'])
-        elif 'transaction' in data:
-            self.q.put(data['transaction'])
-
-    def on_error(self, data):
-        self.disconnect()
-        self.q.put(OandaStreamError(data).error_response)
+    def request(self, endpoint, method='GET', params=None):
+        return self.response(self.request_async(endpoint, method, params))
 
 
 class MetaSingleton(MetaParams):
@@ -187,6 +142,18 @@ class OandaStore(with_metaclass(MetaSingleton, object)):
 
       - ``account_tmout`` (default: ``10.0``): refresh period for account
         value/cash refresh
+
+      - ``record`` (default: ``None``): name of a file to which the
+        requests, the answers and the messages of the streams are recorded
+        (see ``StoreRecorder``), to replay the session later
+
+      - ``replay`` (default: ``None``): name of a file recorded with
+        ``record``. The store does not connect to Oanda and the data feeds
+        and the broker get what was recorded, with the same timing. The
+        datas end (``DISCONNECTED``) when the recording is over
+
+      - ``replayspeed`` (default: ``1.0``): pace of the replay. ``2.0``
+        replays twice as fast and ``None`` as fast as possible
     '''
 
     BrokerCls = None  # broker class will autoregister
@@ -197,12 +164,20 @@ class OandaStore(with_metaclass(MetaSingleton, object)):
         ('account', ''),
         ('practice', False),
         ('account_tmout', 10.0),  # account balance refresh timeout
+        ('record', None),
+        ('replay', None),
+        ('replayspeed', 1.0),
     )
 
     _DTEPOCH = datetime(1970, 1, 1)
     _ENVPRACTICE = 'practice'
     _ENVLIVE = 'live'
 
+    _STREAMURLS = {
+        _ENVPRACTICE: 'https://stream-fxpractice.oanda.com',
+        _ENVLIVE: 'https://stream-fxtrade.oanda.com',
+    }
+
     @classmethod
     def getdata(cls, *args, **kwargs):
         '''Returns ``DataCls`` with args, kwargs'''
@@ -226,8 +201,22 @@ class OandaStore(with_metaclass(MetaSingleton, object)):
         self._ordersrev = collections.OrderedDict()  # map oid to order.ref
         self._transpend = collections.defaultdict(collections.deque)
 
+        # All requests and streams share the connections (and the thread) of
+        # a pool running on the loop of the stores
+        self._recorder = None
+        if self.p.replay is not None:
+            self._pool = HTTPReplayPool(self.p.replay, self.p.replayspeed)
+        else:
+            if self.p.record is not None:
+                self._recorder = StoreRecorder(self.p.record)
+
+            self._pool = HTTPPool(recorder=self._recorder)
+
+        self._evstream = None
+
         self._oenv = self._ENVPRACTICE if self.p.practice else self._ENVLIVE
-        self.oapi = API(environment=self._oenv,
+        self.oapi = API(self._pool,
+                        environment=self._oenv,
                         access_token=self.p.token,
                         headers={'X-Accept-Datetime-Format': 'UNIX'})
 
@@ -261,6 +250,13 @@ class OandaStore(with_metaclass(MetaSingleton, object)):
             self.q_orderclose.put(None)
             self.q_account.put(None)
 
+        if self._evstream is not None:
+            self._evstream.close()
+            self._evstream = None
+
+        if self._recorder is not None:
+            self._recorder.close()
+
     def put_notification(self, msg, *args, **kwargs):
         self.notifs.append((msg, args, kwargs))
 
@@ -316,70 +312,86 @@ class OandaStore(with_metaclass(MetaSingleton, object)):
         i = insts.get('instruments', [{}])
         return i[0] or None
 
-    def streaming_events(self, tmout=None):
-        q = queue.Queue()
-        kwargs = {'q': q, 'tmout': tmout}
-
-        t = threading.Thread(target=self._t_streaming_listener, kwargs=kwargs)
-        t.daemon = True
-        t.start()
-
-        t = threading.Thread(target=self._t_streaming_events, kwargs=kwargs)
-        t.daemon = True
-        t.start()
-        return q
+    def _stream(self, endpoint, params, onmsg, onend, tmout=None):
+        # Opens a stream with the messages (json lines) delivered to onmsg and
+        # the end of it to onend, in the thread of the pool
+        url = '%s/%s' % (self._STREAMURLS[self._oenv], endpoint)
+        return self._pool.stream(
+            url,
+            functools.partial(self._stream_line, onmsg),
+            functools.partial(self._stream_end, onend),
+            params=params, headers=self.oapi.headers, delay=tmout)
+
+    def _stream_line(self, onmsg, line):
+        onmsg(json.loads(line.decode('utf-8')))
+
+    def timeoffset(self):
+        '''Offset of the clock of the service (that of the recording when
+        replaying) with regards to the local clock'''
+        if self.p.replay is not None:
+            return self._pool.timeoffset()
+
+        return timedelta()
+
+    def _stream_end(self, onend, status, body, exc):
+        if exc is not None:
+            if isinstance(exc, ReplayEnd):
+                onend(OandaReplayEndError().error_response)
+            elif isinstance(exc, (IOError, ValueError)):
+                onend(OandaStreamError().error_response)
+            else:  # failed processing of a message
+                onend(OandaStreamError(repr(exc)).error_response)
+
+        elif status != 200:
+            onend(OandaStreamError(body.decode('utf-8')).error_response)
+        else:  # closed from the other side
+            onend(None)
 
-    def _t_streaming_listener(self, q, tmout=None):
-        while True:
-            trans = q.get()
-            self._transaction(trans)
+    def streaming_events(self, tmout=None):
+        self._evstream = self._stream('v1/events', {},
+                                      self._on_event, self._on_events_end,
+                                      tmout=tmout)
 
-    def _t_streaming_events(self, q, tmout=None):
-        if tmout is not None:
-            _time.sleep(tmout)
+    def _on_event(self, msg):
+        if 'transaction' in msg:
+            self._transaction(msg['transaction'])
 
-        streamer = Streamer(q,
-                            environment=self._oenv,
-                            access_token=self.p.token,
-                            headers={'X-Accept-Datetime-Format': 'UNIX'})
+    def _on_events_end(self, error):
+        if self._evstream is None:
+            return  # stopped
 
-        streamer.events(ignore_heartbeat=False)
+        if error is not None:
+            self.put_notification(error)
+        else:
+            self.streaming_events()  # reconnect
 
     def candles(self, dataname, dtbegin, dtend, timeframe, compression,
                 candleFormat, includeFirst):
 
-        kwargs = locals().copy()
-        kwargs.pop('self')
-        kwargs['q'] = q = queue.Queue()
-        t = threading.Thread(target=self._t_candles, kwargs=kwargs)
-        t.daemon = True
-        t.start()
-        return q
-
-    def _t_candles(self, dataname, dtbegin, dtend, timeframe, compression,
-                   candleFormat, includeFirst, q):
+        q = TickQueue()
 
         granularity = self.get_granularity(timeframe, compression)
         if granularity is None:
             e = OandaTimeFrameError()
             q.put(e.error_response)
-            return
+            return q
 
-        dtkwargs = {}
+        params = dict(instrument=dataname, granularity=granularity,
+                      candleFormat=candleFormat)
         if dtbegin is not None:
-            dtkwargs['start'] = int((dtbegin - self._DTEPOCH).total_seconds())
+            params['start'] = int((dtbegin - self._DTEPOCH).total_seconds())
 
         if dtend is not None:
-            dtkwargs['end'] = int((dtend - self._DTEPOCH).total_seconds())
+            params['end'] = int((dtend - self._DTEPOCH).total_seconds())
 
-        try:
-            response = self.oapi.get_history(instrument=dataname,
-                                             granularity=granularity,
-                                             candleFormat=candleFormat,
-                                             **dtkwargs)
+        future = self.oapi.request_async('v1/candles', params=params)
+        future.add_done_callback(functools.partial(self._on_candles, q))
+        return q
 
-        except oandapy.OandaError as e:
-            q.put(e.error_response)
+    def _on_candles(self, q, future):
+        response = self.oapi.response(future)
+        if 'code' in response:  # error
+            q.put(response)
             q.put(None)
             return
 
@@ -389,22 +401,21 @@ class OandaStore(with_metaclass(MetaSingleton, object)):
         q.put({})  # end of transmission
 
     def streaming_prices(self, dataname, tmout=None):
-        q = queue.Queue()
-        kwargs = {'q': q, 'dataname': dataname, 'tmout': tmout}
-        t = threading.Thread(target=self._t_streaming_prices, kwargs=kwargs)
-        t.daemon = True
-        t.start()
+        q = TickQueue()
+        params = dict(accountId=self.p.account, instruments=dataname)
+        self._stream('v1/prices', params,
+                     functools.partial(self._on_price, q),
+                     functools.partial(self._on_prices_end, q),
+                     tmout=tmout)
         return q
 
-    def _t_streaming_prices(self, dataname, q, tmout):
-        if tmout is not None:
-            _time.sleep(tmout)
-
-        streamer = Streamer(q, environment=self._oenv,
-                            access_token=self.p.token,
-                            headers={'X-Accept-Datetime-Format': 'UNIX'})
+    def _on_price(self, q, msg):
+        if 'tick' in msg:
+            q.put(msg['tick'])
 
-        streamer.rates(self.p.account, instruments=dataname)
+    def _on_prices_end(self, q, error):
+        # the data feed reconnects (and backfills) on stream errors
+        q.put(error or OandaStreamError().error_response)
 
     def get_cash(self):
         return self._cash
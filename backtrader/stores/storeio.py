@@ -0,0 +1,980 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016, 2017 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import collections
+import functools
+import itertools
+import threading
+import time as _time
+from datetime import timedelta
+
+from backtrader.feed import livewakeup
+from backtrader.latency import clock
+from backtrader.utils.py3 import ConnectionError, TimeoutError, queue
+
+try:
+    from urllib.parse import urlencode, urlsplit
+except ImportError:  # Python 2: only TickQueue is available
+    urlencode = urlsplit = None
+
+# asyncio, ssl, concurrent.futures, json, gzip and pickle are imported when
+# first needed (by the store loop, a request, a recording ...) and not when
+# importing backtrader
+
+
+__all__ = ['TickQueue', 'runall', 'StoreLoop', 'HTTPPool', 'HTTPResponse',
+           'StoreRecorder', 'StoreRecording', 'ReplayEnd', 'HTTPReplayPool']
+
+
+class TickQueue(object):
+    '''Drop-in replacement for ``queue.Queue`` for the handoff of messages
+    from the thread doing the I/O of a store to the single consumer (a data
+    feed, the broker) of the messages
+
+    ``put`` is an append to a ``deque`` (atomic) and takes no lock. The
+    consumer is only signaled (over an ``Event``) if it is already waiting.
+    ``put`` also signals ``livewakeup`` to wake up a waiting ``Cerebro``
+
+    The time at which each item was put is kept and ``lastts`` holds that of
+    the last item taken (see ``LatencyTracer``)
+    '''
+    def __init__(self):
+        self._q = collections.deque()
+        self._evt = threading.Event()
+        self._waiting = False
+        self.lastts = None
+
+    def put(self, item, block=True, timeout=None):
+        self._q.append((clock(), item))
+        if self._waiting:
+            self._evt.set()
+
+        livewakeup.set()
+
+    def put_nowait(self, item):
+        self.put(item)
+
+    def get(self, block=True, timeout=None):
+        try:
+            self.lastts, item = self._q.popleft()
+            return item
+        except IndexError:
+            if not block:
+                raise queue.Empty
+
+        if timeout is not None:
+            endtime = _time.time() + timeout
+
+        self._evt.clear()
+        self._waiting = True  # put will signal from now on
+        try:
+            while True:
+                try:  # check again: put may have missed the flag
+                    self.lastts, item = self._q.popleft()
+                    return item
+                except IndexError:
+                    pass
+
+                if timeout is not None:
+                    timeout = endtime - _time.time()
+                    if timeout <= 0.0:
+                        raise queue.Empty
+
+                self._evt.wait(timeout)
+                self._evt.clear()
+        finally:
+            self._waiting = False
+
+    def get_nowait(self):
+        return self.get(block=False)
+
+    def qsize(self):
+        return len(self._q)
+
+    def empty(self):
+        return not self._q
+
+
+class StoreLoop(object):
+    '''``asyncio`` event loop shared by all stores, which runs in a single
+    background (daemon) thread. Use ``StoreLoop.instance()`` to get it
+
+    It also carries an executor with a bounded number of threads
+    (``workers``) for blocking calls which cannot run in the loop
+    '''
+    workers = 8
+
+    _instance = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def instance(cls):
+        '''Returns the shared loop, starting it if needed'''
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = cls()
+
+            return cls._instance
+
+    def __init__(self):
+        try:
+            import asyncio
+            from concurrent import futures
+        except ImportError:
+            raise ImportError('asyncio is needed to run the store loop')
+
+        self.loop = asyncio.new_event_loop()
+        self.executor = futures.ThreadPoolExecutor(max_workers=self.workers)
+        self.loop.set_default_executor(self.executor)
+
+        started = threading.Event()
+        self.thread = t = threading.Thread(target=self._t_loop,
+                                           args=(started,))
+        t.daemon = True
+        t.start()
+        started.wait()
+
+    def _t_loop(self, started):
+        import asyncio
+        asyncio.set_event_loop(self.loop)
+        self.loop.call_soon(started.set)
+        self.loop.run_forever()
+
+    def call(self, func, *args):
+        '''Schedules ``func(*args)`` in the loop. Can be called from any
+        thread'''
+        self.loop.call_soon_threadsafe(func, *args)
+
+
+def runall(funcs, workers=8):
+    '''Runs the callables in ``funcs`` in at most ``workers`` threads and
+    returns (the list of results) once all have been run. No event loop is
+    needed: a plain executor is used and a thread per callable if
+    ``concurrent.futures`` is not available'''
+    try:
+        from concurrent import futures
+    except ImportError:
+        results = [None] * len(funcs)
+
+        def run(i, func):
+            results[i] = func()
+
+        ts = [threading.Thread(target=run, args=(i, func))
+              for i, func in enumerate(funcs)]
+        for t in ts:
+            t.start()
+
+        for t in ts:
+            t.join()
+
+        return results
+
+    with futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        fs = [executor.submit(func) for func in funcs]
+        return [f.result() for f in fs]
+
+
+class HTTPResponse(object):
+    '''Response to a request of ``HTTPPool``'''
+    def __init__(self, status, headers, body):
+        self.status = status  # int
+        self.headers = headers  # dict with lowercase names
+        self.body = body  # bytes
+
+    def json(self):
+        import json
+        return json.loads(self.body.decode('utf-8'))
+
+
+def _httprequest(method, url, params, data, headers):
+    # Returns the key (scheme, host, port) and the bytes of a request
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    port = parts.port or (443 if scheme == 'https' else 80)
+
+    target = parts.path or '/'
+    query = parts.query
+    if params:
+        query = '&'.join(x for x in (query, urlencode(params)) if x)
+    if query:
+        target += '?' + query
+
+    hdrs = collections.OrderedDict()
+    hdrs['Host'] = parts.netloc.rpartition('@')[2]
+    hdrs['Accept-Encoding'] = 'identity'  # bodies are not decoded
+
+    body = b''
+    if data is not None:
+        if isinstance(data, dict):
+            hdrs['Content-Type'] = 'application/x-www-form-urlencoded'
+            data = urlencode(data)
+        if not isinstance(data, (bytes, bytearray)):
+            data = data.encode('utf-8')
+        body = bytes(data)
+
+    if body or method in ('POST', 'PUT', 'PATCH'):
+        hdrs['Content-Length'] = str(len(body))
+
+    for name, value in (headers or {}).items():
+        for hname in list(hdrs):  # the user may override the defaults
+            if hname.lower() == name.lower():
+                del hdrs[hname]
+        hdrs[name] = value
+
+    lines = ['%s %s HTTP/1.1' % (method, target)]
+    lines.extend('%s: %s' % (name, value) for name, value in hdrs.items())
+    request = ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + body
+    return (scheme, parts.hostname, port), request
+
+
+class _Exchange(object):
+    # A request and the (parsed) response to it. Only touched from the loop
+    stream = False
+
+    def __init__(self, method, url, params=None, data=None, headers=None):
+        self.method = method = method.upper()
+        self.key, self.request = _httprequest(method, url, params, data,
+                                              headers)
+        self.status = None
+        self.headers = None
+        self.body = bytearray()
+
+        self.conn = None  # connection carrying the exchange
+        self.task = None  # task opening a connection
+        self.handle = None  # timer: timeout or delayed start
+        self.reused = False  # sent over a kept alive connection
+        self.done = False
+
+    def ondata(self, data):
+        self.body.extend(data)
+
+    def finish(self, exc=None):
+        if self.done:
+            return False
+
+        self.done = True
+        if self.handle is not None:
+            self.handle.cancel()
+
+        self._finish(exc)
+        return True
+
+    def _finish(self, exc):
+        pass
+
+
+class _Request(_Exchange):
+    def __init__(self, future, *args, **kwargs):
+        super(_Request, self).__init__(*args, **kwargs)
+        self.future = future
+
+    def _finish(self, exc):
+        if exc is not None:
+            self.future.set_exception(exc)
+        else:
+            self.future.set_result(
+                HTTPResponse(self.status, self.headers, bytes(self.body)))
+
+
+class _Stream(_Exchange):
+    stream = True
+
+    def __init__(self, pool, online, onclose, *args, **kwargs):
+        super(_Stream, self).__init__('GET', *args, **kwargs)
+        self.pool = pool
+        self.online = online
+        self.onclose = onclose
+        self._pending = bytearray()
+
+    def close(self):
+        '''Closes the stream. Can be called from any thread'''
+        self.pool.sl.call(self._close)
+
+    def _close(self):
+        if self.finish():
+            self.pool._abort(self)
+
+    def ondata(self, data):
+        if self.status != 200:  # keep the error description
+            self.body.extend(data)
+            return
+
+        pending = self._pending
+        pending.extend(data)
+        end = pending.rfind(b'\n')
+        if end < 0:
+            return  # no complete line yet
+
+        lines = bytes(pending[:end]).split(b'\n')
+        del pending[:end + 1]
+        for line in lines:
+            line = line.strip()
+            if line and not self.done:  # a callback may close the stream
+                self.online(line)
+
+    def _finish(self, exc):
+        if self.onclose is not None:
+            self.onclose(self.status, bytes(self.body), exc)
+
+
+class _Protocol(object):
+    # The interface of asyncio.Protocol, which the loop calls. It is not
+    # subclassed to avoid importing asyncio with the module
+    def connection_made(self, transport):
+        pass
+
+    def connection_lost(self, exc):
+        pass
+
+    def pause_writing(self):
+        pass
+
+    def resume_writing(self):
+        pass
+
+    def data_received(self, data):
+        pass
+
+    def eof_received(self):
+        pass
+
+
+class _HTTPConnection(_Protocol):
+    # A connection to a host carrying one exchange at a time. The response is
+    # parsed as it arrives, which allows delivering the lines of streams
+
+    def __init__(self, pool, key):
+        self.pool, self.key = pool, key
+        self.transport = None
+        self.ex = None
+        self._buf = bytearray()
+        self._state = None
+        self._left = 0
+        self._keepalive = False
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def connection_lost(self, exc):
+        self.transport = None
+        self.pool._lost(self)
+
+        ex, self.ex = self.ex, None
+        if ex is None:
+            return
+
+        if self._state == 'close':  # the body ends with the connection
+            ex.finish()
+            return
+
+        if exc is None:
+            exc = ConnectionError('Connection closed by the server')
+
+        self.pool._failed(ex, exc)
+
+    def send(self, ex):
+        self.ex, ex.conn = ex, self
+        self._state = 'head'
+        self._buf = bytearray()
+        self.transport.write(ex.request)
+
+    def data_received(self, data):
+        if self.ex is None:
+            return  # nothing was asked for
+
+        self._buf.extend(data)
+        try:
+            self._parse()
+        except Exception as e:  # malformed response or failed callback
+            ex, self.ex = self.ex, None
+            self.transport.abort()
+            if ex is not None:
+                ex.finish(e)
+
+    def _parse(self):
+        buf = self._buf
+        while self.ex is not None:
+            state = self._state
+            if state == 'head':
+                end = buf.find(b'\r\n\r\n')
+                if end < 0:
+                    return
+                head = bytes(buf[:end]).decode('latin-1')
+                del buf[:end + 4]
+                self._head(head)
+
+            elif state == 'size':  # chunked transfer
+                end = buf.find(b'\r\n')
+                if end < 0:
+                    return
+                size = int(bytes(buf[:end]).split(b';')[0], 16)
+                del buf[:end + 2]
+                self._state, self._left = ('data', size) if size else \
+                    ('trailer', 0)
+
+            elif state in ('data', 'body'):
+                if not buf:
+                    return
+                n = min(len(buf), self._left)
+                data = bytes(buf[:n])
+                del buf[:n]
+                self._left -= n
+                if not self._left:
+                    self._state = 'crlf' if state == 'data' else None
+
+                self.ex.ondata(data)
+                if self._state is None and self.ex is not None:
+                    self._done()
+
+            elif state == 'crlf':  # end of a chunk
+                if len(buf) < 2:
+                    return
+                del buf[:2]
+                self._state = 'size'
+
+            elif state == 'trailer':
+                end = buf.find(b'\r\n')
+                if end < 0:
+                    return
+                del buf[:end + 2]
+                if not end:  # empty line: end of the response
+                    self._done()
+
+            else:  # 'close': the body is whatever arrives
+                if buf:
+                    data = bytes(buf)
+                    del buf[:]
+                    self.ex.ondata(data)
+                return
+
+    def _head(self, head):
+        lines = head.split('\r\n')
+        version, status = lines[0].split(None, 2)[:2]
+        status = int(status)
+        if 100 <= status < 200:
+            return  # informational, the actual response follows
+
+        headers = dict()
+        for line in lines[1:]:
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        ex = self.ex
+        ex.status, ex.headers = status, headers
+
+        self._keepalive = (version.upper() == 'HTTP/1.1' and
+                           headers.get('connection', '').lower() != 'close')
+
+        length = headers.get('content-length')
+        if ex.method == 'HEAD' or status in (204, 304):
+            self._done()
+        elif 'chunked' in headers.get('transfer-encoding', '').lower():
+            self._state = 'size'
+        elif length is not None:
+            self._left = int(length)
+            self._state = 'body'
+            if not self._left:
+                self._done()
+        else:
+            self._state = 'close'
+            self._keepalive = False
+
+    def _done(self):
+        ex, self.ex = self.ex, None
+        self._state = None
+        if self._keepalive:
+            self.pool._release(self)
+        else:
+            self.transport.close()
+
+        ex.finish()
+
+
+class HTTPPool(object):
+    '''HTTP/1.1 client running on the ``StoreLoop``, which keeps the
+    connections to the hosts alive and reuses them for the next requests
+
+    The methods can be called from any thread. Bodies are not decoded (no
+    compression is requested)
+
+    Params:
+
+      - ``timeout`` (default: ``None``): seconds for a request to be
+        answered, connecting included. ``None`` waits forever. It does not
+        apply to streams
+
+      - ``maxidle`` (default: ``4``): idle connections kept per host
+
+      - ``sslcontext`` (default: ``None``): ``ssl.SSLContext`` for
+        ``https``. The default context is used if ``None``
+
+      - ``recorder`` (default: ``None``): a ``StoreRecorder`` which gets
+        the requests (not the headers, which may carry credentials), the
+        responses and the lines of the streams, to be replayed with a
+        ``HTTPReplayPool``
+    '''
+    def __init__(self, timeout=None, maxidle=4, sslcontext=None,
+                 recorder=None):
+        self.sl = StoreLoop.instance()
+        self.timeout = timeout
+        self.maxidle = maxidle
+        self.sslcontext = sslcontext
+        self.recorder = recorder
+        self._keys = itertools.count()
+
+        self.connections = 0  # connections opened so far
+        self._idle = collections.defaultdict(list)  # only used in the loop
+
+    def request(self, method, url, params=None, data=None, headers=None):
+        '''Returns a ``concurrent.futures.Future`` which delivers the
+        ``HTTPResponse`` or the exception raised
+
+          - ``params``: dict added to the query string
+          - ``data``: body. A dict is sent url-encoded
+          - ``headers``: dict of extra headers
+        '''
+        from concurrent import futures
+        future = futures.Future()
+        future.set_running_or_notify_cancel()  # cannot be cancelled
+        if self.recorder is not None:
+            key = self._record('request', (method, url, params, data))
+            future.add_done_callback(
+                functools.partial(self._record_response, key))
+
+        ex = _Request(future, method, url, params, data, headers)
+        self.sl.call(self._submit, ex)
+        return future
+
+    def stream(self, url, online, onclose=None, params=None, headers=None,
+               delay=None):
+        '''Opens a streaming ``GET`` request. Each non-empty line of the body
+        is passed (as ``bytes``) to ``online`` in the loop thread. At the end
+        ``onclose(status, body, exc)`` is called: ``body`` has content if
+        ``status`` is not ``200`` and ``exc`` is the exception which broke
+        the connection (or ``None``)
+
+        The request is sent after ``delay`` seconds if not ``None``
+
+        Returns an object with a ``close`` method to end the stream
+        '''
+        if self.recorder is not None:
+            key = self._record('stream', (url, params))
+            online = functools.partial(self._record_line, key, online)
+            onclose = functools.partial(self._record_close, key, onclose)
+
+        ex = _Stream(self, online, onclose, url, params, headers=headers)
+        self.sl.call(self._submit, ex, delay)
+        return ex
+
+    def _record(self, kind, args):
+        key = next(self._keys)
+        self.recorder.record(kind, key, args)
+        return key
+
+    def _record_response(self, key, future):
+        try:
+            r = future.result()
+        except Exception as e:
+            self.recorder.record('error', key, repr(e))
+        else:
+            self.recorder.record('response', key,
+                                 (r.status, r.headers, r.body))
+
+    def _record_line(self, key, online, line):
+        self.recorder.record('line', key, line)
+        online(line)
+
+    def _record_close(self, key, onclose, status, body, exc):
+        self.recorder.record('close', key, (status, bytes(body),
+                                            exc and repr(exc)))
+        if onclose is not None:
+            onclose(status, body, exc)
+
+    def close(self):
+        '''Closes the idle connections'''
+        self.sl.call(self._close)
+
+    def _close(self):
+        for idle in self._idle.values():
+            while idle:
+                idle.pop().transport.close()
+
+    def _submit(self, ex, delay=None):
+        loop = self.sl.loop
+        if delay:
+            ex.handle = loop.call_later(delay, self._start, ex)
+            return
+
+        if self.timeout is not None and not ex.stream:
+            ex.handle = loop.call_later(self.timeout, self._timeout, ex)
+
+        self._start(ex)
+
+    def _start(self, ex):
+        if ex.done:
+            return
+
+        idle = self._idle[ex.key]
+        while idle:
+            conn = idle.pop()
+            if conn.transport is not None and \
+                    not conn.transport.is_closing():
+                ex.reused = True
+                conn.send(ex)
+                return
+
+        scheme, host, port = ex.key
+        kwargs = dict()
+        if scheme == 'https':
+            if self.sslcontext is None:
+                import ssl
+                self.sslcontext = ssl.create_default_context()
+
+            kwargs['ssl'] = self.sslcontext
+            kwargs['server_hostname'] = host
+
+        self.connections += 1
+        conn = _HTTPConnection(self, ex.key)
+        loop = self.sl.loop
+        ex.task = loop.create_task(
+            loop.create_connection(lambda: conn, host, port, **kwargs))
+        ex.task.add_done_callback(functools.partial(self._connected, conn, ex))
+
+    def _connected(self, conn, ex, task):
+        ex.task = None
+        if task.cancelled():
+            return
+
+        exc = task.exception()
+        if exc is not None:
+            ex.finish(exc)
+        elif ex.done:  # timed out or closed in between
+            conn.transport.close()
+        else:
+            conn.send(ex)
+
+    def _timeout(self, ex):
+        ex.handle = None
+        if ex.finish(TimeoutError('No response in %s seconds' % self.timeout)):
+            self._abort(ex)
+
+    def _abort(self, ex):
+        if ex.task is not None:
+            ex.task.cancel()
+
+        conn = ex.conn
+        if conn is not None and conn.ex is ex:
+            conn.ex = None
+            if conn.transport is not None:
+                conn.transport.abort()
+
+    def _failed(self, ex, exc):
+        # A kept alive connection may have been closed by the server before
+        # the request arrived. Idempotent requests are sent once again
+        if ex.reused and ex.status is None and \
+                ex.method in ('GET', 'HEAD', 'DELETE'):
+            ex.reused = False
+            ex.conn = None
+            self._start(ex)
+        else:
+            ex.finish(exc)
+
+    def _release(self, conn):
+        idle = self._idle[conn.key]
+        if len(idle) < self.maxidle:
+            idle.append(conn)
+        else:
+            conn.transport.close()
+
+    def _lost(self, conn):
+        idle = self._idle.get(conn.key, ())
+        if conn in idle:
+            idle.remove(conn)
+
+
+def _tojson(obj):
+    # bytes (bodies, lines of streams) go as base64 in the json of a record
+    if isinstance(obj, (bytes, bytearray)):
+        import base64
+        return {'__bytes__': base64.b64encode(bytes(obj)).decode('ascii')}
+
+    raise TypeError('Cannot record %r' % (obj,))
+
+
+def _fromjson(obj):
+    # reverts _tojson and makes tuples (as recorded) out of the lists
+    if isinstance(obj, list):
+        return tuple(_fromjson(x) for x in obj)
+
+    if isinstance(obj, dict):
+        if len(obj) == 1 and '__bytes__' in obj:
+            import base64
+            return base64.b64decode(obj['__bytes__'].encode('ascii'))
+
+        return dict((k, _fromjson(v)) for k, v in obj.items())
+
+    return obj
+
+
+class StoreRecorder(object):
+    '''Writes the messages a store exchanges with a service, stamped with the
+    time elapsed since the creation of the recorder, to ``filename``
+    (compressed with ``gzip`` if it ends with ``.gz``)
+
+    The records are ``(time, kind, key, payload)`` tuples, written as json
+    lines (with ``bytes`` in base64) after a header: a recording holds only
+    data and nothing in it is executed when it is loaded. ``record`` can be
+    called from any thread. The file is complete once ``close`` has been
+    called
+    '''
+    version = 2
+
+    def __init__(self, filename):
+        import gzip
+        opener = gzip.open if filename.endswith('.gz') else open
+        self._f = opener(filename, 'wb')
+        self._lock = threading.Lock()
+        self._t0 = clock()
+        self._dump(dict(version=self.version, wallclock=_time.time()))
+
+    def _dump(self, obj):
+        import json
+        line = json.dumps(obj, default=_tojson, separators=(',', ':'))
+        self._f.write(line.encode('utf-8') + b'\n')
+
+    def record(self, kind, key, payload):
+        with self._lock:
+            if self._f is not None:
+                self._dump((clock() - self._t0, kind, key, payload))
+
+    def close(self):
+        with self._lock:
+            if self._f is not None:
+                self._f.close()
+                self._f = None
+
+
+class StoreRecording(object):
+    '''The contents of a file written by ``StoreRecorder``: ``header`` (a
+    dict with the ``wallclock`` at which the recording started) and
+    ``records``. ``ValueError`` is raised if the file is not a recording
+    (of this version)'''
+    def __init__(self, filename):
+        import gzip
+        import json
+        opener = gzip.open if filename.endswith('.gz') else open
+        with opener(filename, 'rb') as f:
+            lines = iter(f)
+            self.header = header = json.loads(next(lines, b'{}')
+                                              .decode('utf-8'))
+            if not isinstance(header, dict) or \
+                    header.get('version') != StoreRecorder.version:
+                raise ValueError('Not a recording of version %d: %s' %
+                                 (StoreRecorder.version, filename))
+
+            self.records = [_fromjson(json.loads(line.decode('utf-8')))
+                            for line in lines if line.strip()]
+
+
+class ReplayEnd(EOFError):
+    '''Raised (or passed) by ``HTTPReplayPool`` for requests and streams
+    which are not in the recording'''
+
+
+class _Recorded(object):
+    # A request (or stream) of a recording and the answer to it
+    def __init__(self, t, kind, args):
+        self.t = t
+        self.kind = kind
+        self.args = args
+        self.lines = collections.deque()  # (t, line)
+        self.end = None  # (t, kind, payload)
+
+
+class _Replay(object):
+    # A stream being replayed
+    def __init__(self, pool, rec, online, onclose):
+        self.pool = pool
+        self.rec = rec
+        self.online = online
+        self.onclose = onclose
+        self.done = False
+
+    def close(self):
+        '''Closes the stream. Can be called from any thread'''
+        self.pool.sl.call(self._close)
+
+    def _close(self):
+        if not self.done:
+            self.done = True
+            if self.onclose is not None:
+                self.onclose(200, b'', None)
+
+    def _next(self):
+        if self.done:
+            return
+
+        pool, rec = self.pool, self.rec
+        if rec.lines:
+            t, line = rec.lines.popleft()
+            pool._played = max(pool._played, t)
+            self.online(line)
+            self._schedule()
+            return
+
+        self.done = True
+        if rec.end is None:  # the recording ended with the stream open
+            status, body, exc = 200, b'', ReplayEnd('End of the recording')
+        else:
+            t, kind, (status, body, exc) = rec.end
+            pool._played = max(pool._played, t)
+            if exc is not None:
+                exc = ConnectionError(exc)
+
+        if self.onclose is not None:
+            self.onclose(status, body, exc)
+
+    def _schedule(self):
+        rec = self.rec
+        if rec.lines:
+            t = rec.lines[0][0]
+        elif rec.end is not None:
+            t = rec.end[0]
+        else:
+            t = 0.0  # right away
+
+        self.pool._later(t, self._next)
+
+
+class HTTPReplayPool(object):
+    '''Stand-in for ``HTTPPool`` which answers the requests and streams with
+    those recorded (see the ``recorder`` of ``HTTPPool``) in ``filename``
+
+    The answers are delivered (in the ``StoreLoop``) at the time they were
+    recorded, measured from the creation of the pool, with the pace scaled
+    by ``speed`` (``2.0`` replays twice as fast). If ``speed`` is ``None``
+    they are delivered as fast as possible
+
+    Requests are matched to the recorded ones in order, first by method,
+    url and parameters and else by method and url. Requests which find no
+    match (the recording is over) fail with ``ReplayEnd`` and streams are
+    closed with it
+
+    ``timeoffset`` tells how far the recorded clock is from the wall clock
+    at the point of the replay, to let time based logic (resampling) see
+    the time of the recording
+    '''
+    def __init__(self, filename, speed=1.0):
+        self.sl = StoreLoop.instance()
+        self.speed = speed
+
+        recording = StoreRecording(filename)
+        self._wallclock = recording.header['wallclock']
+        self._recs = recs = list()
+        keys = dict()
+        for t, kind, key, payload in recording.records:
+            if kind in ('request', 'stream'):
+                keys[key] = rec = _Recorded(t, kind, payload)
+                recs.append(rec)
+            elif kind == 'line':
+                keys[key].lines.append((t, payload))
+            else:
+                keys[key].end = (t, kind, payload)
+
+        self._lock = threading.Lock()
+        self._t0 = clock()
+        self._played = 0.0  # recorded time of the last answer delivered
+
+    def timeoffset(self):
+        '''Returns the ``timedelta`` to add to the current time to get the
+        time of the recording'''
+        if self.speed:
+            played = (clock() - self._t0) * self.speed
+        else:
+            played = self._played
+
+        return timedelta(
+            seconds=self._wallclock + played - _time.time())
+
+    def _match(self, kind, args):
+        with self._lock:
+            recs = [x for x in self._recs if x.kind == kind]
+            rec = next((x for x in recs if x.args == args), None)
+            if rec is None:
+                n = 2 if kind == 'request' else 1  # method, url / url
+                rec = next((x for x in recs if x.args[:n] == args[:n]),
+                           None)
+
+            if rec is not None:
+                self._recs.remove(rec)
+
+            return rec
+
+    def _later(self, t, func, *args):
+        # Calls func(*args) in the loop at recorded time t
+        delay = 0.0
+        if self.speed:
+            delay = self._t0 + t / self.speed - clock()
+
+        loop = self.sl.loop
+        if delay > 0.0:
+            loop.call_later(delay, func, *args)
+        else:
+            loop.call_soon(func, *args)
+
+    def request(self, method, url, params=None, data=None, headers=None):
+        '''See ``HTTPPool.request``'''
+        from concurrent import futures
+        future = futures.Future()
+        future.set_running_or_notify_cancel()  # cannot be cancelled
+        rec = self._match('request', (method.upper(), url, params, data))
+        if rec is None or rec.end is None:
+            future.set_exception(ReplayEnd('Not in the recording: %s %s' %
+                                           (method, url)))
+            return future
+
+        self.sl.call(self._later, rec.end[0], self._answer, future, rec.end)
+        return future
+
+    def _answer(self, future, end):
+        t, kind, payload = end
+        self._played = max(self._played, t)
+        if kind == 'error':
+            future.set_exception(ConnectionError(payload))
+        else:
+            future.set_result(HTTPResponse(*payload))
+
+    def stream(self, url, online, onclose=None, params=None, headers=None,
+               delay=None):
+        '''See ``HTTPPool.stream``. ``delay`` is ignored: the stream starts
+        when it started in the recording'''
+        rec = self._match('stream', (url, params))
+        if rec is None:  # closed right away with ReplayEnd
+            rec = _Recorded(self._played, 'stream', (url, params))
+
+        replay = _Replay(self, rec, online, onclose)
+        self.sl.call(replay._schedule)
+        return replay
+
+    def close(self):
+        pass
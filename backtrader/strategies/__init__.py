@@ -22,3 +22,4 @@ from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
 from .sma_crossover import *
+from .buspublisher import *
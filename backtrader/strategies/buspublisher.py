@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016, 2017 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+
+import backtrader as bt
+from backtrader.stores.busstore import BARLINES, BusHub
+
+
+__all__ = ['BusPublisher']
+
+
+class BusPublisher(bt.Strategy):
+    '''Publishes the bars of the datas and their status notifications over
+    a ``BusHub`` to strategies running in other processes, which receive
+    them with the ``BusData`` feeds of a ``BusStore``
+
+    This allows a single process to keep the connection to a data provider
+    (the feeds of a store) and many processes (and cores) to run strategies
+    on the data
+
+    The datas are published under their name (``name`` in ``adddata``) or
+    as ``dataN`` (``N`` being the index) if they have none. A bar is
+    published when the length of the data grows. The bar of a replayed data
+    changes until the next one starts: it is published then (the last one
+    when the strategy stops). Resampling and replaying are better left to
+    the subscribers
+
+    Params:
+
+      - ``address``, ``transport``, ``backlog``, ``maxbuffer``: see
+        ``BusHub``
+    '''
+    params = (
+        ('address', None),
+        ('transport', 'socket'),
+        ('backlog', 0),
+        ('maxbuffer', 1 << 24),
+    )
+
+    def start(self):
+        self.hub = BusHub(address=self.p.address, transport=self.p.transport,
+                          backlog=self.p.backlog, maxbuffer=self.p.maxbuffer)
+
+        self._chans = dict()
+        for i, data in enumerate(self.datas):
+            self._chans[data] = self.hub.addchannel(data._name or 'data%d' % i)
+
+        self._lens = [0] * len(self.datas)
+        self.hub.start()
+
+    def stop(self):
+        for i, data in enumerate(self.datas):
+            if data.replaying and len(data) > self._lens[i]:
+                self._publish(i, data, len(data))
+
+        for chan in self._chans.values():
+            self.hub.end(chan)
+
+        self.hub.stop()
+
+    def notify_data(self, data, status, *args, **kwargs):
+        self.hub.status(self._chans[data], status)
+        self.hub.flush()
+
+    def prenext(self):
+        self.next()
+
+    def next(self):
+        for i, data in enumerate(self.datas):
+            dlen = len(data)
+            if not data.replaying:
+                if dlen > self._lens[i]:
+                    self._publish(i, data, dlen)
+
+            elif dlen - 1 > self._lens[i]:  # the previous bar is complete
+                self._publish(i, data, dlen - 1, ago=-1)
+
+        self.hub.flush()
+
+    def _publish(self, i, data, seq, ago=0):
+        self._lens[i] = seq
+        self.hub.bar(self._chans[data], seq,
+                     [getattr(data.lines, x)[ago] for x in BARLINES])
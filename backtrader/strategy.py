@@ -32,8 +32,10 @@ from .utils.py3 import (filter, keys, integer_types, iteritems, itervalues,
                         map, MAXINT, string_types, with_metaclass)
 
 import backtrader as bt
+from .linebuffer import LineActions
 from .lineiterator import LineIterator, StrategyBase
 from .lineroot import LineSingle
+from .lineseries import Lines, LineSeries
 from .metabase import ItemCollection, findowner
 from .trade import Trade
 from .utils import OrderedDict, AutoOrderedDict, AutoDictList
@@ -92,6 +94,16 @@ class MetaStrategy(StrategyBase.__class__):
 
         _obj._tradehistoryon = False
 
+        # registry of indicators for the structural deduplication, which
+        # would interfere with plotting memory savings (negative exactbars)
+        cerebro = _obj.cerebro
+        if cerebro.p.dedup and cerebro._exactbars >= 0:
+            _obj._dedupreg = dict()
+        else:
+            _obj._dedupreg = None
+
+        _obj._dedupcount = 0
+
         return _obj, args, kwargs
 
     def dopostinit(cls, _obj, *args, **kwargs):
@@ -368,6 +380,121 @@ class Strategy(with_metaclass(MetaStrategy, StrategyBase)):
     def _settz(self, tz):
         self.lines.datetime._settz(tz)
 
+    def _fuseops(self):
+        '''
+        Lets chains of line operations (``(a - b) / c * 2``) be calculated in
+        a single pass by the last operation. Only operations created inside a
+        ``FuseOps`` block can be calculated inline. Such an operation is
+        calculated inline by another if that one is its only user (no other
+        operations, indicators, bindings or attributes of the objects in the
+        strategy hold it) and both have the same owner and data feed as clock.
+
+        Returns the number of operations which are calculated inline
+        '''
+        objs = []
+        seen = set()
+        stack = [self]
+        while stack:
+            obj = stack.pop()
+            if id(obj) in seen:
+                continue
+
+            seen.add(id(obj))
+            objs.append(obj)
+            for lineiterators in getattr(obj, '_lineiterators', {}).values():
+                stack.extend(lineiterators)
+
+
+        # Find who holds a reference to each operation
+        holders = collections.defaultdict(set)
+        for obj in objs:
+            values = [v for k, v in obj.__dict__.items()
+                      if k not in ('_lineiterators', '_owner')]
+            vseen = set()
+            while values:
+                val = values.pop()
+                if id(val) in vseen:
+                    continue
+
+                vseen.add(id(val))
+                if isinstance(val, LineActions):
+                    if val._fusable and val is not obj:  # lines = [self]
+                        holders[id(val)].add(id(obj))
+                elif isinstance(val, (list, tuple, set, frozenset)):
+                    values.extend(val)
+                elif isinstance(val, dict):
+                    values.extend(val.values())
+                elif isinstance(val, Lines):
+                    values.extend(val.lines)
+                elif isinstance(val, LineSeries) and id(val) not in seen:
+                    values.append(val.lines)  # LineSeriesStub for example
+
+        # the data feed which is the clock of an object
+        clkmap = dict()
+        for data in self.datas:
+            clkmap[id(data)] = data
+            for line in data.lines:
+                clkmap[id(line)] = data
+
+        owners = dict()
+        for obj in objs:
+            if isinstance(obj, LineIterator) and obj is not self:
+                for line in obj.lines:
+                    owners[id(line)] = obj
+
+        def getclock(obj):
+            cseen = set()
+            while obj is not None and id(obj) not in clkmap:
+                if id(obj) in cseen:
+                    return None
+
+                cseen.add(id(obj))
+                obj = owners.get(id(obj), obj)
+                if isinstance(obj, LineSeries) and not hasattr(obj, '_clock'):
+                    obj = obj.lines[0]  # LineSeriesStub
+                else:
+                    obj = getattr(obj, '_clock', None)
+
+            return clkmap.get(id(obj))
+
+        # operation -> the operation which calculates it inline
+        inline = dict()
+        for obj in objs:
+            if not isinstance(obj, LineActions) or not obj._fusable:
+                continue
+
+            clock = getclock(obj)
+            if clock is None:
+                continue
+
+            for arg in obj._fuseargs():
+                if id(arg) not in seen or not arg._fusable or arg.bindings:
+                    continue
+
+                if holders[id(arg)] != set([id(obj)]):
+                    continue
+
+                if arg._owner is obj._owner and getclock(arg) is clock:
+                    inline[id(arg)] = obj
+
+        # the operations not calculated inline calculate the others
+        fusings = dict()
+        for opid, obj in inline.items():
+            while id(obj) in inline:
+                obj = inline[id(obj)]
+
+            fusings.setdefault(id(obj), (obj, set()))[1].add(opid)
+
+        for obj, fused in fusings.values():
+            obj._fuse(fused)
+
+        for obj in objs:
+            if isinstance(obj, LineIterator):
+                inds = obj._lineiterators[LineIterator.IndType]
+                inds[:] = [x for x in inds if id(x) not in inline]
+
+        return len(inline)
+
     def _start(self):
         self._periodset()
 
@@ -737,6 +864,41 @@ class Strategy(with_metaclass(MetaStrategy, StrategyBase)):
         '''Receives a notification from data'''
         pass
 
+    def getdedupcount(self):
+        '''
+        Returns the number of indicators which share the lines of a
+        structurally equal indicator (see the ``dedup`` parameter of
+        ``Cerebro``)
+        '''
+        return self._dedupcount
+
+    def getpanel(self):
+        '''
+        Returns the ``DataPanel`` with the aligned values of all datas or
+        ``None`` if not available (see the ``panel`` parameter of
+        ``Cerebro``)
+        '''
+        return self.env._panel
+
+    def panelrow(self, field='close', ago=0):
+        '''
+        Returns a view (no copy is made) of the values of ``field`` for all
+        datas (in the order of ``self.datas``) in the current bar or ``ago``
+        bars before. Datas which have not delivered a bar at the current
+        datetime have ``NaN``
+
+        ``ago`` is ``0`` or negative (as in ``data.close[-1]``). An
+        ``IndexError`` is raised if it points to a future bar or to one
+        before the first
+
+        Requires the ``panel`` parameter of ``Cerebro``
+        '''
+        idx = len(self) - 1 + ago
+        if ago > 0 or idx < 0:
+            raise IndexError('panelrow ago=%d out of range' % ago)
+
+        return self.env._panel.row(idx, field)
+
     def getdatanames(self):
         '''
         Returns a list of the existing data names
@@ -1327,6 +1489,94 @@ class Strategy(with_metaclass(MetaStrategy, StrategyBase)):
 
         return self.order_target_value(data=data, target=target, **kwargs)
 
+    def rebalance(self, targets, kind='percent', **kwargs):
+        '''
+        Place the orders to rebalance the positions of many datas in one go
+
+        ``targets`` is either a dict with datas (or data names) as keys and
+        the targets as values or a sequence with a target for each of the
+        datas of the strategy (``self.datas`` order, like with ``panelrow``).
+        ``NaN`` and ``None`` targets leave the position of a data untouched
+
+        ``kind`` tells the meaning of the targets, as in the
+        ``order_target_xxx`` family of methods:
+
+          - ``percent``: decimal percentage of the portfolio value
+          - ``value``: value of the position
+          - ``size``: size of the position
+
+        The portfolio value is taken only once for all targets, to make them
+        consistent with each other. The orders which reduce a position are
+        submitted before those which increase it, so that the broker checks
+        the cash for the latter after the release from the former
+
+        Any extra ``kwargs`` are passed to all ``buy``/``sell``/``close``
+        calls
+
+        It returns the list of generated orders (in submission order)
+        '''
+        if kind not in ('percent', 'value', 'size'):
+            raise ValueError('Unknown rebalance kind: %s' % kind)
+
+        if hasattr(targets, 'items'):
+            targets = targets.items()
+        else:
+            targets = zip(self.datas, targets)
+
+        broker = self.broker
+        if kind == 'percent':
+            pvalue = broker.getvalue()  # single snapshot
+
+        reduces, increases = list(), list()
+        for data, target in targets:
+            if target is None or target != target:  # None or NaN: skip
+                continue
+
+            if isinstance(data, string_types):
+                data = self.getdatabyname(data)
+
+            possize = broker.getposition(data).size
+            if not target:
+                if possize:
+                    reduces.append((self.close, data, possize, None))
+
+                continue
+
+            if kind == 'size':
+                current, price = possize, None
+                size = abs(target - possize)
+            else:
+                if kind == 'percent':
+                    target *= pvalue
+
+                current = broker.getvalue(datas=[data])
+                price = data.close[0]
+                size = broker.getcommissioninfo(data).getsize(
+                    price, abs(target - current))
+
+            if not size:
+                continue
+
+            # a move towards 0 releases cash
+            toward0 = (target > current) == (possize < 0)
+            if target > current:
+                order = (self.buy, data, size, price)
+            else:
+                order = (self.sell, data, size, price)
+
+            (reduces if possize and toward0 else increases).append(order)
+
+        orders = list()
+        for method, data, size, price in reduces + increases:
+            if price is not None:
+                order = method(data=data, size=size, price=price, **kwargs)
+            else:
+                order = method(data=data, size=size, **kwargs)
+
+            orders.append(order)
+
+        return orders
+
     def getposition(self, data=None, broker=None):
         '''
         Returns the current position for a given data in a given broker.
@@ -24,6 +24,7 @@ from __future__ import (absolute_import, division, print_function,
 # The modules below should/must define __all__ with the objects wishes
 # or prepend an "_" (underscore) to private classes/variables
 
+import array
 import sys
 
 import backtrader as bt
@@ -38,6 +39,11 @@ else:
     import numpy as np  # talib dependency
     import talib.abstract
 
+    try:
+        from talib import stream as _tastream  # ta-lib-python >= 0.4.11
+    except ImportError:
+        _tastream = None
+
     MA_Type = talib.MA_Type
 
     # Reverse TA_FUNC_FLAGS dict
@@ -84,14 +90,38 @@ else:
             elif cls.__name__ in cls._KNOWN_UNSTABLE:
                 _obj._lookback = 0
 
+            # the values of unstable functions depend on all previous ones:
+            # they cannot be calculated over windows of bars (chunkbars)
+            _obj._chunkable = bool(_obj._lookback)
+
             cerebro = bt.metabase.findowner(_obj, bt.Cerebro)
             tafuncinfo = _obj._tabstract.info
             _obj._tafunc = getattr(talib, tafuncinfo['name'], None)
+            _obj._tastream = None
+            if _obj.STREAM and _obj._lookback:  # unstable: full window
+                tastream = getattr(_tastream, tafuncinfo['name'], None)
+                # ta-lib-python >= 0.7 has stateful classes and no functions
+                if not isinstance(tastream, type):
+                    _obj._tastream = tastream
+
+            _obj._takwargs = _obj.p._getkwargs()
+
+            # Let the input lines know the widest window which will be asked
+            # for during next. 0 is the entire buffer
+            for data in _obj.datas:
+                line = data.lines[0]
+                tasize = getattr(line, '_tasize', None)
+                if tasize is None or (tasize and not _obj._lookback):
+                    line._tasize = _obj._lookback
+                elif tasize:
+                    line._tasize = max(tasize, _obj._lookback)
+
             return _obj, args, kwargs  # return the object and args
 
     class _TALibIndicator(with_metaclass(_MetaTALibIndicator, bt.Indicator)):
         CANDLEOVER = 1.02  # 2% over
         CANDLEREF = 1  # Open, High, Low, Close (0, 1, 2, 3)
+        STREAM = True  # next with talib.stream when possible (stable funcs)
 
         @classmethod
         def _subclass(cls, name):
@@ -184,42 +214,101 @@ else:
             newcls = type(str(name), (cls,), clsdict)  # subclass
             setattr(clsmodule, str(name), newcls)  # add to module
 
+        _tahist = None  # all input values, if the buffers are bounded
+
+        def qbuffer(self, savemem=0):
+            super(_TALibIndicator, self).qbuffer(savemem=savemem)
+            # The values of unstable functions depend on all previous ones,
+            # which the bounded buffers of the inputs do not keep
+            if not self._lookback:
+                self._tahist = [array.array(str('d')) for x in self.datas]
+                self._tahistlen = 0
+
+        def _histupdate(self):
+            # a replayed bar changes in place: the last value is replaced
+            dlen = len(self.datas[0])
+            grow = dlen > self._tahistlen
+            self._tahistlen = dlen
+            for hist, data in zip(self._tahist, self.datas):
+                if not grow:
+                    hist.pop()
+
+                hist.append(data.lines[0][0])
+
+        def prenext(self):
+            if self._tahist is not None:
+                self._histupdate()
+
         def oncestart(self, start, end):
             pass  # if not ... a call with a single value to once will happen
 
-        def once(self, start, end):
-            import array
+        # For once the buffers of the input lines are seen as numpy arrays
+        # without copying them. For next the widest window needed at the
+        # current position is kept in the lines from which it comes, to let
+        # all indicators working on the same line share a single conversion
+        @staticmethod
+        def _oncearray(line):
+            return np.frombuffer(line.array, dtype=np.float64)
+
+        @staticmethod
+        def _nextarray(line, size):
+            key = len(line)
+            cache = getattr(line, '_tanext', None)
+            if cache is None or cache[0] != key or len(cache[1]) < size:
+                wsize = min(line._tasize or len(line), len(line))
+                narray = np.array(line.get(size=max(size, wsize)))
+                cache = line._tanext = (key, narray)
+            else:
+                cache[1][-1] = line[0]  # a replayed bar changes in place
 
+            return cache[1][-size:]
+
+        def once(self, start, end):
             # prepare the data arrays - single shot
-            narrays = [np.array(x.lines[0].array) for x in self.datas]
+            narrays = [self._oncearray(x.lines[0]) for x in self.datas]
             # Execute
-            output = self._tafunc(*narrays, **self.p._getkwargs())
+            output = self._tafunc(*narrays, **self._takwargs)
 
             fsize = self.size()
             lsize = fsize - self._iscandle
             if lsize == 1:  # only 1 output, no tuple returned
-                self.lines[0].array = array.array(str('d'), output)
+                self.lines[0].array = _toarray(output)
 
                 if fsize > lsize:  # candle is present
                     candleref = narrays[self.CANDLEREF] * self.CANDLEOVER
                     output2 = candleref * (output / 100.0)
-                    self.lines[1].array = array.array(str('d'), output2)
+                    self.lines[1].array = _toarray(output2)
 
             else:
                 for i, o in enumerate(output):
-                    self.lines[i].array = array.array(str('d'), o)
+                    self.lines[i].array = _toarray(o)
+
+            del narrays  # release the buffers of the inputs, which can change
 
         def next(self):
             # prepare the data arrays - single shot
-            size = self._lookback or len(self)
-            narrays = [np.array(x.lines[0].get(size=size)) for x in self.datas]
+            if self._tahist is not None:
+                self._histupdate()
+                narrays = [np.array(x) for x in self._tahist]
+            else:
+                size = self._lookback or len(self)
+                narrays = [self._nextarray(x.lines[0], size)
+                           for x in self.datas]
 
-            out = self._tafunc(*narrays, **self.p._getkwargs())
+            if self._tastream is not None:
+                # only the last value is calculated and returned
+                out = self._tastream(*narrays, **self._takwargs)
+            else:
+                out = self._tafunc(*narrays, **self._takwargs)
+                if isinstance(out, tuple):
+                    out = tuple(o[-1] for o in out)
+                else:
+                    out = out[-1]
 
             fsize = self.size()
             lsize = fsize - self._iscandle
             if lsize == 1:  # only 1 output, no tuple returned
-                self.lines[0][0] = o = out[-1]
+                self.lines[0][0] = o = out
 
                 if fsize > lsize:  # candle is present
                     candleref = narrays[self.CANDLEREF][-1] * self.CANDLEOVER
@@ -228,7 +317,12 @@ else:
 
             else:
                 for i, o in enumerate(out):
-                    self.lines[i][0] = o[-1]
+                    self.lines[i][0] = o
+
+    def _toarray(output):
+        # a single copy of the memory, rather than going element by element
+        output = np.asarray(output, dtype=np.float64)
+        return array.array(str('d'), output.tobytes())
 
     # When importing the module do an automatic declaration of thed
     tafunctions = talib.get_functions()
@@ -21,6 +21,7 @@
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
+import importlib
 import itertools
 import sys
 
@@ -55,7 +56,7 @@ if PY2:
 
     from io import StringIO
 
-    from urllib2 import urlopen, ProxyHandler, build_opener, install_opener
+    _urlrequest = 'urllib2'
     from urllib import quote as urlquote
 
     def iterkeys(d): return d.iterkeys()
@@ -101,8 +102,7 @@ else:
 
     from io import StringIO
 
-    from urllib.request import (urlopen, ProxyHandler, build_opener,
-                                install_opener)
+    _urlrequest = 'urllib.request'
     from urllib.parse import quote as urlquote
 
     def iterkeys(d): return iter(d.keys())
@@ -119,6 +119,35 @@ else:
 
     import queue as queue
 
+# Exceptions of the connections (python >= 3.3). Older versions raise
+# socket.error and socket.timeout
+try:
+    ConnectionError, ConnectionRefusedError, TimeoutError = \
+        ConnectionError, ConnectionRefusedError, TimeoutError
+except NameError:
+    import socket
+    ConnectionError = ConnectionRefusedError = socket.error
+    TimeoutError = socket.timeout
+
+
+# The url request module is expensive to import and only needed by the online
+# data feeds. Import it when first used
+def urlopen(*args, **kwargs):
+    return importlib.import_module(_urlrequest).urlopen(*args, **kwargs)
+
+
+def ProxyHandler(*args, **kwargs):
+    return importlib.import_module(_urlrequest).ProxyHandler(*args, **kwargs)
+
+
+def build_opener(*args, **kwargs):
+    return importlib.import_module(_urlrequest).build_opener(*args, **kwargs)
+
+
+def install_opener(*args, **kwargs):
+    return importlib.import_module(_urlrequest).install_opener(*args,
+                                                               **kwargs)
+
 
 # This is from Armin Ronacher from Flash simplified later by six
 def with_metaclass(meta, *bases):
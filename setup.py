@@ -118,6 +118,7 @@ setuptools.setup(
     # $ pip install -e .[dev,test]
     extras_require={
         'plotting':  ['matplotlib'],
+        'influxdb': ['influxdb'],
     },
 
     # If there are data files included in your packages that need to be
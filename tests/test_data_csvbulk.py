@@ -0,0 +1,168 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016, 2017 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import datetime
+import os.path
+import tempfile
+
+import testcommon
+
+import backtrader as bt
+
+
+class RowCSVData(bt.feeds.BacktraderCSVData):
+    def _loadline(self, linetokens):  # a custom _loadline: row by row
+        return super(RowCSVData, self)._loadline(linetokens)
+
+
+def rowcls(datacls):
+    class RowData(datacls):
+        def _loadline(self, linetokens):  # a custom _loadline: row by row
+            return super(RowData, self)._loadline(linetokens)
+
+    return RowData
+
+
+def writefiles(dirname):
+    # Files in the formats of the other parsers from those of the tests
+    def readrows(datafile):
+        with open(os.path.join(testcommon.modpath, testcommon.dataspath,
+                               datafile)) as f:
+            return [line.rstrip('\n').split(',') for line in f][1:]
+
+    def write(name, header, rows):
+        filename = os.path.join(dirname, name)
+        with open(filename, 'w') as f:
+            f.write(header + '\n')
+            f.writelines(','.join(row) + '\n' for row in rows)
+
+        return filename
+
+    files = dict()
+
+    # Yahoo v7 with a "null" row: Date,Open,High,Low,Close,Adj Close,Volume
+    yrows = readrows('yhoo-1996-2015.txt')
+    yrows.insert(10, [yrows[10][0]] + ['null'] * 6)
+    files['yahoo'] = write('yahoo.csv', 'Date,O,H,L,C,AdjC,V', yrows)
+
+    # Date,Open,High,Low,Close,Volume,Adj Close
+    lrows = [row[:5] + [row[6], row[5]] for row in yrows if 'null' not in row]
+    files['legacy'] = write('legacy.csv', 'Date,O,H,L,C,V,AdjC', lrows)
+
+    # Date,ohlcv,Ex-Dividend,Split Ratio,adjusted ohlcv
+    drows = readrows('2006-day-001.txt')
+    qrows = [row[:6] + ['0.0', '1.0'] +
+             ['%.4f' % (float(x) / 3.0) for x in row[1:6]] for row in drows]
+    files['quandl'] = write('quandl.csv', 'Date,...', qrows)
+
+    # Ticker,Per,YYYYMMDD,HHMMSS,ohlcv,oi
+    mrows = readrows('2006-min-005.txt')
+    vrows = [['ES', 'I', row[0].replace('-', ''), row[1].replace(':', '')] +
+             row[2:] for row in mrows]
+    files['vchart'] = write('vchart.csv', 'Ticker,...', vrows)
+    vrows = [['ES', 'D', row[0].replace('-', ''), '0'] + row[1:]
+             for row in drows]
+    files['vchartd'] = write('vchartd.csv', 'Ticker,...', vrows)
+
+    return files
+
+
+def preload(datacls, **kwargs):
+    data = datacls(**kwargs)
+    cerebro = bt.Cerebro()
+    cerebro.adddata(data)
+    data._start()
+    canbulk = data._canbulk()
+    data.preload()
+    return canbulk, repr([list(line.array) for line in data.lines])
+
+
+def test_run(main=False):
+    minfile = os.path.join(testcommon.modpath, testcommon.dataspath,
+                           '2006-min-005.txt')
+    for kwargs in [dict(), dict(fromdate=datetime.datetime(2006, 1, 3, 10),
+                                todate=datetime.datetime(2006, 1, 10, 11))]:
+        bulk, values = preload(bt.feeds.BacktraderCSVData,
+                               dataname=minfile, **kwargs)
+        row, chkvalues = preload(RowCSVData, dataname=minfile, **kwargs)
+        assert bulk and not row
+        assert values == chkvalues
+
+        # reading in small blocks splits lines in between
+        bt.feeds.BacktraderCSVData.BULKSIZE = 100
+        try:
+            bulk, values = preload(bt.feeds.BacktraderCSVData,
+                                   dataname=minfile, **kwargs)
+        finally:
+            del bt.feeds.BacktraderCSVData.BULKSIZE
+
+        assert values == chkvalues
+
+        if main:
+            print(kwargs, 'bulk and row by row loading match')
+
+    # The other parsers with bulk loading
+    files = writefiles(tempfile.mkdtemp())
+    feeds = bt.feeds
+    runs = [
+        (feeds.YahooFinanceCSVData, files['yahoo'], dict()),
+        (feeds.YahooFinanceCSVData, files['yahoo'], dict(adjclose=False)),
+        (feeds.YahooFinanceCSVData, files['yahoo'],
+         dict(swapcloses=True, round=False)),
+        (feeds.YahooLegacyCSV, files['legacy'], dict()),
+        (feeds.YahooLegacyCSV, files['legacy'], dict(adjclose=False)),
+        (feeds.QuandlCSV, files['quandl'], dict()),
+        (feeds.QuandlCSV, files['quandl'], dict(adjclose=False, round=True)),
+        (feeds.VChartCSVData, files['vchart'], dict()),
+        (feeds.VChartCSVData, files['vchartd'],
+         dict(fromdate=datetime.datetime(2006, 3, 1))),
+    ]
+    for datacls, dataname, kwargs in runs:
+        bulk, values = preload(datacls, dataname=dataname, **kwargs)
+        row, chkvalues = preload(rowcls(datacls), dataname=dataname,
+                                 **kwargs)
+        assert bulk and not row
+        assert values == chkvalues
+
+        datacls.BULKSIZE = 100
+        try:
+            bulk, values = preload(datacls, dataname=dataname, **kwargs)
+        finally:
+            del datacls.BULKSIZE
+
+        assert values == chkvalues
+
+        if main:
+            print(datacls.__name__, kwargs, 'bulk and row by row loading match')
+
+    # The data of the usual tests runs also unchanged
+    cerebro = bt.Cerebro()
+    data = testcommon.getdata(0)
+    cerebro.adddata(data)
+    cerebro.addstrategy(bt.Strategy)
+    cerebro.run()
+    assert len(data) == 255
+
+
+if __name__ == '__main__':
+    test_run(main=True)
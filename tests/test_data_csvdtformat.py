@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016, 2017 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+from datetime import datetime
+import os.path
+
+import testcommon
+
+import backtrader as bt
+from backtrader.feeds.csvgeneric import _DTParser
+
+
+CHKFORMATS = [
+    ('%Y-%m-%d', '2006-01-02'),
+    ('%Y-%m-%d', '2006-1-2'),  # not fixed width, goes to strptime
+    ('%Y%m%d', '20061231'),
+    ('%Y-%m-%d %H:%M:%S', '2006-01-02 23:59:01'),
+    ('%d/%m/%Y', '02/01/2006'),
+    ('%H:%M', '09:30'),
+]
+
+
+def test_run(main=False):
+    for fmt, dtstr in CHKFORMATS:
+        parser = _DTParser(fmt)
+        assert parser.fast
+        assert parser(dtstr) == datetime.strptime(dtstr, fmt)
+
+    parser = _DTParser('%d %b %Y')  # left to strptime
+    assert not parser.fast
+    assert parser('02 Jan 2006') == datetime(2006, 1, 2)
+
+    # separate date and time fields
+    datapath = os.path.join(testcommon.modpath, testcommon.dataspath,
+                            '2006-01-02-volume-min-001.txt')
+    data = bt.feeds.GenericCSVData(
+        dataname=datapath, dtformat='%Y-%m-%d', time=1, open=2, high=3,
+        low=4, close=5, volume=6, openinterest=7,
+        timeframe=bt.TimeFrame.Minutes)
+    cerebro = bt.Cerebro()
+    cerebro.adddata(data)
+    data._start()
+    data.preload()
+
+    with open(datapath) as f:
+        rows = [line.split(',')[:2] for line in f.read().splitlines()[1:]]
+
+    chkfmt = '%Y-%m-%dT%H:%M:%S'
+    chkdts = [bt.date2num(datetime.strptime('T'.join(row), chkfmt))
+              for row in rows]
+    if main:
+        print('bars:', len(chkdts))
+
+    assert list(data.lines.datetime.array) == chkdts
+
+
+if __name__ == '__main__':
+    test_run(main=True)
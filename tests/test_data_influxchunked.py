@@ -0,0 +1,156 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016, 2017 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import datetime
+import json
+import re
+import threading
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from urllib.parse import parse_qs, urlparse
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from urlparse import parse_qs, urlparse
+
+import testcommon
+
+import backtrader as bt
+
+
+EPOCH = datetime.datetime(1970, 1, 1)
+USPERDAY = 86400 * 10 ** 6
+
+# A daily bar for each day, valued after its position
+START = datetime.datetime(2006, 1, 2)
+POINTS = [((START - EPOCH).days + i) * USPERDAY for i in range(100)]
+COLUMNS = ['time', 'open', 'high', 'low', 'close', 'volume', 'openinterest']
+
+
+class StubInfluxHandler(BaseHTTPRequestHandler):
+    '''Answers the queries of InfluxDBChunked with POINTS'''
+    queries = list()
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        q = parse_qs(urlparse(self.path).query)['q'][0]
+        self.queries.append(q)
+        points = POINTS
+        for op, t in re.findall(r'time (>=|<=|<) (\d+)u', q):
+            t = int(t)
+            if op == '>=':
+                points = [x for x in points if x >= t]
+            elif op == '<=':
+                points = [x for x in points if x <= t]
+            else:
+                points = [x for x in points if x < t]
+
+        if '"bad"' in q:
+            result = dict(error='measurement not found')
+        elif 'first(' in q or 'last(' in q:
+            point = points[0] if 'first(' in q else points[-1]
+            result = dict(series=[dict(columns=['time', 'first'],
+                                       values=[[point, 1.0]])])
+        else:
+            values = list()
+            for point in points:
+                i = float(POINTS.index(point))
+                values.append([point, i, i + 2, i - 1, i + 1, 100 * i, None])
+
+            result = dict(series=[dict(columns=COLUMNS, values=values)])
+
+        body = json.dumps(dict(results=[result])).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class TestStrategy(bt.Strategy):
+    def start(self):
+        self.bars = list()
+
+    def next(self):
+        self.bars.append((self.data.datetime.datetime(), self.data.close[0]))
+
+
+def runstrat(port, dataname='prices', datas=(), preload=True, **kwargs):
+    cerebro = bt.Cerebro(stdstats=False, preload=preload)
+    cerebro.adddata(bt.feeds.InfluxDBChunked(
+        dataname=dataname, port=port, database='test', **kwargs))
+    for data in datas:
+        cerebro.adddata(data)
+    cerebro.addstrategy(TestStrategy)
+    return cerebro.run()[0].bars
+
+
+def test_run(main=False):
+    server = HTTPServer(('127.0.0.1', 0), StubInfluxHandler)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    port = server.server_address[1]
+
+    try:
+        chkbars = [(START + datetime.timedelta(days=i), i + 1.0)
+                   for i in range(100)]
+
+        for prefetch in [True, False]:
+            del StubInfluxHandler.queries[:]
+            bars = runstrat(port, prefetch=prefetch,
+                            chunksize=datetime.timedelta(days=7))
+            if main:
+                print('prefetch', prefetch, len(bars),
+                      len(StubInfluxHandler.queries))
+
+            assert bars == chkbars
+            assert len(StubInfluxHandler.queries) == 2 + 15  # edges + chunks
+
+        # The data runs out before another one: it is asked for more bars
+        for prefetch in [True, False]:
+            bars = runstrat(port, prefetch=prefetch, preload=False,
+                            chunksize=datetime.timedelta(days=7),
+                            datas=[testcommon.getdata(0)])
+            assert sorted(set(bars)) == chkbars  # repeated on other's bars
+
+        bars = runstrat(port, fromdate=datetime.datetime(2006, 2, 1),
+                        todate=datetime.datetime(2006, 3, 1))
+        assert bars == chkbars[30:59]
+
+        try:
+            runstrat(port, dataname='bad')
+        except IOError:
+            pass
+        else:
+            assert False, 'IOError not raised'
+
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == '__main__':
+    test_run(main=True)
@@ -0,0 +1,144 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016, 2017 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import datetime
+import math
+import threading
+import time
+
+import testcommon
+
+import backtrader as bt
+from backtrader.stores.storeio import TickQueue
+from backtrader.utils.py3 import queue
+
+
+class TickFeed(bt.feed.DataBase):
+    '''Live data fed from a thread over a TickQueue, as the stores do. The
+    ticks are stamped with the wall clock and are put after waiting the
+    given delays'''
+    params = (
+        ('delays', ()),
+        ('qcheck', 0.5),
+    )
+
+    def islive(self):
+        return True
+
+    def haslivewakeup(self):
+        return True
+
+    def start(self):
+        super(TickFeed, self).start()
+        self.qlive = TickQueue()
+        self.ended = None
+        self._over = False
+        t = threading.Thread(target=self._t_ticks)
+        t.daemon = True
+        t.start()
+
+    def _t_ticks(self):
+        for i, delay in enumerate(self.p.delays):
+            time.sleep(delay)
+            self.qlive.put((datetime.datetime.utcnow(), 1.0 + i))
+
+        time.sleep(0.2)
+        self.ended = time.time()
+        self.qlive.put(None)
+
+    def _load(self):
+        if self._over:
+            return False
+
+        try:
+            msg = self.qlive.get(timeout=self._qcheck)
+        except queue.Empty:
+            return None
+
+        if self._latency is not None:
+            self._latency.arrival(self, self.qlive)
+
+        if msg is None:
+            self._over = True
+            return False
+
+        dt, price = msg
+        self.lines.datetime[0] = self.date2num(dt)
+        for line in ('open', 'high', 'low', 'close'):
+            getattr(self.lines, line)[0] = price
+
+        return True
+
+
+class TestStrategy(bt.Strategy):
+    def start(self):
+        self.nexts = list()
+
+    def next(self):
+        self.nexts.append(time.time())
+
+
+def test_run(main=False):
+    # A silent data does not delay the ticks of another one. Without the
+    # wakeup the ticks would wait for the tick of the silent data, which
+    # comes after 3/4 of its qcheck
+    qcheck = 2.0
+    cerebro = bt.Cerebro(stdstats=False, livewakeup=5.0, latency=True)
+    cerebro.adddata(TickFeed(delays=[0.75 * qcheck], qcheck=qcheck),
+                    name='silent')
+    cerebro.adddata(TickFeed(delays=[0.02] * 10), name='ticking')
+    cerebro.addstrategy(TestStrategy)
+    cerebro.addanalyzer(bt.analyzers.Latency)
+    strat = cerebro.run()[0]
+
+    total = strat.analyzers.latency.get_analysis()['ticking']['total']
+    if main:
+        print('ticking total latency', dict(total))
+
+    assert total['count'] == 10
+    assert total['max'] < qcheck / 2.0
+    assert cerebro._wakeup is None  # disarmed
+    assert not bt.feed.livewakeup._events
+
+    # A resampled bar is delivered when its time is over, without waiting
+    # for more ticks or for livewakeup
+    qcheck = 0.5
+    now = time.time()
+    barend = math.floor(now) + 2.0  # the ticks are in the next second
+    delays = [1.1 - now % 1.0, 0.1, 0.1, 8 * qcheck]
+    cerebro = bt.Cerebro(stdstats=False, livewakeup=10.0)
+    data = TickFeed(delays=delays, qcheck=qcheck)
+    cerebro.resampledata(data, timeframe=bt.TimeFrame.Seconds)
+    cerebro.addstrategy(TestStrategy)
+    strat = cerebro.run()[0]
+
+    if main:
+        print('resampled bar after', strat.nexts[0] - barend)
+
+    # the next tick comes more than 7 qchecks after the end of the bar
+    assert strat.nexts and strat.nexts[0] < barend + 4 * qcheck
+    assert strat.nexts[0] < data.ended  # before the end of the data
+
+
+if __name__ == '__main__':
+    test_run(main=True)
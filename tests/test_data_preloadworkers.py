@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016, 2017 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import testcommon
+
+import backtrader as bt
+
+
+class TestStrategy(bt.Strategy):
+    def __init__(self):
+        self.smas = [bt.ind.SMA(d, period=15) for d in self.datas]
+
+    def start(self):
+        self.values = list()
+
+    def next(self):
+        self.values.append(
+            [(d.datetime[0], d.close[0], sma[0])
+             for d, sma in zip(self.datas, self.smas)])
+
+
+def runstrat(**kwargs):
+    cerebro = bt.Cerebro(stdstats=False, **kwargs)
+    data0, data1 = testcommon.getdata(0), testcommon.getdata(1)
+    cerebro.adddata(data0)
+    cerebro.adddata(data1)
+    cerebro.adddata(data0.clone())
+    cerebro.addstrategy(TestStrategy)
+    return cerebro.run()[0].values
+
+
+def test_run(main=False):
+    chkvalues = runstrat()
+    for pool in ['thread', 'process']:
+        values = runstrat(preloadworkers=2, preloadpool=pool)
+        if main:
+            print(pool, len(values))
+
+        assert values == chkvalues
+
+        # the failures are reported for each data
+        cerebro = bt.Cerebro(preloadworkers=2, preloadpool=pool)
+        cerebro.adddata(testcommon.getdata(0))
+        cerebro.adddata(bt.feeds.BacktraderCSVData(dataname='nonexistent'))
+        try:
+            cerebro.run()
+        except bt.errors.DataPreloadError as e:
+            assert [d._name for d, exc in e.errors] == ['nonexistent']
+        else:
+            assert False, 'DataPreloadError not raised'
+
+
+if __name__ == '__main__':
+    test_run(main=True)
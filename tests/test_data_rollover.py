@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016, 2017 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import datetime
+import os.path
+
+import testcommon
+
+import backtrader as bt
+
+
+class TestStrategy(bt.Strategy):
+    def start(self):
+        self.bars = list()
+
+    def next(self):
+        self.bars.append(tuple(line[0] for line in self.data.lines))
+
+
+def getfutures():
+    # overlapping periods of 2 files play the role of futures
+    dt = datetime.datetime
+    periods = [
+        ('2006-day-001.txt', None, dt(2006, 4, 30)),
+        ('2006-day-002.txt', dt(2006, 3, 1), dt(2006, 8, 31)),
+        ('2006-day-001.txt', dt(2006, 6, 15), dt(2006, 10, 31)),
+        ('2006-day-002.txt', dt(2006, 9, 1), None),
+    ]
+
+    futures = list()
+    for dataname, fromdate, todate in periods:
+        datapath = os.path.join(testcommon.modpath, testcommon.dataspath,
+                                dataname)
+        futures.append(bt.feeds.BacktraderCSVData(
+            dataname=datapath, fromdate=fromdate, todate=todate))
+
+    return futures
+
+
+def checkdate(dt, d):
+    return dt.day >= 20
+
+
+def checkvolume(d0, d1):
+    return d0.volume[0] < d1.volume[0]
+
+
+def runstrat(rollover, preload, **kwargs):
+    cerebro = bt.Cerebro(stdstats=False, preload=preload, runonce=preload)
+    if rollover:
+        cerebro.rolloverdata(name='FUT', *getfutures(), **kwargs)
+    else:
+        cerebro.chaindata(name='FUT', *getfutures())
+
+    cerebro.addstrategy(TestStrategy)
+    return cerebro.run()[0].bars
+
+
+def test_run(main=False):
+    for rollover, kwargs in [(False, dict()),
+                             (True, dict()),
+                             (True, dict(checkdate=checkdate)),
+                             (True, dict(checkdate=checkdate,
+                                         checkcondition=checkvolume)),
+                             (True, dict(checkdate=checkdate,
+                                         checkcondition='volume'))]:
+        bars = runstrat(rollover, True, **kwargs)
+        chkbars = runstrat(rollover, False, **kwargs)
+        if main:
+            print('rollover' if rollover else 'chainer', len(bars))
+
+        assert bars == chkbars
+
+
+if __name__ == '__main__':
+    test_run(main=True)
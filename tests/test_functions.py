@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016, 2017 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+
+import testcommon
+
+import backtrader as bt
+import backtrader.indicators as btind
+
+
+class TestStrategy(bt.Strategy):
+    params = (
+        ('main', False),
+    )
+
+    def __init__(self):
+        d = self.data
+        diff = d.close - d.close(-1)
+        sma = btind.SMA(d, period=15)
+
+        self.funcs = [
+            bt.DivByZero(d.close - sma, diff),
+            bt.DivZeroByZero(diff, diff),
+            bt.Cmp(d.close, sma),
+            bt.If(diff > 0, d.high, d.low),
+            bt.And(diff > 0, d.close > sma),
+            bt.Or(diff > 0, d.close > sma, 0.0),
+            bt.Max(d.open, d.close, sma),
+            bt.Min(d.open, d.close, 15.0),
+            bt.Sum(d.open, d.high, d.low, d.close),
+            bt.Any(diff, d.close > sma),
+            bt.All(diff, d.close > sma),
+        ]
+
+    def start(self):
+        self.values = list()
+
+    def next(self):
+        vals = [len(self)]
+        vals.extend('%f' % func[0] for func in self.funcs)
+        self.values.append(vals)
+
+        if self.p.main:
+            print(', '.join(map(str, vals)))
+
+
+def runstrat(**kwargs):
+    cerebro = bt.Cerebro(**kwargs)
+    cerebro.adddata(testcommon.getdata(0))
+    cerebro.addstrategy(TestStrategy)
+    return cerebro.run()[0]
+
+
+def test_run(main=False):
+    chkstrat = runstrat(runonce=False)
+
+    strat = runstrat(runonce=True)
+    assert strat.values == chkstrat.values
+
+    # The plain python loops have to deliver the same
+    numpy, bt.linebuffer._numpy = bt.linebuffer._numpy, False
+    try:
+        strat = runstrat(runonce=True)
+    finally:
+        bt.linebuffer._numpy = numpy
+
+    assert strat.values == chkstrat.values
+    if main:
+        print('%d bars checked' % len(strat.values))
+
+
+if __name__ == '__main__':
+    test_run(main=True)
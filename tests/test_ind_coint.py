@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016, 2017 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import os.path
+
+import testcommon
+
+import backtrader as bt
+import backtrader.indicators as btind
+
+# 2 daily data feeds with the same trading days
+datafiles = ['yhoo-1996-2014.txt', 'orcl-1995-2014.txt']
+
+PERIOD = 30
+
+
+class TestStrategy(bt.Strategy):
+    def __init__(self):
+        self.ind = btind.CointN(self.data0, self.data1, period=PERIOD)
+
+    def start(self):
+        self.values = list()
+        self.windows = list()
+
+    def next(self):
+        self.values.append((self.ind.score[0], self.ind.pvalue[0]))
+        self.windows.append((self.data0.close.get(size=PERIOD),
+                             self.data1.close.get(size=PERIOD)))
+
+
+def runstrat(**kwargs):
+    modpath = os.path.dirname(os.path.abspath(__file__))
+    cerebro = bt.Cerebro(stdstats=False, **kwargs)
+    for datafile in datafiles:
+        cerebro.adddata(bt.feeds.YahooFinanceCSVData(
+            dataname=os.path.join(modpath, testcommon.dataspath, datafile),
+            fromdate=testcommon.FROMDATE,
+            todate=testcommon.TODATE))
+
+    cerebro.addstrategy(TestStrategy)
+    return cerebro.run()[0]
+
+
+def test_run(main=False):
+    try:
+        from statsmodels.tsa.stattools import coint
+    except ImportError:
+        if not main:
+            import pytest
+            pytest.skip('statsmodels is not installed')
+
+        return
+
+    chkstrat = runstrat(runonce=False)
+    strat = runstrat()  # once
+    if main:
+        print('%d bars' % len(strat.values))
+
+    assert strat.values == chkstrat.values
+
+    # the values are those of coint for the window of each bar
+    for i in range(0, len(strat.windows), 25):
+        x, y = strat.windows[i]
+        score, pvalue, _ = coint(x, y)  # default: constant ('c')
+        if main:
+            print(i, strat.values[i], (score, pvalue))
+
+        assert strat.values[i] == (score, pvalue)
+
+
+if __name__ == '__main__':
+    test_run(main=True)
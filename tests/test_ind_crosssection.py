@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016, 2017 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import math
+
+import testcommon
+
+import backtrader as bt
+import backtrader.indicators as btind
+
+
+def ranks(vals):
+    # average ranks as a plain python loop
+    return [sum(x < v for x in vals) + (sum(x == v for x in vals) + 1) / 2.0
+            for v in vals]
+
+
+class TestStrategy(bt.Strategy):
+    params = (
+        ('main', False),
+    )
+
+    def __init__(self):
+        d = self.data0
+        self.universe = [d.close, d.open, d.high, d.low,
+                         btind.SMA(d, period=5)]
+        self.rank = btind.XSRank(*self.universe)
+        self.pct = btind.XSPercentile(*self.universe)
+        self.decile = btind.XSDecile(*self.universe, buckets=2)
+        self.zscore = btind.XSZScore(*self.universe)
+
+        # universe defaults to the datas: data1 is weekly
+        self.dtrank = btind.XSRank()
+
+    def start(self):
+        self.values = list()
+
+    def next(self):
+        vals = [x[0] for x in self.universe]
+        nvals = len(vals)
+        for i, r in enumerate(ranks(vals)):
+            assert self.rank.lines[i][0] == r
+            assert self.pct.lines[i][0] == r / nvals
+            assert self.decile.lines[i][0] == (r - 1) * 2 // nvals + 1
+
+        zsum = math.fsum(x[0] for x in self.zscore.lines)
+        assert abs(zsum) < 1e-9
+
+        dtvals = [d.close[0] for d in self.datas]
+        for i, r in enumerate(ranks(dtvals)):
+            assert self.dtrank.lines[i][0] == r
+
+        xs = [self.rank, self.pct, self.decile, self.zscore, self.dtrank]
+        vals = ['%f' % line[0] for ind in xs for line in ind.lines]
+        self.values.append(vals)
+        if self.p.main:
+            print(', '.join(vals))
+
+
+def runstrat(main=False, **kwargs):
+    cerebro = bt.Cerebro(**kwargs)
+    cerebro.adddata(testcommon.getdata(0))
+    cerebro.adddata(testcommon.getdata(1))
+    cerebro.addstrategy(TestStrategy, main=main)
+    return cerebro.run()[0]
+
+
+def test_run(main=False):
+    chkstrat = runstrat(runonce=False, main=main)
+    for kwargs in [dict(), dict(exactbars=1, chunkbars=40)]:
+        strat = runstrat(**kwargs)
+        assert strat.values == chkstrat.values
+
+    assert chkstrat.dtrank.size() == 2
+
+
+if __name__ == '__main__':
+    test_run(main=True)
@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016, 2017 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import datetime
+import os.path
+
+import testcommon
+
+import backtrader as bt
+import backtrader.indicators as btind
+from backtrader.indicators import basicops
+
+
+# 2 years of bars: more than LFILTER_MINSIZE values to smooth in once mode
+DATAFILE = '2005-2006-day-001.txt'
+
+
+class TestStrategy(bt.Strategy):
+    params = (
+        ('main', False),
+    )
+
+    def __init__(self):
+        self.inds = [
+            btind.EMA(self.data, period=30),
+            btind.ExponentialSmoothing(self.data.high, period=14, alpha=0.5),
+            btind.SMMA(self.data.low, period=14),
+        ]
+
+    def start(self):
+        self.values = list()
+
+    def next(self):
+        self.values.append([ind[0] for ind in self.inds])
+
+
+def runstrat(**kwargs):
+    datapath = os.path.join(testcommon.modpath, testcommon.dataspath,
+                            DATAFILE)
+    data = bt.feeds.BacktraderCSVData(
+        dataname=datapath,
+        fromdate=datetime.datetime(2005, 1, 1),
+        todate=datetime.datetime(2006, 12, 31))
+
+    cerebro = bt.Cerebro(stdstats=False, **kwargs)
+    cerebro.adddata(data)
+    cerebro.addstrategy(TestStrategy)
+    return cerebro.run()[0]
+
+
+def test_run(main=False):
+    lfilter = basicops._getlfilter()
+    if not lfilter:  # scipy is not installed or the values would differ
+        if not main:
+            import pytest
+            pytest.skip('scipy.signal.lfilter is not available')
+
+        return
+
+    calls = list()
+
+    def countcalls(src, dst, start, end, alpha, alpha1):
+        calls.append(end - start)
+        lfilter(src, dst, start, end, alpha, alpha1)
+
+    basicops._lfilter = countcalls
+    try:
+        strat = runstrat()  # once: long enough for lfilter
+    finally:
+        basicops._lfilter = lfilter
+
+    chkstrat = runstrat(runonce=False)  # next: the pure Python recursion
+
+    if main:
+        print('%d bars, lfilter calls: %s' % (len(strat.values), calls))
+
+    assert len(calls) == len(strat.inds)
+    assert all(x >= basicops.LFILTER_MINSIZE for x in calls)
+    assert strat.values == chkstrat.values
+
+
+if __name__ == '__main__':
+    test_run(main=True)
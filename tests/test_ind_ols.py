@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+
+import datetime
+import os.path
+import random
+
+import numpy as np
+
+import testcommon
+
+import backtrader as bt
+import backtrader.indicators as btind
+
+# 2 daily data feeds with the same trading days
+datafiles = ['yhoo-1996-2014.txt', 'orcl-1995-2014.txt']
+
+chkvals = [
+    ['1.118169', '-1.090988', '-7.573027'],  # slope
+    ['6.526287', '47.454865', '141.816574'],  # intercept
+]
+
+chkmin = 29  # OLS_TransformationN: period + period - 1
+
+
+class TestStrategy(bt.Strategy):
+    params = (
+        ('main', False),
+        ('period', 15),
+    )
+
+    def __init__(self):
+        self.ind = btind.OLS_Slope_InterceptN(self.data0, self.data1,
+                                              period=self.p.period)
+        self.beta = btind.OLS_BetaN(self.data0, self.data1,
+                                    period=self.p.period)
+        btind.OLS_TransformationN(self.data0, self.data1,
+                                  period=self.p.period)
+
+    def nextstart(self):
+        self.chkmin = len(self)
+        super(TestStrategy, self).nextstart()
+
+    def next(self):
+        assert self.beta[0] == self.ind.slope[0]
+
+    def stop(self):
+        l = len(self.ind)
+        chkpts = [0, -l + self.chkmin, (-l + self.chkmin) // 2]
+        vals = [['%f' % line[chkpt] for chkpt in chkpts]
+                for line in self.ind.lines]
+
+        if self.p.main:
+            print('minperiod %d' % self.chkmin)
+            for linevals in vals:
+                print(linevals)
+        else:
+            assert self.chkmin == chkmin
+            assert vals == chkvals
+
+
+class SeriesFeed(bt.feed.DataBase):
+    '''Daily bars with the closes in ``values``'''
+    params = (('values', ()),)
+
+    def start(self):
+        super(SeriesFeed, self).start()
+        self._values = iter(self.p.values)
+        self._dt = datetime.datetime(2000, 1, 1)
+
+    def _load(self):
+        for value in self._values:
+            self._dt += datetime.timedelta(days=1)
+            self.lines.datetime[0] = bt.date2num(self._dt)
+            self.lines.close[0] = value
+            return True
+
+        return False
+
+
+class PolyfitStrategy(bt.Strategy):
+    params = (('period', 30),)
+
+    def __init__(self):
+        self.ind = btind.OLS_Slope_InterceptN(self.data0, self.data1,
+                                              period=self.p.period)
+
+
+def runpolyfit(main=False, nbars=20000, period=30, **kwargs):
+    # Long, high priced series: raw sums of squares lose the precision
+    rnd = random.Random(1)
+    xs, ys = list(), list()
+    x = 1e4
+    for i in range(nbars):
+        x += rnd.gauss(0.0, 5.0)
+        xs.append(x)
+        ys.append(0.5 * x + 3000.0 + rnd.gauss(0.0, 2.0))
+
+    cerebro = bt.Cerebro(stdstats=False, **kwargs)
+    cerebro.adddata(SeriesFeed(values=ys))
+    cerebro.adddata(SeriesFeed(values=xs))
+    cerebro.addstrategy(PolyfitStrategy, period=period)
+    ind = cerebro.run()[0].ind
+
+    maxerr = 0.0
+    for i in list(range(period - 1, nbars, 997)) + [nbars - 1]:
+        w = slice(i - period + 1, i + 1)
+        chkslope, chkintercept = np.polyfit(xs[w], ys[w], 1)
+        ago = i - (nbars - 1)
+        maxerr = max(maxerr, abs(ind.slope[ago] - chkslope),
+                     abs(ind.intercept[ago] - chkintercept) / 1e4)
+
+    if main:
+        print('%s: max error against numpy.polyfit %g' % (kwargs, maxerr))
+
+    assert maxerr < 1e-9
+
+
+def test_run(main=False):
+    modpath = os.path.dirname(os.path.abspath(__file__))
+    datas = [
+        bt.feeds.YahooFinanceCSVData(
+            dataname=os.path.join(modpath, testcommon.dataspath, datafile),
+            fromdate=testcommon.FROMDATE,
+            todate=testcommon.TODATE)
+        for datafile in datafiles
+    ]
+
+    testcommon.runtest(datas, TestStrategy, main=main)
+
+    for kwargs in [dict(), dict(runonce=False)]:
+        runpolyfit(main=main, **kwargs)
+
+
+if __name__ == '__main__':
+    test_run(main=True)
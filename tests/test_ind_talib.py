@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016, 2017 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+
+import math
+
+import testcommon
+
+import backtrader as bt
+
+
+class TestStrategy(bt.Strategy):
+    params = (
+        ('main', False),
+        ('stream', True),
+        ('unstable', True),
+    )
+
+    def __init__(self):
+        bt.talib._TALibIndicator.STREAM = self.p.stream
+        self.inds = [
+            bt.talib.SMA(self.data, timeperiod=15),
+            bt.talib.SMA(self.data, timeperiod=30),  # shares the input
+            bt.talib.BBANDS(self.data, timeperiod=20),
+        ]
+        # NaN values in the input (before the minimum period of the SMA)
+        self.inds.append(bt.talib.MAX(self.inds[0], timeperiod=10))
+        if self.p.unstable:  # the values depend on all previous ones
+            self.inds.append(bt.talib.RSI(self.data, timeperiod=14))
+
+    def start(self):
+        self.values = list()
+
+    def next(self):
+        vals = [line[0] for ind in self.inds for line in ind.lines]
+        self.values.append(vals)
+
+        if self.p.main:
+            print(len(self), ', '.join('%f' % x for x in vals))
+
+
+def runstrat(**kwargs):
+    stream = kwargs.pop('stream', True)
+    unstable = kwargs.pop('unstable', True)
+    cerebro = bt.Cerebro(stdstats=False, **kwargs)
+    cerebro.adddata(testcommon.getdata(0))
+    cerebro.addstrategy(TestStrategy, stream=stream, unstable=unstable)
+    try:
+        return cerebro.run()[0]
+    finally:
+        bt.talib._TALibIndicator.STREAM = True
+
+
+def isclose(a, b):
+    if math.isnan(a) or math.isnan(b):
+        return math.isnan(a) and math.isnan(b)
+
+    return abs(a - b) <= 1e-6 * max(1.0, abs(a))
+
+
+def test_run(main=False):
+    if not bt.talib.__all__:  # ta-lib-python is not installed
+        if not main:
+            import pytest
+            pytest.skip('ta-lib-python is not installed')
+
+        return
+
+    chkstrat = runstrat()  # once
+    runs = [
+        dict(runonce=False),  # next with talib.stream
+        dict(runonce=False, stream=False),  # next with the full functions
+        # once over windows of bars: after the 1st one all have the same size
+        dict(exactbars=1, chunkbars=50, unstable=False),
+        # unstable functions need all previous values: no windows
+        dict(exactbars=1, chunkbars=50),
+    ]
+    for kwargs in runs:
+        strat = runstrat(**kwargs)
+        if main:
+            print('%s: %d bars' % (kwargs, len(strat.values)))
+
+        assert len(strat.values) == len(chkstrat.values)
+        for vals, chkvals in zip(strat.values, chkstrat.values):
+            if not kwargs.get('unstable', True):
+                chkvals = chkvals[:len(vals)]
+
+            assert all(isclose(a, b) for a, b in zip(vals, chkvals))
+
+
+if __name__ == '__main__':
+    test_run(main=True)
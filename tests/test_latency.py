@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016, 2017 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import datetime
+import threading
+import time
+
+import testcommon
+
+import backtrader as bt
+from backtrader.stores.storeio import TickQueue
+from backtrader.utils.py3 import queue
+
+
+TICKS = 20
+START = datetime.datetime(2017, 1, 2, 9, 0)
+
+
+class TickFeed(bt.feed.DataBase):
+    '''Live data fed from a thread over a TickQueue, as the stores do'''
+    params = (('delay', 0.005),)
+
+    def islive(self):
+        return True
+
+    def start(self):
+        super(TickFeed, self).start()
+        self.qlive = TickQueue()
+        self._thread = t = threading.Thread(target=self._t_ticks)
+        t.daemon = True
+        t.start()
+
+    def _t_ticks(self):
+        for i in range(TICKS):
+            time.sleep(self.p.delay)
+            self.qlive.put((START + datetime.timedelta(seconds=i), 1.0 + i))
+
+        self.qlive.put(None)
+
+    def _load(self):
+        try:
+            msg = self.qlive.get(timeout=self._qcheck)
+        except queue.Empty:
+            return None
+
+        if self._latency is not None:
+            self._latency.arrival(self, self.qlive)
+
+        if msg is None:
+            return False
+
+        dt, price = msg
+        self.lines.datetime[0] = self.date2num(dt)
+        for line in ('open', 'high', 'low', 'close'):
+            getattr(self.lines, line)[0] = price
+
+        return True
+
+
+class TestStrategy(bt.Strategy):
+    def start(self):
+        self.notifs = list()
+
+    def notify_store(self, msg, *args, **kwargs):
+        self.notifs.append((msg, args))
+
+
+def test_run(main=False):
+    records = list()
+    cerebro = bt.Cerebro(stdstats=False, latency=True,
+                         latencylog=lambda data, legs: records.append(legs))
+    cerebro.adddata(TickFeed(), name='ticks')
+    cerebro.addstrategy(TestStrategy)
+    cerebro.addanalyzer(bt.analyzers.Latency)
+    strat = cerebro.run()[0]
+
+    assert len(records) == TICKS
+    for legs in records:
+        assert list(legs) == ['load', 'deliver', 'sync', 'next', 'total']
+        assert all(lapse >= 0.0 for lapse in legs.values())
+        assert legs['total'] >= legs['load']
+
+    report = strat.analyzers.latency.get_analysis()
+    if main:
+        for leg, summary in report['ticks'].items():
+            print(leg, ', '.join('%s: %s' % x for x in summary.items()))
+
+    assert list(report) == ['ticks']
+    for leg, summary in report['ticks'].items():
+        assert summary['count'] == TICKS
+        assert summary['p50'] <= summary['p99'] <= summary['max']
+
+    assert not strat.notifs  # no period, no notifications
+
+    # periodic reports to notify_store
+    cerebro = bt.Cerebro(stdstats=False, latency=0.001)
+    cerebro.adddata(TickFeed(delay=0.01), name='ticks')
+    cerebro.addstrategy(TestStrategy)
+    strat = cerebro.run()[0]
+    assert strat.notifs
+    msg, args = strat.notifs[-1]
+    assert msg == 'LATENCY' and 'ticks' in args[0]
+
+    # Histogram precision
+    hist = bt.LatencyHistogram()
+    for i in range(1, 1001):
+        hist.add(i * 1e-4)
+
+    assert abs(hist.percentile(0.50) - 0.05) <= 0.05 * hist.precision
+    assert abs(hist.percentile(0.99) - 0.099) <= 0.099 * hist.precision
+    assert hist.max == 0.1 and hist.count == 1000
+
+
+if __name__ == '__main__':
+    test_run(main=True)
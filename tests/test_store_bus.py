@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016, 2017 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import os
+import socket
+import tempfile
+import threading
+
+import testcommon
+
+import backtrader as bt
+from backtrader.stores.busstore import BusHub, BusStore
+
+
+# Threads and events of the subscribers (strategy params are deep-copied)
+WORKERS = dict()
+
+
+class Publisher(bt.strategies.BusPublisher):
+    '''Starts the subscribers once everything is published (and in the
+    backlog) and does not stop (ending the hub) until they are in'''
+    params = (('workers', ()),)
+
+    def stop(self):
+        for worker in self.p.workers:
+            WORKERS[worker][0].start()
+
+        for worker in self.p.workers:
+            WORKERS[worker][1].wait(10.0)
+
+        super(Publisher, self).stop()
+
+
+class Subscriber(bt.Strategy):
+    params = (('worker', None),)
+
+    def start(self):
+        self.closes = [list() for data in self.datas]
+        self.statuses = [list() for data in self.datas]
+
+    def notify_data(self, data, status, *args, **kwargs):
+        for statuses, d in zip(self.statuses, self.datas):
+            if d is data:
+                statuses.append(data._getstatusname(status))
+
+    def prenext(self):
+        # a data may be delivering before the others
+        for closes, data in zip(self.closes, self.datas):
+            if len(data) > len(closes):
+                closes.append(data.close[0])
+
+    def next(self):
+        self.prenext()
+        WORKERS[self.p.worker][1].set()  # all datas subscribed
+
+
+def subscribe(store, dataname, worker, results, ndatas=1):
+    cerebro = bt.Cerebro(stdstats=False, livewakeup=1.0)
+    for i in range(ndatas):  # the same name: the store delivers to all
+        cerebro.adddata(store.getdata(dataname=dataname))
+
+    cerebro.addstrategy(Subscriber, worker=worker)
+    results.append(cerebro.run()[0])
+
+
+def publish(address, transport, workers=1, replay=False, ndatas=1):
+    results = list()
+    names = list()
+    for i in range(workers):
+        store = BusStore(address=address, transport=transport,
+                         reconntimeout=0.05)
+        name = '%s-%d-%d-%d' % (transport, replay, ndatas, i)
+        t = threading.Thread(target=subscribe,
+                             args=(store, 'daily', name, results, ndatas))
+        WORKERS[name] = (t, threading.Event())
+        names.append(name)
+
+    cerebro = bt.Cerebro(stdstats=False)
+    data = testcommon.getdata(0)
+    if replay:  # bars are published once complete
+        cerebro.replaydata(data, timeframe=bt.TimeFrame.Weeks, name='daily')
+    else:
+        cerebro.adddata(data, name='daily')
+    cerebro.addstrategy(Publisher, address=address, transport=transport,
+                        backlog=1000, workers=names)
+    cerebro.run()
+
+    for name in names:
+        WORKERS[name][0].join(10.0)
+
+    return [x for x in data.close.array], results
+
+
+def test_run(main=False):
+    address = os.path.join(tempfile.mkdtemp(), 'bus.sock')
+    runs = [
+        ('loopback', 'loopback', 1, False, 1),
+        ('loopback', 'loopback', 1, True, 1),
+        ('loopback', 'loopback', 1, False, 3),  # datas with the same name
+    ]
+    if hasattr(socket, 'AF_UNIX'):
+        runs.append((address, 'socket', 2, False, 1))
+        runs.append((address, 'socket', 1, False, 2))
+
+    for addr, transport, workers, replay, ndatas in runs:
+        closes, strats = publish(addr, transport, workers, replay, ndatas)
+        if main:
+            print(transport, replay, ndatas, len(closes),
+                  [[len(x) for x in s.closes] for s in strats])
+
+        assert len(strats) == workers
+        for strat in strats:
+            assert len(strat.closes) == ndatas
+            for dcloses, statuses in zip(strat.closes, strat.statuses):
+                assert dcloses == closes
+                assert 'DELAYED' in statuses  # bars from the backlog
+                assert statuses[-1] == 'DISCONNECTED'  # end of publisher
+
+    if hasattr(socket, 'AF_UNIX'):
+        assert not os.path.exists(address)
+
+    # A name which is not published ends the data
+    hub = BusHub(address='nothing', transport='loopback')
+    hub.addchannel('daily')
+    hub.start()
+    results = list()
+    store = BusStore(address='nothing', transport='loopback',
+                     reconntimeout=0.05)
+    WORKERS['none'] = (None, threading.Event())
+    subscribe(store, 'weekly', 'none', results)
+    hub.stop()
+
+    assert results[0].statuses[0][-2:] == ['NOTSUBSCRIBED', 'DISCONNECTED']
+
+
+if __name__ == '__main__':
+    test_run(main=True)
@@ -0,0 +1,232 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016, 2017 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import types
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+    from urllib.parse import parse_qs, urlparse
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+    from urlparse import parse_qs, urlparse
+
+import testcommon
+
+import backtrader as bt
+
+
+def oandapy_stub():
+    '''Module with the parts of ``oandapy`` the store uses (the store sends
+    the requests itself). The real one is used if installed'''
+    oandapy = types.ModuleType(str('oandapy'))
+
+    class OandaError(Exception):
+        def __init__(self, error_response):
+            self.error_response = error_response
+            super(OandaError, self).__init__(
+                'OANDA API returned error code %s (%s)' %
+                (error_response['code'], error_response['message']))
+
+    class API(object):
+        def __init__(self, environment='practice', access_token=None,
+                     headers=None):
+            self.api_url = dict(
+                practice='https://api-fxpractice.oanda.com',
+                live='https://api-fxtrade.oanda.com')[environment]
+
+        def get_instruments(self, account_id, **params):
+            params['accountId'] = account_id
+            return self.request('v1/instruments', params=params)
+
+    oandapy.OandaError = OandaError
+    oandapy.API = API
+    return oandapy
+
+
+try:
+    import oandapy
+except ImportError:
+    sys.modules['oandapy'] = oandapy_stub()
+
+from backtrader.feeds import oanda
+from backtrader.stores import oandastore, storeio
+
+
+T0 = 1500000000  # first candle (seconds since the epoch)
+CANDLES = 5
+TICKS = 10
+
+
+def candle(i):
+    price = 1.1 + i * 0.001
+    return dict(time=str((T0 + i * 60) * 10 ** 6), volume=10 + i,
+                openBid=price, highBid=price + 0.0005,
+                lowBid=price - 0.0005, closeBid=price + 0.0002,
+                openAsk=price + 0.0001, highAsk=price + 0.0006,
+                lowAsk=price - 0.0004, closeAsk=price + 0.0003,
+                complete=True)
+
+
+def tick(i):
+    price = 1.2 + i * 0.001
+    return dict(instrument='EUR_USD', bid=price, ask=price + 0.0001,
+                time=str((T0 + CANDLES * 60 + i) * 10 ** 6))
+
+
+class StubServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    '''Answers the instruments and the candles and streams the prices'''
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def _json(self, obj):
+        body = json.dumps(obj).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        if url.path == '/v1/instruments':
+            self._json(dict(instruments=[
+                dict(instrument=query['instruments'][0], pip='0.0001')]))
+
+        elif url.path == '/v1/candles':
+            self._json(dict(candles=[candle(i) for i in range(CANDLES)]))
+
+        elif url.path == '/v1/prices':
+            self.close_connection = True
+            self.send_response(200)
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+            for i in range(TICKS):
+                time.sleep(0.005)
+                line = json.dumps(dict(tick=tick(i))).encode('utf-8')
+                line += b'\r\n'
+                self.wfile.write(b'%x\r\n' % len(line) + line + b'\r\n')
+                self.wfile.flush()
+
+            self.wfile.write(b'0\r\n\r\n')
+
+        else:
+            self.send_error(404)
+
+
+class TestStrategy(bt.Strategy):
+    def start(self):
+        self.closes = list()
+        self.statuses = list()
+
+    def notify_data(self, data, status, *args, **kwargs):
+        self.statuses.append(data._getstatusname(status))
+
+    def next(self):
+        self.closes.append(round(self.data.close[0], 6))
+
+    def stop(self):
+        self.timeoffset = self.data._timeoffset()
+
+
+def runstrat(url=None, **kwargs):
+    oandastore.OandaStore._singleton = None  # a new store for each run
+    kwargs.setdefault('reconnect', False)
+    data = oanda.OandaData(dataname='EUR_USD', token='token', account='1',
+                           timeframe=bt.TimeFrame.Minutes, compression=1,
+                           qcheck=0.1, **kwargs)
+    if url is not None:  # send everything to the stub server
+        data.o.oapi.api_url = url
+        data.o._STREAMURLS = {data.o._oenv: url}
+
+    cerebro = bt.Cerebro(stdstats=False)
+    cerebro.adddata(data)
+    cerebro.addstrategy(TestStrategy)
+    return cerebro.run()[0]
+
+
+def checkstrat(strat):
+    closes = [round(candle(i)['closeBid'], 6) for i in range(CANDLES)]
+    closes += [round(tick(i)['bid'], 6) for i in range(TICKS)]
+    assert strat.closes == closes
+    assert strat.statuses[0] == 'DELAYED'  # backfilling
+    assert 'LIVE' in strat.statuses
+    assert strat.statuses[-1] == 'DISCONNECTED'  # end of stream
+
+
+def test_run(main=False):
+    server = StubServer(('127.0.0.1', 0), StubHandler)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    url = 'http://127.0.0.1:%d' % server.server_address[1]
+
+    filename = os.path.join(tempfile.mkdtemp(), 'oanda.gz')
+    try:
+        strat = runstrat(url, record=filename)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    if main:
+        print(strat.statuses)
+        print(strat.closes)
+
+    checkstrat(strat)
+    assert not strat.timeoffset  # the clock of the service is the local one
+
+    # The same session from the recording (the server is down). The stream
+    # to which the data reconnects is not in it: the replay is over (595)
+    # and the data does not try to reconnect again
+    strat = runstrat(url, replay=filename, replayspeed=None,
+                     reconnect=True, reconntimeout=0.01)
+    if main:
+        print(strat.statuses)
+        print(strat.timeoffset)
+
+    checkstrat(strat)
+    assert strat.statuses.count('CONNBROKEN') == 2
+
+    # the data sees the clock of the recording
+    recording = storeio.StoreRecording(filename)
+    wallclock = recording.header['wallclock']
+    lapse = recording.records[-1][0]
+    delta = strat.timeoffset.total_seconds() + time.time() - wallclock
+    assert 0.0 <= delta <= lapse + 0.5
+
+
+if __name__ == '__main__':
+    test_run(main=True)
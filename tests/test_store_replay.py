@@ -0,0 +1,156 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016, 2017 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import json
+import os
+import pickle
+import tempfile
+import threading
+import time
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+
+import testcommon
+
+from backtrader.stores import storeio
+
+
+TICKS = 20
+PACE = 0.01  # seconds between ticks
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    '''Answers /candles with json and streams ticks (at PACE) otherwise'''
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.startswith('/candles'):
+            body = json.dumps(dict(candles=[1, 2, 3])).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+
+        self.close_connection = True
+        self.send_response(200)
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        for i in range(TICKS):
+            time.sleep(PACE)
+            line = b'{"tick": %d}\n' % i
+            self.wfile.write(b'%x\r\n' % len(line) + line + b'\r\n')
+            self.wfile.flush()
+
+        self.wfile.write(b'0\r\n\r\n')
+
+
+def session(pool, url):
+    '''Runs a request and a stream over pool and returns the body, the lines
+    (with the time they arrived) and the end of the stream'''
+    q = storeio.TickQueue()
+    body = pool.request('GET', url + '/candles',
+                        params=dict(count=3)).result().body
+
+    pool.stream(url + '/stream', q.put,
+                lambda status, body, exc: q.put((status, exc)))
+
+    lines = list()
+    for msg in iter(lambda: q.get(timeout=5), None):
+        if isinstance(msg, tuple):
+            return body, lines, msg
+
+        lines.append((time.time(), msg))
+
+
+def test_run(main=False):
+    server = HTTPServer(('127.0.0.1', 0), StubHandler)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    url = 'http://127.0.0.1:%d' % server.server_address[1]
+
+    filename = os.path.join(tempfile.mkdtemp(), 'session.gz')
+    try:
+        recorder = storeio.StoreRecorder(filename)
+        body, lines, end = session(storeio.HTTPPool(recorder=recorder), url)
+        recorder.close()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert len(lines) == TICKS and end == (200, None)
+    lapse = lines[-1][0] - lines[0][0]
+
+    for speed in [None, 1.0, 4.0]:
+        pool = storeio.HTTPReplayPool(filename, speed=speed)
+        rbody, rlines, rend = session(pool, url)
+        rlapse = rlines[-1][0] - rlines[0][0]
+        if main:
+            print('speed', speed, 'lapse', lapse, 'replayed', rlapse)
+
+        assert rbody == body and rend == end
+        assert [x for _, x in rlines] == [x for _, x in lines]
+        if speed is not None:
+            assert lapse / speed * 0.5 < rlapse < lapse / speed * 2.0
+
+        # the recording is over
+        q = storeio.TickQueue()
+        pool.stream(url + '/stream', q.put,
+                    lambda status, body, exc: q.put(exc))
+        assert isinstance(q.get(timeout=5), storeio.ReplayEnd)
+
+        try:
+            pool.request('GET', url + '/candles').result()
+        except storeio.ReplayEnd:
+            pass
+        else:
+            assert False, 'ReplayEnd not raised'
+
+    # the clock of the replay is that of the recording
+    recording = storeio.StoreRecording(filename)
+    pool = storeio.HTTPReplayPool(filename)
+    offset = pool.timeoffset().total_seconds()
+    assert abs(time.time() + offset - recording.header['wallclock']) < 0.5
+
+    # only data is loaded: a pickle is not a recording
+    filename = os.path.join(tempfile.mkdtemp(), 'session.pickle')
+    with open(filename, 'wb') as f:
+        pickle.dump(dict(version=2, wallclock=0.0), f, 2)
+
+    try:
+        storeio.StoreRecording(filename)
+    except ValueError:
+        pass
+    else:
+        assert False, 'ValueError not raised'
+
+
+if __name__ == '__main__':
+    test_run(main=True)
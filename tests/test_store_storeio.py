@@ -0,0 +1,208 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016, 2017 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import json
+import threading
+import time
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+    from urllib.parse import parse_qs, urlparse
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+    from urlparse import parse_qs, urlparse
+
+import testcommon
+
+from backtrader.stores import storeio
+from backtrader.utils.py3 import queue
+
+
+TICKS = 50
+
+
+class StubServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    '''Answers requests with a json echo (kept alive) and streams ticks with
+    chunked transfer encoding'''
+    protocol_version = 'HTTP/1.1'
+    connections = list()
+
+    def log_message(self, *args):
+        pass
+
+    def setup(self):
+        BaseHTTPRequestHandler.setup(self)
+        self.connections.append(self.client_address)
+
+    def _send(self, status, body, **headers):
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name.replace('_', '-'), value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        if url.path == '/stream':
+            self.close_connection = True
+            self.send_response(200)
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+            for i in range(int(query['ticks'][0])):
+                line = json.dumps(dict(tick=i)).encode('utf-8') + b'\r\n'
+                if not i % 10:
+                    line += b'\r\n'  # heartbeat like empty line
+
+                self.wfile.write(b'%x\r\n' % len(line) + line + b'\r\n')
+                self.wfile.flush()
+
+            self.wfile.write(b'0\r\n\r\n')
+            return
+
+        if url.path == '/slow':
+            time.sleep(0.5)
+
+        if url.path == '/error':
+            self._send(404, b'not found', Content_Length='9')
+            return
+
+        body = json.dumps(dict(path=url.path, query=query,
+                               auth=self.headers.get('Authorization')))
+        body = body.encode('utf-8')
+        self._send(200, body, Content_Length=str(len(body)))
+
+    def do_POST(self):
+        length = int(self.headers['Content-Length'])
+        body = json.dumps(dict(data=parse_qs(self.rfile.read(length)
+                                             .decode('utf-8'))))
+        body = body.encode('utf-8')
+        self._send(200, body, Content_Length=str(len(body)))
+
+
+def check_tickqueue():
+    q = storeio.TickQueue()
+    try:
+        q.get(timeout=0.01)
+    except queue.Empty:
+        pass
+    else:
+        assert False, 'queue.Empty not raised'
+
+    def producer():
+        for i in range(TICKS):
+            q.put(i)
+            if not i % 7:
+                time.sleep(0.001)  # let the consumer wait
+
+        q.put(None)
+
+    t = threading.Thread(target=producer)
+    t.start()
+    ticks = [x for x in iter(lambda: q.get(timeout=5), None)]
+    t.join()
+    assert ticks == list(range(TICKS))
+    assert q.empty() and not q.qsize()
+
+
+def check_runall():
+    # all callables run at the same time (at most workers)
+    barrier = threading.Barrier(4, timeout=5)
+    funcs = [lambda i=i: barrier.wait() is not None and i for i in range(4)]
+    assert storeio.runall(funcs, workers=4) == list(range(4))
+
+
+def test_run(main=False):
+    check_tickqueue()
+    check_runall()
+
+    server = StubServer(('127.0.0.1', 0), StubHandler)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    url = 'http://127.0.0.1:%d' % server.server_address[1]
+
+    pool = storeio.HTTPPool(timeout=5)
+    try:
+        # sequential requests go over a single connection
+        headers = dict(Authorization='Bearer token')
+        for i in range(10):
+            response = pool.request('GET', url + '/candles', params=dict(i=i),
+                                    headers=headers).result()
+            assert response.status == 200
+            content = response.json()
+            assert content['query'] == dict(i=[str(i)])
+            assert content['auth'] == 'Bearer token'
+
+        assert len(StubHandler.connections) == pool.connections == 1
+
+        response = pool.request('POST', url + '/orders',
+                                data=dict(units=10)).result()
+        assert response.json()['data'] == dict(units=['10'])
+
+        response = pool.request('GET', url + '/error').result()
+        assert response.status == 404 and response.body == b'not found'
+
+        # the lines of a stream are handed off to the queue of a feed
+        q = storeio.TickQueue()
+        pool.stream(url + '/stream',
+                    lambda line: q.put(json.loads(line.decode('utf-8'))),
+                    lambda status, body, exc: q.put((status, exc)),
+                    params=dict(ticks=TICKS))
+
+        ticks = [q.get(timeout=5) for i in range(TICKS)]
+        assert ticks == [dict(tick=i) for i in range(TICKS)]
+        assert q.get(timeout=5) == (200, None)
+        if main:
+            print('connections', pool.connections, 'ticks', len(ticks))
+
+        # a stream closed by the client does not deliver anything else
+        stream = pool.stream(url + '/stream', q.put,
+                             lambda status, body, exc: q.put(exc),
+                             params=dict(ticks=TICKS), delay=0.5)
+        stream.close()
+        assert q.get(timeout=5) is None
+        assert q.empty()
+
+        try:
+            storeio.HTTPPool(timeout=0.1).request('GET', url + '/slow') \
+                .result()
+        except TimeoutError:
+            pass
+        else:
+            assert False, 'TimeoutError not raised'
+
+    finally:
+        pool.close()
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == '__main__':
+    test_run(main=True)
@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016, 2017 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import testcommon
+
+import backtrader as bt
+import backtrader.indicators as btind
+
+
+class TestStrategy(bt.Strategy):
+    params = (
+        ('main', False),
+    )
+
+    def __init__(self):
+        self.inds = [
+            btind.SMA(self.data, period=15),
+            btind.EMA(self.data, period=20),
+            btind.MACD(self.data),
+            btind.Stochastic(self.data),
+            btind.ParabolicSAR(self.data),
+            btind.SMA(btind.SMA(self.data, period=10), period=12),
+            btind.CrossOver(self.data.close, btind.SMA(self.data, period=5)),
+            self.data.close - self.data.open,
+            btind.RSI(self.data1, period=5),
+        ]
+
+        self.maxbuf = 0
+
+    def start(self):
+        self.values = list()
+
+    def next(self):
+        vals = [len(self), len(self.data0), len(self.data1)]
+        for ind in self.inds:
+            for line in ind.lines:
+                vals.append('%f' % line[0])
+
+        self.values.append(vals)
+
+        for ind in self.inds:
+            self.maxbuf = max(self.maxbuf, len(ind.lines[0].array))
+
+        if self.p.main:
+            print(', '.join(map(str, vals)))
+
+
+def runstrat(**kwargs):
+    cerebro = bt.Cerebro(**kwargs)
+    for i in range(2):
+        cerebro.adddata(testcommon.getdata(i))
+
+    cerebro.addstrategy(TestStrategy)
+    return cerebro, cerebro.run()[0]
+
+
+def test_run(main=False):
+    _, chkstrat = runstrat()
+
+    for chunkbars in [1, 7, 60]:
+        cerebro, strat = runstrat(exactbars=1, chunkbars=chunkbars)
+        if main:
+            print('chunkbars %d, max buffer %d vs %d' %
+                  (chunkbars, strat.maxbuf, chkstrat.maxbuf))
+
+        assert strat.values == chkstrat.values
+        # the window and the lookback of the indicators is all that is kept
+        assert strat.maxbuf <= chunkbars + cerebro._chunkkeep
+        assert strat.maxbuf < chkstrat.maxbuf
+
+
+if __name__ == '__main__':
+    test_run(main=True)
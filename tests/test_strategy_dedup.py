@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016, 2017 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+
+import testcommon
+
+import backtrader as bt
+import backtrader.indicators as btind
+
+
+class NextIndicator(bt.Indicator):
+    lines = ('x',)
+
+    def __init__(self):
+        self.sma = btind.SMA(self.data, period=15)
+
+    def next(self):
+        # once is simulated with next: the sma pointer is moved by this one
+        self.lines.x[0] = self.sma[0] - self.sma[-2]
+
+
+class OpIndicator(bt.Indicator):
+    lines = ('x',)
+
+    def __init__(self):
+        # held as attributes: read by the strategy
+        self.diff = self.data - btind.SMA(self.data, period=20)
+        self.wma = btind.WMA(self.diff, period=5)
+        self.lines.x = self.wma * 2.0
+
+
+class TestStrategy(bt.Strategy):
+    params = (
+        ('main', False),
+    )
+
+    def __init__(self):
+        sma = btind.SMA(self.data, period=15)
+        self.inds = [
+            sma,
+            btind.BollingerBands(self.data, period=15),  # inner sma
+            NextIndicator(self.data),  # inner sma
+            btind.MACD(self.data),
+            btind.EMA(self.data, period=12),  # 1st ema of MACD
+            btind.MACD(self.data),  # fully shared
+            btind.CrossOver(sma, btind.SMA(self.data, period=15)),
+            btind.SMA(self.data.close, period=15),  # close is line 0
+            btind.SMA(self.data.open, period=15),  # not the same input
+            btind.SMA(self.data, period=16),  # not the same params
+            OpIndicator(self.data),
+            OpIndicator(self.data.close),  # attributes of the 1st one
+        ]
+
+    def start(self):
+        self.values = list()
+
+    def next(self):
+        vals = [len(self)]
+        for ind in self.inds:
+            for line in ind.lines:
+                vals.append('%f' % line[0])
+
+            if isinstance(ind, OpIndicator):
+                vals.extend('%f' % x[0] for x in [ind.diff, ind.wma])
+
+        self.values.append(vals)
+
+        if self.p.main:
+            print(', '.join(map(str, vals)))
+
+
+def runstrat(**kwargs):
+    cerebro = bt.Cerebro(**kwargs)
+    cerebro.adddata(testcommon.getdata(0))
+    cerebro.addstrategy(TestStrategy)
+    return cerebro.run()[0]
+
+
+def test_run(main=False):
+    for kwargs in [dict(), dict(runonce=False), dict(exactbars=1)]:
+        chkstrat = runstrat(**kwargs)
+        strat = runstrat(dedup=True, **kwargs)
+        if main:
+            print('%s: %d shared indicators' % (kwargs, strat.getdedupcount()))
+
+        assert strat.values == chkstrat.values
+        assert chkstrat.getdedupcount() == 0
+
+        # Count includes the indicators inside the shared ones
+        inds = strat.inds
+        assert strat.getdedupcount() == 18
+
+        assert inds[2].sma.lines is inds[0].lines
+        assert inds[5].lines is inds[3].lines
+        assert inds[7].lines is inds[0].lines
+        assert inds[8].lines is not inds[0].lines
+        assert inds[9].lines is not inds[0].lines
+        assert inds[11].lines is inds[10].lines
+        assert inds[11].diff is inds[10].diff
+        assert inds[11].wma is inds[10].wma
+
+
+if __name__ == '__main__':
+    test_run(main=True)
@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016, 2017 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+import collections
+
+import testcommon
+
+import backtrader as bt
+import backtrader.indicators as btind
+
+
+class Helper(object):
+    pass
+
+
+class NoFuseOps(object):
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+
+class TestStrategy(bt.Strategy):
+    params = (
+        ('main', False),
+        ('fuse', True),  # create the operations in a FuseOps block
+    )
+
+    def __init__(self):
+        sma = btind.SMA(self.data, period=15)
+        atr = btind.ATR(self.data)
+
+        # held where the scan of holders does not look: created outside of
+        # the block and calculated on its own
+        self.dq = collections.deque([self.data.close - self.data.open])
+        self.h = Helper()
+        self.h.inner = self.data.close - sma
+        held = self.data.low - sma
+        self.getheld = lambda: held
+
+        with bt.FuseOps() if self.p.fuse else NoFuseOps():
+            diff = self.data.close - sma
+            self.kept = diff * 2.0  # held: calculated on its own
+
+            self.ops = [
+                diff / atr * 2.0,  # diff is also used by kept
+                abs(self.data.close - self.data.open) / (atr + 1.0),
+                (self.data.close > sma) - (self.data.close < sma),
+                -(1.0 - self.data.close) + self.kept,
+                btind.SMA(self.data.high - self.data.low, period=5) * 0.5,
+            ]
+
+            self.ops.extend([self.dq[0] * 3.0, self.h.inner + 1.0,
+                             held / 2.0])
+
+    def start(self):
+        self.values = list()
+
+    def next(self):
+        vals = [len(self), '%f' % self.kept[0]]
+        vals.extend('%f' % x[0] for x in [self.dq[0], self.h.inner,
+                                          self.getheld()])
+        vals.extend('%f' % op[0] for op in self.ops)
+        self.values.append(vals)
+
+        if self.p.main:
+            print(', '.join(map(str, vals)))
+
+
+def runstrat(fuse=True, **kwargs):
+    cerebro = bt.Cerebro(**kwargs)
+    cerebro.adddata(testcommon.getdata(0))
+    cerebro.addstrategy(TestStrategy, fuse=fuse)
+    return cerebro.run()[0]
+
+
+def test_run(main=False):
+    for kwargs in [dict(), dict(runonce=False), dict(exactbars=1)]:
+        chkstrat = runstrat(**kwargs)
+        strat = runstrat(fuseops=True, **kwargs)
+        assert strat.values == chkstrat.values
+
+        # Operations calculated inline do not go through the strategy
+        nops = len(chkstrat.getindicators()) - len(strat.getindicators())
+        if main:
+            print('%s: %d operations calculated inline' % (kwargs, nops))
+
+        assert nops == 8
+
+        # nothing is calculated inline without the block
+        strat = runstrat(fuseops=True, fuse=False, **kwargs)
+        assert strat.values == chkstrat.values
+        assert len(strat.getindicators()) == len(chkstrat.getindicators())
+
+
+if __name__ == '__main__':
+    test_run(main=True)
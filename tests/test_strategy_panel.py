@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016, 2017 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import math
+
+import testcommon
+
+import backtrader as bt
+
+
+class TestStrategy(bt.Strategy):
+    params = (
+        ('main', False),
+    )
+
+    def start(self):
+        self.rows = 0
+
+    def prenext(self):
+        self.next()
+
+    def next(self):
+        panel = self.getpanel()
+        assert panel.datetime[len(self) - 1] == self.datetime[0]
+
+        closes = self.panelrow()
+        volumes = self.panelrow('volume')
+        for i, d in enumerate(self.datas):
+            if len(d) and d.datetime[0] == self.datetime[0]:
+                assert closes[i] == d.close[0]
+                assert volumes[i] == d.volume[0]
+            else:  # no bar at this datetime
+                assert math.isnan(closes[i])
+
+        # no lookahead: neither future bars nor wrapping to the end
+        for ago in [1, -len(self)]:
+            try:
+                self.panelrow(ago=ago)
+            except IndexError:
+                pass
+            else:
+                assert False, 'IndexError not raised for ago=%d' % ago
+
+        if len(self) > 1:  # data0 (daily) has a bar in each row
+            assert self.panelrow(ago=-1)[0] == self.data0.close[-1]
+
+        if self.p.main:
+            print(self.datetime.date(), ', '.join(map(str, closes)))
+
+        self.rows += 1
+
+
+def test_run(main=False):
+    for runonce in [True, False]:
+        cerebro = bt.Cerebro(runonce=runonce, panel=True)
+        cerebro.adddata(testcommon.getdata(0))
+        cerebro.adddata(testcommon.getdata(1))
+        cerebro.addstrategy(TestStrategy, main=main)
+        strat = cerebro.run()[0]
+
+        panel = strat.getpanel()
+        assert strat.rows == len(panel) == len(strat.data0)
+        assert panel.close.shape == (len(panel), 2)
+
+    cerebro = bt.Cerebro(exactbars=1)
+    cerebro.adddata(testcommon.getdata(0))
+    cerebro.addstrategy(bt.Strategy)
+    assert cerebro.run()[0].getpanel() is None  # not preloaded
+
+
+if __name__ == '__main__':
+    test_run(main=True)
@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016, 2017 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+
+import testcommon
+
+import backtrader as bt
+import backtrader.indicators as btind
+
+
+class TestStrategy(bt.Strategy):
+    params = (
+        ('main', False),
+    )
+
+    def __init__(self):
+        self.inds = [
+            btind.SMA(self.data, period=15),
+            btind.MACD(self.data),
+            btind.Stochastic(self.data1),
+        ]
+
+        self.maxbuf = 0
+
+    def start(self):
+        self.values = list()
+
+    def next(self):
+        vals = [len(self), len(self.data0), len(self.data1)]
+        vals.append('%f' % self.data1.close[0])
+        vals.append('%f' % sum(self.data0.close.get(size=5)))
+        for ind in self.inds:
+            for line in ind.lines:
+                vals.append('%f' % line[0])
+
+        self.values.append(vals)
+
+        for line in (self.data0.close, self.data1.close, self.inds[0].sma):
+            self.maxbuf = max(self.maxbuf, len(line.array))
+
+        if self.p.main:
+            print(', '.join(map(str, vals)))
+
+
+def runstrat(replay=False, **kwargs):
+    cerebro = bt.Cerebro(**kwargs)
+    data = testcommon.getdata(0)
+    cerebro.adddata(data)
+    if replay:
+        cerebro.replaydata(data, timeframe=bt.TimeFrame.Weeks)
+    else:
+        cerebro.resampledata(data, timeframe=bt.TimeFrame.Weeks)
+
+    cerebro.addstrategy(TestStrategy)
+    return cerebro.run()[0]
+
+
+def test_run(main=False):
+    qspare = bt.linebuffer.LineBuffer.QSpare
+    try:
+        # Force frequent compaction of the buffers
+        bt.linebuffer.LineBuffer.QSpare = 3
+        for replay in [False, True]:
+            chkstrat = runstrat(replay=replay)
+            strat = runstrat(replay=replay, exactbars=1)
+            if main:
+                print('replay %s, max buffer %d vs %d' %
+                      (replay, strat.maxbuf, chkstrat.maxbuf))
+
+            assert strat.values == chkstrat.values
+            assert strat.maxbuf < chkstrat.maxbuf
+    finally:
+        bt.linebuffer.LineBuffer.QSpare = qspare
+
+
+if __name__ == '__main__':
+    test_run(main=True)
@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016, 2017 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+
+import testcommon
+
+import backtrader as bt
+
+
+class TestStrategy(bt.Strategy):
+    params = (
+        ('bulk', True),
+        ('main', False),
+    )
+
+    def start(self):
+        self.values = list()
+
+    def next(self):
+        if len(self) % 20:
+            return
+
+        if len(self) % 40:
+            targets = [0.3, 0.2, 0.0]
+        else:
+            targets = [0.0, 0.25, 0.35]
+
+        if self.p.bulk:
+            orders = self.rebalance(targets)
+
+            # reductions of positions go first
+            sells = [o.issell() for o in orders]
+            assert sells == sorted(sells, reverse=True)
+        else:
+            for data, target in zip(self.datas, targets):
+                self.order_target_percent(data, target=target)
+
+        self.values.append(
+            [self.getposition(d).size for d in self.datas] +
+            ['%.2f' % self.broker.getvalue()])
+
+        if self.p.main:
+            print(len(self), self.values[-1])
+
+
+def runstrat(**kwargs):
+    cerebro = bt.Cerebro()
+    cerebro.broker.setcash(100000.0)
+    cerebro.adddata(testcommon.getdata(0), name='d0')
+    cerebro.adddata(testcommon.getdata(0, fromdate=None), name='d1')
+    cerebro.adddata(testcommon.getdata(1), name='w0')
+    cerebro.addstrategy(TestStrategy, **kwargs)
+    return cerebro.run()[0]
+
+
+class SizeStrategy(bt.Strategy):
+    def next(self):
+        if len(self) == 10:
+            orders = self.rebalance({'d0': 10, self.data1: float('nan')},
+                                    kind='size')
+            assert len(orders) == 1 and orders[0].data is self.data0
+        elif len(self) == 20:
+            self.orders = self.rebalance({'d0': 4, 'd1': 3}, kind='size')
+        elif len(self) == 21:
+            assert self.getposition(self.data0).size == 4
+            assert self.getposition(self.data1).size == 3
+
+
+def test_run(main=False):
+    chkstrat = runstrat(bulk=False, main=main)
+    strat = runstrat(bulk=True, main=main)
+    assert strat.values == chkstrat.values
+
+    cerebro = bt.Cerebro()
+    cerebro.broker.setcash(100000.0)
+    cerebro.adddata(testcommon.getdata(0), name='d0')
+    cerebro.adddata(testcommon.getdata(0), name='d1')
+    cerebro.addstrategy(SizeStrategy)
+    strat = cerebro.run()[0]
+    assert [o.issell() for o in strat.orders] == [True, False]
+
+
+if __name__ == '__main__':
+    test_run(main=True)